@@ -4,11 +4,15 @@ import time
 import logging
 import os
 import sys
+import argparse
 import getpass
 from decimal import Decimal, InvalidOperation
 from artha_blockchain import ArthaBlockchain
-from artha_wallet import ArthaWallet
+from artha_wallet import ArthaWallet, KEY_TYPE_ED25519, KEY_TYPE_RSA
 from artha_node import ArthaNode
+from artha_utils import transaction_outputs, transaction_total
+from artha_encoding import TX_VERSION
+from artha_rpc import RpcServer, RPC_HOST
 
 APP_HOST = '0.0.0.0'
 APP_PORT = 5000
@@ -54,12 +58,76 @@ def display_menu():
     print("5. Show Pending Transactions")
     print("6. Force Re-sync with Peers")
     print("7. View Log File Path")
-    print("8. Exit")
+    print("8. Batch Send ARTH (from CSV file)")
+    print("9. Exit")
     print("="*40)
 
+def read_payouts(path):
+    """Reads 'address,amount' lines from a CSV file; blank lines and # comments are skipped."""
+    payouts = []
+    with open(path, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                recipient, amount_str = [part.strip() for part in line.split(',')]
+                amount = Decimal(amount_str)
+            except (ValueError, InvalidOperation):
+                raise ValueError(f"Baris {line_number} tidak valid: {line}")
+            if amount <= 0:
+                raise ValueError(f"Jumlah harus positif pada baris {line_number}")
+            payouts.append((recipient, amount))
+    return payouts
+
+def batch_send(wallet, blockchain, node):
+    """Sends payouts from a CSV file as batch transactions of up to MAX_BATCH_OUTPUTS recipients."""
+    path = input("File CSV (alamat,jumlah per baris): ").strip()
+    try:
+        payouts = read_payouts(path)
+    except (OSError, ValueError) as e:
+        print(f"Gagal membaca file: {e}")
+        return
+    if not payouts:
+        print("Tidak ada pembayaran di file.")
+        return
+
+    total = sum(amount for _, amount in payouts)
+    if blockchain.get_balance(wallet.address) < total:
+        print(f"Saldo tidak mencukupi untuk total {total:.8f} ARTH.")
+        return
+
+    batch_size = ArthaBlockchain.MAX_BATCH_OUTPUTS
+    for i in range(0, len(payouts), batch_size):
+        outputs, signature = wallet.sign_batch(payouts[i:i + batch_size])
+        added_tx = blockchain.add_batch_transaction(wallet.address, outputs, signature, wallet.public_key_str,
+                                                    version=TX_VERSION)
+        if not added_tx:
+            logging.warning(f"Gagal membuat transaksi batch untuk pembayaran {i + 1}-{i + len(outputs)}.")
+            return
+        logging.info(f"Transaksi batch {added_tx['transaction_id'][:10]}... ({len(outputs)} penerima) berhasil disiarkan.")
+        node.broadcast_message('NEW_TRANSACTION', {
+            'transaction': added_tx,
+            'public_key_str': added_tx.get('public_key_str')
+        })
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="ArthaChain CLI")
+    parser.add_argument('port', nargs='?', type=int, default=APP_PORT)
+    parser.add_argument('--prune', type=int, metavar='DEPTH',
+                        help="Mode pangkas: buang body blok yang lebih dalam dari DEPTH blok di bawah tip")
+    parser.add_argument('--key-type', choices=[KEY_TYPE_ED25519, KEY_TYPE_RSA], default=KEY_TYPE_ED25519,
+                        help="Jenis kunci untuk dompet baru (default: ed25519)")
+    parser.add_argument('--rpc', type=int, metavar='PORT',
+                        help="Jalankan server JSON-RPC lokal di port ini")
+    parser.add_argument('--rpc-host', default=RPC_HOST,
+                        help=f"Alamat bind server JSON-RPC (default: {RPC_HOST})")
+    return parser.parse_args()
+
 def run_app():
     """Main function to run the ArthaChain application."""
-    port = int(sys.argv[1]) if len(sys.argv) > 1 else APP_PORT
+    args = parse_args()
+    port = args.port
     setup_logging(port)
 
     try:
@@ -68,7 +136,7 @@ def run_app():
         if not password:
             print("Password tidak boleh kosong.")
             return
-        wallet = ArthaWallet(password=password)
+        wallet = ArthaWallet(password=password, key_type=args.key_type)
     except ValueError as e:
         print(f"Gagal memuat dompet: {e}")
         return
@@ -77,12 +145,18 @@ def run_app():
         return
 
     public_address = wallet.get_public_address()
-    blockchain = ArthaBlockchain()
+    blockchain = ArthaBlockchain(prune_depth=args.prune)
     node = ArthaNode(APP_HOST, port, blockchain)
     node.start()
+    rpc_server = None
+    if args.rpc:
+        rpc_server = RpcServer(blockchain, node, args.rpc_host, args.rpc)
+        rpc_server.start()
 
     logging.info(f"\nAlamat Dompet: {public_address}")
     logging.info(f"Node Aplikasi Berjalan di: {APP_HOST}:{port}")
+    if rpc_server:
+        logging.info(f"JSON-RPC di http://{args.rpc_host}:{args.rpc}/")
 
     try:
         while True:
@@ -111,21 +185,22 @@ def run_app():
                 transaction_data = {
                     'sender': public_address,
                     'recipient': recipient,
-                    'amount': canonical_amount_str
+                    'amount': canonical_amount_str,
+                    'version': TX_VERSION
                 }
                 
                 signature = wallet.sign_transaction(transaction_data)
                 
                 added_tx = blockchain.add_transaction(
                     public_address, recipient, amount, signature, 
-                    wallet.public_key.export_key().decode('utf-8')
+                    wallet.public_key_str, version=TX_VERSION
                 )
                 
                 if added_tx:
                     logging.info(f"Transaksi {added_tx['transaction_id'][:10]}... berhasil disiarkan.")
                     node.broadcast_message('NEW_TRANSACTION', {
                         'transaction': added_tx,
-                        'public_key_str': wallet.public_key.export_key().decode('utf-8')
+                        'public_key_str': added_tx.get('public_key_str')
                     })
                 else:
                     logging.warning("Gagal membuat transaksi.")
@@ -141,16 +216,17 @@ def run_app():
 
             elif choice == '4':
                 print("\n--- Blockchain ---")
-                for block in blockchain.chain:
+                for block in blockchain.state.chain:
                     print(f"Index: {block['index']}, Hash: {blockchain.hash_block(block)[:10]}...")
 
             elif choice == '5':
                 print("\nTransaksi Tertunda:")
-                if not blockchain.pending_transactions:
+                if not blockchain.state.pending:
                     print("Tidak ada.")
                 else:
-                    for tx in blockchain.pending_transactions:
-                        print(f"- Dari: {tx['sender'][:10]}... Jumlah: {tx['amount']}")
+                    for tx in blockchain.state.pending:
+                        print(f"- Dari: {tx['sender'][:10]}... Jumlah: {transaction_total(tx):.8f} "
+                              f"({len(transaction_outputs(tx))} penerima)")
             
             elif choice == '6':
                 print("Memaksa sinkronisasi ulang dengan semua peer...")
@@ -160,6 +236,9 @@ def run_app():
                 print(f"\nLokasi file log: {LOG_FILE_PATH}")
 
             elif choice == '8':
+                batch_send(wallet, blockchain, node)
+
+            elif choice == '9':
                 break
             else:
                 print("Pilihan tidak valid.")
@@ -167,6 +246,8 @@ def run_app():
     except KeyboardInterrupt:
         logging.info("\nAplikasi dihentikan oleh pengguna.")
     finally:
+        if rpc_server:
+            rpc_server.stop()
         node.stop()
 
 if __name__ == '__main__':
@@ -1,33 +1,259 @@
 # artha_blockchain.py
 
+import bisect
+import threading
 import time
-import hashlib
-from decimal import Decimal, getcontext
-from artha_utils import hash_data, json_serialize, load_json_file, save_json_file
-from artha_wallet import ArthaWallet
+from collections import ChainMap, namedtuple
+from collections.abc import Sequence, Set
+from itertools import islice
+from types import MappingProxyType
+from decimal import Decimal, InvalidOperation, getcontext
+from artha_utils import (hash_data, json_serialize, load_json_file, save_json_file, check_proof,
+                         block_version, block_header, header_hash, proof_prefix, merkle_root, merkle_proof,
+                         transaction_output_units, signed_transaction_data, transaction_id, transaction_version,
+                         to_base_units, format_amount, units_to_decimal)
+from artha_encoding import BINARY_BLOCK_VERSION, TX_VERSION, EncodingError
+from artha_wallet import ArthaWallet, KEY_TYPE_RSA
+from artha_filters import BlockFilterIndex, block_addresses
+from artha_blockstore import BlockWireStore
+from artha_mempool import MempoolLog
+from artha_types import Block, to_block, chain_object_hook
+from artha_events import (EventBus, BlockConnected, BlockDisconnected, TipChanged,
+                          TxAdded, TxRemoved)
 import logging
 
 getcontext().prec = 28
 logger = logging.getLogger(__name__)
 
+class BlockTemplate:
+    """
+    Transactions ready to go into the next block, kept up to date as the mempool
+    and the chain change so that a found proof can be turned into a block at once.
+    """
+
+    def __init__(self):
+        self.transactions = []
+        self.tx_ids = set()
+        self.balances = {}
+
+    def reset(self, confirmed_balances, pending_transactions, tx_id_fn):
+        self.transactions = []
+        self.tx_ids = set()
+        self.balances = {}
+        for tx in sorted(pending_transactions, key=lambda t: t['timestamp']):
+            self.add(tx, confirmed_balances, tx_id_fn(tx))
+
+    def add(self, tx, confirmed_balances, tx_id):
+        """
+        Appends an already verified transaction if the sender can still afford it
+        after the transactions ahead of it in the template.
+        """
+        sender, outputs = tx['sender'], transaction_output_units(tx)
+        amount = sum(units for _, units in outputs)
+        sender_balance = self.balances.get(sender, confirmed_balances.get(sender, 0))
+        if sender_balance < amount:
+            return False
+        self.balances[sender] = sender_balance - amount
+        for recipient, units in outputs:
+            self.balances[recipient] = self.balances.get(recipient, confirmed_balances.get(recipient, 0)) + units
+        self.transactions.append(tx)
+        self.tx_ids.add(tx_id)
+        return True
+
+class AppendOnlyView(Sequence):
+    """
+    Read-only view of the first `length` items of a list that its owner only
+    appends to, or replaces with a new list. Publishing one is O(1) instead
+    of a copy of the whole list.
+    """
+    __slots__ = ('_items', '_length')
+
+    def __init__(self, items, length=None):
+        self._items = items
+        self._length = len(items) if length is None else length
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._items[i] for i in range(self._length)[index]]
+        return self._items[range(self._length)[index]]
+
+    def __iter__(self):
+        return islice(self._items, self._length)
+
+class PendingIds(Set):
+    """
+    The IDs of the transactions in an AppendOnlyView of the mempool.
+    `positions` maps each ID to its index in the underlying list.
+    """
+    __slots__ = ('_positions', '_pending')
+
+    def __init__(self, positions, pending):
+        self._positions = positions
+        self._pending = pending
+
+    def __contains__(self, tx_id):
+        return self._positions.get(tx_id, len(self._pending)) < len(self._pending)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def __iter__(self):
+        return (tx['transaction_id'] for tx in self._pending)
+
+class ChainState(namedtuple('ChainState', 'version chain tip_hash balances pending pending_ids template '
+                                           'tx_index address_index hash_index pruned_height')):
+    """
+    An immutable view of the chain, published by ArthaBlockchain after each
+    write. Readers take `blockchain.state` once and answer a whole query from
+    it without locking, so they never see a half-applied block or reorg.
+    `chain` is never modified; `balances`, `pending` and `template` are
+    read-only. The indexes are shared with later states until a reorg and may
+    already hold entries for newer blocks, so lookups are bounded by len(chain).
+    """
+    __slots__ = ()
+
+    @property
+    def height(self):
+        return len(self.chain) - 1
+
+    @property
+    def tip(self):
+        return self.chain[-1] if self.chain else None
+
+class KeyRegistry:
+    """
+    Public keys revealed on chain, indexed by address. A sender's first spend
+    carries the key; later transactions from that address may leave it out.
+    Imported key objects are cached so each key is only parsed once.
+    """
+    MAX_IMPORTED_KEYS = 100000
+
+    def __init__(self):
+        self.keys = {}
+        self.heights = {}
+        self._imported = {}
+
+    def reset(self, keys=None, height=0):
+        self.keys = dict(keys or {})
+        self.heights = {addr: height for addr in self.keys}
+
+    def get(self, address):
+        return self.keys.get(address)
+
+    def register(self, address, public_key_str, height):
+        if address not in self.keys:
+            self.keys[address] = public_key_str
+            self.heights[address] = height
+
+    def keys_at(self, height):
+        return {addr: key for addr, key in self.keys.items() if self.heights[addr] <= height}
+
+    def verify(self, transaction_data, public_key_str, signature):
+        public_key = self._imported.get(public_key_str)
+        if public_key is None:
+            try:
+                public_key = ArthaWallet.import_public_key(public_key_str)
+            except (ValueError, TypeError, AttributeError):
+                return False
+            if len(self._imported) >= self.MAX_IMPORTED_KEYS:
+                self._imported.clear()
+            self._imported[public_key_str] = public_key
+        return ArthaWallet.verify_signature(transaction_data, public_key_str, signature, public_key)
+
+def owns_address(public_key_str, address):
+    return isinstance(public_key_str, str) and hash_data(public_key_str.encode('utf-8')) == address
+
 class ArthaBlockchain:
     TOTAL_SUPPLY = Decimal('30000000')
     BLOCK_REWARD = Decimal('50')
     MAX_BLOCKS = int(TOTAL_SUPPLY // BLOCK_REWARD)
     TARGET_BLOCK_TIME_SECONDS = 60
     DIFFICULTY_ADJUSTMENT_INTERVAL = 10
+    # Versi 2: header memuat Merkle root transaksi dan PoW mengikat seluruh header.
+    # Versi 3: blok di tinggi kelipatan SNAPSHOT_INTERVAL mengikat hash state saldo.
+    # Versi 4: transaksi boleh ditandatangani dengan kunci Ed25519.
+    # Versi 5: kunci publik cukup diungkap sekali; snapshot state ikut memuat kunci.
+    # Versi 6: transaksi batch dengan banyak penerima ('outputs').
+    # Versi 7: header di-hash dengan encoding biner; transaksi versi 2 juga untuk ID dan tanda tangan.
+    BLOCK_VERSION = 7
+    # Versi blok tidak boleh turun, dan sejak tinggi aktivasi (di atas tip jaringan saat aturan ini
+    # dirilis) wajib MIN_BLOCK_VERSION: format lama tidak bisa dipakai untuk melewati aturan baru.
+    MIN_BLOCK_VERSION = 7
+    MIN_BLOCK_VERSION_HEIGHT = 20000
+    MAX_BATCH_OUTPUTS = 1000
+    MIN_PRUNE_DEPTH = 100
+    PRUNE_BATCH = 100
+    SNAPSHOT_INTERVAL = 1000
+    SNAPSHOT_CHUNK_SIZE = 1000
 
-    def __init__(self, blockchain_file='blockchain.json'):
+    def __init__(self, blockchain_file='blockchain.json', prune_depth=None, checkpoint_file='state_checkpoint.json',
+                 mempool_file='mempool.log'):
+        if prune_depth is not None and prune_depth < self.MIN_PRUNE_DEPTH:
+            raise ValueError(f"prune_depth must be at least {self.MIN_PRUNE_DEPTH} blocks.")
         self.blockchain_file = blockchain_file
+        self.prune_depth = prune_depth
+        self.checkpoint_file = checkpoint_file
+        self.checkpoint = load_json_file(checkpoint_file)
+        self.snapshot_file = 'state_snapshot.json'
+        self.snapshot = load_json_file(self.snapshot_file)
+        self._snapshot_dirty = False
+        self.pruned_height = 0
+        # Penulis (rantai baru, transaksi baru) bekerja pada atribut di bawah ini di bawah
+        # write_lock lalu menerbitkan ChainState baru; pembaca hanya memakai self.state.
+        self.write_lock = threading.RLock()
+        self.state = None
+        self.state_version = 0
         self.chain = []
         self.pending_transactions = []
-        self.known_pending_tx_hashes = set()
-        self._load_or_create_chain()
+        # ID transaksi -> posisinya di pending_transactions.
+        self.known_pending_tx_hashes = {}
+        self.balances = {}
+        self.tx_index = {}
+        # Alamat -> tinggi blok (urut naik) yang menyentuhnya, dan hash blok -> tinggi.
+        self.address_index = {}
+        self.hash_index = {}
+        self.key_registry = KeyRegistry()
+        self.template = BlockTemplate()
+        self.filter_index = BlockFilterIndex()
+        self.block_store = BlockWireStore()
+        self.mempool_log = MempoolLog(mempool_file)
+        self.events = EventBus()
+        with self.write_lock:
+            self._load_or_create_chain()
+            self._rebuild_state()
+            self._publish_state()
+            self._restore_mempool()
+
+    def _publish_state(self, chain_changed=True):
+        """
+        Publishes the writer's current chain, balances and mempool as a new
+        ChainState. Balances are copied only when the chain changed; mempool
+        changes reuse the previous copy. The mempool and the template are only
+        appended to between replacements, so they are published as views.
+        """
+        previous = self.state
+        if chain_changed or previous is None:
+            balances = MappingProxyType(dict(self.balances))
+            tip_hash = self.hash_block(self.last_block) if self.chain else None
+        else:
+            balances, tip_hash = previous.balances, previous.tip_hash
+        self.state_version += 1
+        pending = AppendOnlyView(self.pending_transactions)
+        self.state = ChainState(
+            self.state_version, self.chain, tip_hash, balances, pending,
+            PendingIds(self.known_pending_tx_hashes, pending), AppendOnlyView(self.template.transactions),
+            self.tx_index, self.address_index, self.hash_index, self.pruned_height
+        )
 
     def _load_or_create_chain(self):
-        loaded_chain = load_json_file(self.blockchain_file)
+        # Blok dan transaksi langsung dibuat ringkas saat file diurai.
+        loaded_chain = load_json_file(self.blockchain_file, object_hook=chain_object_hook)
         if loaded_chain and self.is_chain_valid(loaded_chain):
             self.chain = loaded_chain
+            self.pruned_height = sum(1 for block in self.chain if block.get('pruned'))
             logger.info(f"Blockchain loaded. Height: {len(self.chain) - 1}")
         else:
             if loaded_chain:
@@ -43,69 +269,325 @@ class ArthaBlockchain:
             'nonce': 0, 'previous_hash': '0', 'miner_address': 'genesis_address',
             'difficulty': initial_difficulty
         }
-        self.chain.append(genesis_block)
+        self.chain.append(Block(genesis_block))
         self.save_chain()
         logger.info("Genesis block created.")
 
-    def new_block(self, nonce, previous_hash, miner_address):
-        if self.get_current_block_height() >= self.MAX_BLOCKS:
+    def prepare_block(self, miner_address):
+        """
+        Returns a candidate block on top of the current tip with nonce 0. The
+        proof-of-work is searched over proof_prefix(candidate); the miner then
+        only has to set the nonce.
+        """
+        state = self.state
+        if state.height >= self.MAX_BLOCKS:
             return None
 
         canonical_reward = "{:.8f}".format(self.BLOCK_REWARD)
         coinbase_tx = {
             'sender': '0', 'recipient': miner_address, 'amount': canonical_reward,
-            'timestamp': time.time(), 'signature': 'coinbase', 'public_key_str': 'coinbase'
+            'timestamp': time.time(), 'signature': 'coinbase', 'public_key_str': 'coinbase',
+            'version': TX_VERSION
         }
         
-        temp_balances = self.get_balance_snapshot()
-        transactions_for_block = [coinbase_tx]
-        included_tx_ids = set()
+        # Transaksi sudah diverifikasi dan disusun di template saat masuk mempool.
+        transactions_for_block = [coinbase_tx] + [self._block_transaction(tx) for tx in state.template]
         
-        temp_balances[miner_address] = temp_balances.get(miner_address, Decimal('0')) + self.BLOCK_REWARD
+        candidate = {
+            'version': self.BLOCK_VERSION, 'index': len(state.chain), 'timestamp': time.time(),
+            'transactions': transactions_for_block, 'nonce': 0,
+            'previous_hash': state.tip_hash, 'miner_address': miner_address,
+            'difficulty': self.get_current_difficulty(state.chain),
+            'merkle_root': self.compute_merkle_root(transactions_for_block)
+        }
+        if candidate['index'] % self.SNAPSHOT_INTERVAL == 0:
+            # Registri kunci diubah di tempat oleh penulis; kunci pada tinggi tip diambil di bawah lock.
+            with self.write_lock:
+                keys = self.key_registry.keys_at(state.height)
+            candidate['state_hash'] = self.compute_state_hash(state.balances, keys)
+        return candidate
+
+    def _block_transaction(self, tx):
+        """
+        Returns a pending transaction as it goes into a block: without the
+        public key if the sender's key is already registered on chain.
+        """
+        if tx.get('public_key_str') and self.key_registry.get(tx['sender']) == tx['public_key_str']:
+            return {k: v for k, v in tx.items() if k != 'public_key_str'}
+        return tx
+
+    def snapshot_chunks(self, balances, keys=None):
+        """
+        Splits a balance state into sorted chunks of [address, amount] entries,
+        or [address, amount, public_key_str or None] entries when `keys` is
+        given (version 5 snapshots). Addresses with a zero balance and no
+        registered key are left out so every node derives the same chunks.
+        """
+        if keys is None:
+            entries = sorted([addr, format_amount(units)] for addr, units in balances.items() if units)
+        else:
+            addresses = {addr for addr, units in balances.items() if units} | set(keys)
+            entries = sorted([addr, format_amount(balances.get(addr, 0)), keys.get(addr)] for addr in addresses)
+        return [entries[i:i + self.SNAPSHOT_CHUNK_SIZE] for i in range(0, len(entries), self.SNAPSHOT_CHUNK_SIZE)]
+
+    @staticmethod
+    def chunk_hash(chunk):
+        return hash_data(json_serialize(chunk))
+
+    def compute_state_hash(self, balances, keys=None):
+        return merkle_root([self.chunk_hash(chunk) for chunk in self.snapshot_chunks(balances, keys)])
+
+    def _record_snapshot(self, height, with_keys):
+        chunks = self.snapshot_chunks(self.balances, self.key_registry.keys if with_keys else None)
+        self.snapshot = {
+            'height': height, 'block_hash': self.hash_block(self.chain[height]),
+            'state_hash': merkle_root([self.chunk_hash(chunk) for chunk in chunks]), 'chunks': chunks
+        }
+        self._snapshot_dirty = True
+
+    def get_headers(self, start, end):
+        """
+        Returns block headers with their hash and transaction count, for header
+        sync. Version 1 hashes cover the body, so for those the hash is taken on trust.
+        """
+        headers = []
+        for block in self.state.chain[max(0, start):max(0, end)]:
+            header = block_header(block)
+            header['hash'] = self.hash_block(block)
+            header['tx_count'] = block['tx_count'] if block.get('pruned') else len(block['transactions'])
+            headers.append(header)
+        return headers
+
+    def is_header_chain_valid(self, headers):
+        if not headers or headers[0]['index'] != 0 or headers[0]['previous_hash'] != '0':
+            return False
+        for i, header in enumerate(headers):
+            if header['index'] != i or not self.is_header_valid(header, headers[i - 1] if i > 0 else None):
+                return False
+        return True
+
+    def is_header_valid(self, header, previous):
+        """
+        Checks a header from header sync: its hash and, unless it is the
+        genesis header (`previous` None), its link to and proof-of-work on top
+        of `previous`. The difficulty itself is not checked here.
+        """
+        if not self._is_version_allowed(header, previous):
+            return False
+        try:
+            if block_version(header) >= 2 and header.get('hash') != header_hash(header):
+                return False
+            if previous is not None and (header['previous_hash'] != previous['hash'] or
+                                         not self.is_valid_proof(proof_prefix(header), header['nonce'], header['difficulty'])):
+                return False
+        except EncodingError:
+            return False
+        return True
+
+    def install_snapshot(self, headers, snapshot):
+        """
+        Replaces the local chain with the verified headers up to the snapshot
+        height, stored as pruned blocks, and the snapshot state as checkpoint.
+        Blocks after the snapshot are then connected with replace_chain().
+        """
+        with self.write_lock:
+            height = snapshot['height']
+            chain = []
+            for header in headers[:height + 1]:
+                pruned_block = dict(header)
+                pruned_block.update({'pruned': True, 'transactions': []})
+                chain.append(Block(pruned_block))
         
-        for tx in sorted(self.pending_transactions, key=lambda t: t['timestamp']):
-            sender, recipient, amount = tx['sender'], tx['recipient'], Decimal(tx['amount'])
-            sender_balance = temp_balances.get(sender, Decimal('0'))
-            
-            tx_data = {'sender': sender, 'recipient': recipient, 'amount': tx['amount']}
-            if sender_balance >= amount and ArthaWallet.verify_signature(tx_data, tx['public_key_str'], tx['signature']):
-                transactions_for_block.append(tx)
-                included_tx_ids.add(self._calculate_transaction_id(tx))
-                temp_balances[sender] -= amount
-                temp_balances[recipient] = temp_balances.get(recipient, Decimal('0')) + amount
+            entries = [entry for chunk in snapshot['chunks'] for entry in chunk]
+            balances = {entry[0]: entry[1] for entry in entries if to_base_units(entry[1])}
+            keys = {entry[0]: entry[2] for entry in entries if len(entry) > 2 and entry[2]}
+            self.checkpoint = {'height': height, 'block_hash': chain[height]['hash'], 'balances': balances, 'keys': keys}
+            save_json_file(self.checkpoint_file, self.checkpoint)
+            self.snapshot = snapshot
+            self._snapshot_dirty = True
         
+            self.chain = chain
+            self.pruned_height = height + 1
+            cleared_ids = self.known_pending_tx_hashes
+            self.pending_transactions = []
+            self.known_pending_tx_hashes = {}
+            self.mempool_log.compact([])
+            self._rebuild_state()
+            self._publish_state()
+            self.save_chain()
+            logger.info(f"State snapshot installed at height {height}.")
+            for tx_id in cleared_ids:
+                self.events.publish(TxRemoved(tx_id, 'cleared'))
+            self.events.publish(TipChanged(height, self.hash_block(self.last_block), True))
+
+    def compute_merkle_root(self, transactions):
+        return merkle_root([self._calculate_transaction_id(tx) for tx in transactions])
+
+    def get_merkle_proof(self, tx_id):
+        """
+        Returns {'header', 'proof', 'tip_height'} proving that a confirmed
+        transaction is in its block, or None if unknown or in a version 1 block.
+        """
+        state = self.state
+        height = state.tx_index.get(tx_id)
+        if height is None or height >= len(state.chain):
+            return None
+        block = state.chain[height]
+        if block_version(block) < 2:
+            return None
+        tx_ids = [self._calculate_transaction_id(tx) for tx in block['transactions']]
+        if tx_id not in tx_ids:
+            return None
         return {
-            'index': len(self.chain), 'timestamp': time.time(), 'transactions': transactions_for_block,
-            'nonce': nonce, 'previous_hash': previous_hash, 'miner_address': miner_address,
-            'difficulty': self.get_current_difficulty()
+            'header': block_header(block),
+            'proof': merkle_proof(tx_ids, tx_ids.index(tx_id)),
+            'tip_height': state.height
         }
 
+    def get_block_hash(self, height):
+        state = self.state
+        if not 0 <= height < len(state.chain):
+            return None
+        return state.tip_hash if height == state.height else state.chain[height + 1]['previous_hash']
+
+    def get_block_by_hash(self, block_hash):
+        state = self.state
+        height = state.hash_index.get(block_hash)
+        return state.chain[height] if height is not None and height < len(state.chain) else None
+
+    def get_transaction(self, tx_id):
+        """
+        Returns (tx, height) for a confirmed transaction, (tx, None) for one in
+        the mempool, or None if it is unknown or its block was pruned.
+        """
+        state = self.state
+        height = state.tx_index.get(tx_id)
+        if height is not None and height < len(state.chain):
+            for tx in state.chain[height]['transactions']:
+                if self._calculate_transaction_id(tx) == tx_id:
+                    return tx, height
+            return None
+        if tx_id in state.pending_ids:
+            for tx in state.pending:
+                if tx['transaction_id'] == tx_id:
+                    return tx, None
+        return None
+
+    def get_address_history(self, address, before=None, after=None, limit=50):
+        """
+        Returns (rows, more): the (height, tx) pairs touching `address` in at
+        most `limit` unpruned blocks below `before` (default: from the tip down)
+        or, if `after` is given, in the nearest blocks above `after`. Rows are
+        newest first; `more` tells whether further blocks exist in that direction.
+        """
+        state = self.state
+        heights = state.address_index.get(address, [])
+        low = bisect.bisect_left(heights, state.pruned_height)
+        # Blok yang ditambahkan setelah snapshot ini diterbitkan belum termasuk.
+        high = bisect.bisect_left(heights, len(state.chain), low)
+        if after is not None:
+            start = max(low, bisect.bisect_right(heights, after, low, high))
+            page, more = heights[start:min(start + limit, high)], start + limit < high
+        else:
+            end = high if before is None else bisect.bisect_left(heights, before, low, high)
+            page, more = heights[max(low, end - limit):end], end - limit > low
+        rows = []
+        for height in reversed(page):
+            for tx in reversed(state.chain[height]['transactions']):
+                if tx['sender'] == address or any(recipient == address for recipient, _ in transaction_output_units(tx)):
+                    rows.append((height, tx))
+        return rows, more
+
     def _calculate_transaction_id(self, tx):
-        keys = ['sender', 'recipient', 'amount', 'timestamp', 'signature']
-        unique_data = {k: tx.get(k) for k in keys}
-        return hash_data(json_serialize(unique_data))
+        return transaction_id(tx)
 
-    def add_transaction(self, sender, recipient, amount, signature, public_key_str, timestamp=None):
+    def _restore_mempool(self):
+        """
+        Re-adds the transactions of the persisted mempool that are still valid
+        on top of the current tip, then compacts the log to just those.
+        """
+        stored = self.mempool_log.load()
+        for tx in stored:
+            self._add_pending_transaction(signed_transaction_data(tx), tx['signature'],
+                                          tx.get('public_key_str'), tx['timestamp'])
+        self.mempool_log.compact(self.pending_transactions)
+        if stored:
+            logger.info(f"Restored {len(self.pending_transactions)} of {len(stored)} pending transactions.")
+
+    def add_transaction(self, sender, recipient, amount, signature, public_key_str, timestamp=None, version=1):
         try:
             amount_decimal = Decimal(amount)
         except: return None
         
-        if self.get_balance(sender) < amount_decimal: return None
-        
         canonical_amount_str = "{:.8f}".format(amount_decimal)
         tx_data = {'sender': sender, 'recipient': recipient, 'amount': canonical_amount_str}
+        if version != 1:
+            tx_data['version'] = version
+        with self.write_lock:
+            transaction = self._add_pending_transaction(tx_data, signature, public_key_str, timestamp)
+            if transaction:
+                self.mempool_log.append(transaction)
+        return transaction
+
+    def add_batch_transaction(self, sender, outputs, signature, public_key_str, timestamp=None, version=1):
+        """
+        Adds a batch transaction: one sender and signature, many (recipient,
+        amount) outputs. The signature covers {'sender', 'outputs'} with the
+        amounts in canonical 8-decimal form, as made by ArthaWallet.sign_batch().
+        """
+        try:
+            canonical_outputs = [[recipient, "{:.8f}".format(Decimal(amount))] for recipient, amount in outputs]
+        except (InvalidOperation, TypeError, ValueError):
+            return None
         
-        if not ArthaWallet.verify_signature(tx_data, public_key_str, signature): return None
+        tx_data = {'sender': sender, 'outputs': canonical_outputs}
+        if version != 1:
+            tx_data['version'] = version
+        with self.write_lock:
+            transaction = self._add_pending_transaction(tx_data, signature, public_key_str, timestamp)
+            if transaction:
+                self.mempool_log.append(transaction)
+        return transaction
+
+    def _valid_outputs(self, outputs):
+        if not isinstance(outputs, list) or not 0 < len(outputs) <= self.MAX_BATCH_OUTPUTS:
+            return False
+        try:
+            return all(isinstance(recipient, str) and to_base_units(amount) > 0 for recipient, amount in outputs)
+        except (TypeError, ValueError):
+            return False
+
+    def _add_pending_transaction(self, tx_data, signature, public_key_str, timestamp=None):
+        sender = tx_data['sender']
+        if transaction_version(tx_data) not in (1, TX_VERSION): return None
+        if 'outputs' in tx_data and not self._valid_outputs(tx_data['outputs']): return None
+        try:
+            amount = sum(units for _, units in transaction_output_units(tx_data))
+        except ValueError: return None
+        if self.balances.get(sender, 0) < amount: return None
+        
+        # Kunci yang sudah terdaftar di rantai tidak perlu diulang di transaksi.
+        registered_key = self.key_registry.get(sender)
+        if public_key_str and not owns_address(public_key_str, sender): return None
+        if not (registered_key or public_key_str): return None
+        if not self.key_registry.verify(tx_data, registered_key or public_key_str, signature): return None
         
-        transaction = {'sender': sender, 'recipient': recipient, 'amount': canonical_amount_str, 
-                       'timestamp': timestamp or time.time(), 'signature': signature, 'public_key_str': public_key_str}
+        # Salinan di mempool selalu membawa kunci: blok yang mendaftarkannya bisa hilang karena reorg.
+        # Kunci baru dibuang saat blok disusun (prepare_block) jika masih terdaftar di rantai.
+        transaction = dict(tx_data, timestamp=timestamp or time.time(), signature=signature,
+                           public_key_str=public_key_str or registered_key)
         
-        tx_id = self._calculate_transaction_id(transaction)
-        if tx_id in self.known_pending_tx_hashes: return None
+        try:
+            tx_id = self._calculate_transaction_id(transaction)
+        except ValueError: return None
+        if tx_id in self.known_pending_tx_hashes or tx_id in self.tx_index: return None
         
         transaction['transaction_id'] = tx_id
+        self.known_pending_tx_hashes[tx_id] = len(self.pending_transactions)
         self.pending_transactions.append(transaction)
-        self.known_pending_tx_hashes.add(tx_id)
+        self.template.add(transaction, self.balances, tx_id)
+        self._publish_state(chain_changed=False)
+        self.events.publish(TxAdded(tx_id, transaction))
         return transaction
 
     @property
@@ -113,34 +595,95 @@ class ArthaBlockchain:
         return self.chain[-1] if self.chain else None
 
     def hash_block(self, block):
+        # Body blok yang sudah dipangkas tidak ada lagi; hash-nya disimpan saat pemangkasan.
+        if block.get('pruned'):
+            return block['hash']
+        # Blok versi 2 di-hash dari header saja; body terikat lewat merkle_root.
+        if block_version(block) >= 2:
+            return header_hash(block)
         return hash_data(json_serialize({k: v for k, v in block.items() if k != 'hash'}))
 
     def get_current_block_height(self):
-        return len(self.chain) - 1
+        return self.state.height
+
+    def _apply_block(self, block):
+        # State sebelum blok snapshot adalah yang di-commit di header-nya.
+        if block_version(block) >= 3 and block['index'] % self.SNAPSHOT_INTERVAL == 0 and block['index'] > 0:
+            self._record_snapshot(block['index'] - 1, with_keys=block_version(block) >= 5)
+        balances = self.balances
+        for tx in block['transactions']:
+            outputs = transaction_output_units(tx)
+            if tx['sender'] != '0':
+                balances[tx['sender']] = balances.get(tx['sender'], 0) - sum(units for _, units in outputs)
+                if tx['sender'] not in self.key_registry.keys and owns_address(tx.get('public_key_str'), tx['sender']):
+                    self.key_registry.register(tx['sender'], tx['public_key_str'], block['index'])
+            for recipient, units in outputs:
+                balances[recipient] = balances.get(recipient, 0) + units
+            self.tx_index[self._calculate_transaction_id(tx)] = block['index']
+        for address in block_addresses(block):
+            heights = self.address_index.setdefault(address, [])
+            if not heights or heights[-1] != block['index']:
+                heights.append(block['index'])
+
+    def _checkpoint_height(self, chain):
+        """
+        Returns the height of the state checkpoint if it belongs to `chain` and
+        covers every pruned block in it, otherwise -1.
+        """
+        cp = self.checkpoint
+        if not cp or cp['height'] >= len(chain) or self.hash_block(chain[cp['height']]) != cp['block_hash']:
+            return -1
+        if cp['height'] + 1 < len(chain) and chain[cp['height'] + 1].get('pruned'):
+            return -1
+        return cp['height']
+
+    def _rebuild_state(self):
+        # Indeks baru dibangun di objek baru; snapshot yang sudah terbit tetap memakai yang lama.
+        self.balances = {}
+        self.tx_index = {}
+        self.address_index = {}
+        # Snapshot dari rantai lain (mis. setelah reorg) tidak boleh disajikan.
+        snapshot = self.snapshot
+        if snapshot and (snapshot['height'] >= len(self.chain) or
+                         self.hash_block(self.chain[snapshot['height']]) != snapshot['block_hash']):
+            self.snapshot = None
+            self._snapshot_dirty = True
+        start = self._checkpoint_height(self.chain) + 1
+        self.key_registry.reset()
+        if start:
+            self.balances = {addr: to_base_units(amount) for addr, amount in self.checkpoint['balances'].items()}
+            self.key_registry.reset(self.checkpoint.get('keys'), start - 1)
+        for block in self.chain[start:]:
+            self._apply_block(block)
+        self.hash_index = {self._chain_block_hash(self.chain, height): height for height in range(len(self.chain))}
+        self.filter_index.rebuild(self.chain, self.hash_block)
+        self.block_store.rebuild(self.chain, self.hash_block)
+        self.template.reset(self.balances, self.pending_transactions, self._calculate_transaction_id)
 
     def get_balance_snapshot(self):
-        balances = {}
-        for block in self.chain:
-            for tx in block['transactions']:
-                amount = Decimal(tx['amount'])
-                if tx['sender'] != '0':
-                    balances[tx['sender']] = balances.get(tx['sender'], Decimal('0')) - amount
-                balances[tx['recipient']] = balances.get(tx['recipient'], Decimal('0')) + amount
-        return balances
+        return {addr: units_to_decimal(units) for addr, units in self.state.balances.items()}
 
     def get_balance(self, address) -> Decimal:
-        return self.get_balance_snapshot().get(address, Decimal('0'))
+        return units_to_decimal(self.state.balances.get(address, 0))
+
+    def get_public_key(self, address):
+        """
+        Returns the public key an address revealed on chain, or None.
+        """
+        return self.key_registry.get(address)
 
-    def get_current_difficulty(self):
-        if not self.chain or self.last_block['index'] < self.DIFFICULTY_ADJUSTMENT_INTERVAL: 
+    def get_current_difficulty(self, chain=None):
+        chain = self.state.chain if chain is None else chain
+        if not chain or chain[-1]['index'] < self.DIFFICULTY_ADJUSTMENT_INTERVAL: 
             return 200000
-        last_block = self.last_block
+        last_block = chain[-1]
         if (last_block['index'] % self.DIFFICULTY_ADJUSTMENT_INTERVAL == 0):
-            return self.calculate_difficulty(last_block)
+            return self.calculate_difficulty(last_block, chain)
         return last_block['difficulty']
 
-    def calculate_difficulty(self, last_block):
-        first_block = self.chain[-(self.DIFFICULTY_ADJUSTMENT_INTERVAL)]
+    def calculate_difficulty(self, last_block, chain=None):
+        chain = self.state.chain if chain is None else chain
+        first_block = chain[-(self.DIFFICULTY_ADJUSTMENT_INTERVAL)]
         time_taken = last_block['timestamp'] - first_block['timestamp']
         expected_time = self.DIFFICULTY_ADJUSTMENT_INTERVAL * self.TARGET_BLOCK_TIME_SECONDS
         if time_taken <= 0: time_taken = 1
@@ -148,52 +691,313 @@ class ArthaBlockchain:
         return max(1, int(last_block['difficulty'] / ratio))
 
     def is_valid_proof(self, last_block_hash, nonce, difficulty):
-        guess = f'{last_block_hash}{nonce}'.encode('utf-8')
-        guess_hash = hashlib.sha256(guess).hexdigest()
-        target = (2**256 - 1) // (difficulty if difficulty > 0 else 1)
-        return int(guess_hash, 16) <= target
+        return check_proof(last_block_hash, nonce, difficulty)
 
     def is_chain_valid(self, chain_to_validate):
+        try:
+            return self._is_chain_valid(chain_to_validate)
+        except EncodingError as e:
+            # Blok atau transaksi versi biner dengan nilai yang tidak bisa di-encode.
+            logger.debug(f"Chain rejected: {e}")
+            return False
+
+    def _is_chain_valid(self, chain_to_validate):
         if not chain_to_validate or chain_to_validate[0]['index'] != 0 or chain_to_validate[0]['previous_hash'] != '0':
              return False
         
+        # Blok yang dipangkas hanya sah jika checkpoint state lokal mencakupnya.
+        checkpoint_height = self._checkpoint_height(chain_to_validate) if chain_to_validate[0].get('pruned') else -1
+        if chain_to_validate[0].get('pruned') and checkpoint_height < 0:
+            return False
+        
         current_balances = {}
+        current_keys = {}
+        known_tx_ids = {}
         for i, block in enumerate(chain_to_validate):
-            if i > 0:
-                last_block = chain_to_validate[i-1]
-                if block['previous_hash'] != self.hash_block(last_block) or \
-                   not self.is_valid_proof(block['previous_hash'], block['nonce'], block['difficulty']):
-                    return False
+            if not self._is_header_valid(block, chain_to_validate[i-1] if i > 0 else None):
+                return False
+            if i <= checkpoint_height:
+                if i == checkpoint_height:
+                    current_balances = {addr: to_base_units(amount) for addr, amount in self.checkpoint['balances'].items()}
+                    current_keys = dict(self.checkpoint.get('keys') or {})
+                continue
+            if not self._is_body_valid(block, i, current_balances, current_keys, known_tx_ids):
+                return False
 
-            for tx in block['transactions']:
-                amount = Decimal(tx['amount'])
-                if tx['sender'] == '0':
-                    current_balances.setdefault(tx['recipient'], Decimal('0'))
-                    current_balances[tx['recipient']] += amount
-                    continue
-                
-                current_balances.setdefault(tx['sender'], Decimal('0'))
-                if current_balances[tx['sender']] < amount: return False
-                
-                tx_data = {'sender': tx['sender'], 'recipient': tx['recipient'], 'amount': tx['amount']}
-                if not ArthaWallet.verify_signature(tx_data, tx['public_key_str'], tx['signature']): return False
-                
-                current_balances[tx['sender']] -= amount
-                current_balances.setdefault(tx['recipient'], Decimal('0'))
-                current_balances[tx['recipient']] += amount
+        return True
+
+    def _is_version_allowed(self, block, last_block):
+        """
+        Checks the block version against the newest known version, the version
+        of the block before it and the minimum version at its height.
+        """
+        version = block_version(block)
+        if version > self.BLOCK_VERSION:
+            return False
+        if last_block is not None and version < block_version(last_block):
+            return False
+        return block['index'] < self.MIN_BLOCK_VERSION_HEIGHT or version >= self.MIN_BLOCK_VERSION
+
+    def _is_header_valid(self, block, last_block):
+        if not self._is_version_allowed(block, last_block):
+            return False
+        if block_version(block) >= BINARY_BLOCK_VERSION and block['nonce'].__class__ is not int:
+            return False
+        if last_block is not None and (block['previous_hash'] != self.hash_block(last_block) or
+                                       not self.is_valid_proof(proof_prefix(block), block['nonce'], block['difficulty'])):
+            return False
+        return True
+
+    def _is_body_valid(self, block, height, current_balances, current_keys, known_tx_ids):
+        """
+        Checks the transactions of the block at `height` against the balances,
+        revealed keys and transaction IDs before it, and applies them to all
+        three mappings.
+        """
+        if block.get('pruned'):
+            return False
+        try:
+            tx_ids = [self._calculate_transaction_id(tx) for tx in block['transactions']]
+        except ValueError:
+            return False
+        # Merkle root menggandakan simpul terakhir di level ganjil, jadi [.., t2] dan [.., t2, t2]
+        # punya root (dan hash blok) yang sama: transaksi ganda harus ditolak di sini.
+        if len(set(tx_ids)) != len(tx_ids) or any(tx_id in known_tx_ids for tx_id in tx_ids):
+            return False
+        if height > 0 and block_version(block) >= 2 and block.get('merkle_root') != merkle_root(tx_ids):
+            return False
+        if height > 0 and block_version(block) >= 3 and height % self.SNAPSHOT_INTERVAL == 0 and \
+           block.get('state_hash') != self.compute_state_hash(current_balances, current_keys if block_version(block) >= 5 else None):
+            return False
 
+        for tx in block['transactions']:
+            if transaction_version(tx) not in (1, TX_VERSION) or \
+               (transaction_version(tx) >= TX_VERSION and block_version(block) < BINARY_BLOCK_VERSION):
+                return False
+            if 'outputs' in tx and (block_version(block) < 6 or tx['sender'] == '0' or
+                                    not self._valid_outputs(tx['outputs'])):
+                return False
+            try:
+                outputs = transaction_output_units(tx)
+            except ValueError:
+                return False
+            amount = sum(units for _, units in outputs)
+            if tx['sender'] == '0':
+                current_balances[tx['recipient']] = current_balances.get(tx['recipient'], 0) + amount
+                continue
+            
+            if current_balances.get(tx['sender'], 0) < amount: return False
+            
+            public_key_str = tx.get('public_key_str')
+            if public_key_str is None:
+                # Sejak versi 5 kunci boleh diambil dari registri jika sudah pernah diungkap.
+                if block_version(block) < 5 or tx['sender'] not in current_keys: return False
+                public_key_str = current_keys[tx['sender']]
+            elif owns_address(public_key_str, tx['sender']):
+                current_keys.setdefault(tx['sender'], public_key_str)
+            elif block_version(block) >= 5:
+                return False
+            if block_version(block) < 4 and ArthaWallet.key_type_of(public_key_str) != KEY_TYPE_RSA: return False
+            
+            if not self.key_registry.verify(signed_transaction_data(tx), public_key_str, tx['signature']): return False
+            
+            current_balances[tx['sender']] -= amount
+            for recipient, units in outputs:
+                current_balances[recipient] = current_balances.get(recipient, 0) + units
+        for tx_id in tx_ids:
+            known_tx_ids[tx_id] = height
         return True
 
+    def check_new_block(self, block):
+        """
+        Returns True if `block` validly extends the current tip. Only this
+        block is checked, against the current balances and key registry, so
+        the cost does not grow with the chain height.
+        """
+        with self.write_lock:
+            block = to_block(block)
+            if not self.chain or block.get('index') != len(self.chain):
+                return False
+            # Perubahan saldo dan kunci oleh blok ini masuk ke lapisan atas; state asli tidak tersentuh.
+            try:
+                return self._is_header_valid(block, self.last_block) and \
+                    self._is_body_valid(block, block['index'], ChainMap({}, self.balances),
+                                        ChainMap({}, self.key_registry.keys), ChainMap({}, self.tx_index))
+            except EncodingError as e:
+                logger.debug(f"Block rejected: {e}")
+                return False
+
+    def check_found_block(self, block):
+        """
+        Returns True if a candidate from prepare_block() with a found nonce
+        still extends the tip. Its transactions were verified on entering the
+        mempool and the balances cannot change while the tip stays the same,
+        so only the header and proof-of-work are checked, in constant time.
+        """
+        with self.write_lock:
+            block = to_block(block)
+            if not self.chain or block.get('index') != len(self.chain):
+                return False
+            try:
+                return self._is_header_valid(block, self.last_block)
+            except EncodingError as e:
+                logger.debug(f"Block rejected: {e}")
+                return False
+
+    def connect_found_block(self, block):
+        """
+        Connects our own candidate from prepare_block() after check_found_block(),
+        without verifying its transactions again. Blocks from peers must go
+        through connect_block().
+        """
+        with self.write_lock:
+            block = to_block(block)
+            if not self.check_found_block(block):
+                return False
+            self._install_chain(self.chain + [block])
+            return True
+
+    def connect_block(self, block):
+        """
+        Connects a block on top of the current tip after check_new_block().
+        Blocks for another branch must come as a whole chain through
+        replace_chain(), which validates it in full.
+        """
+        with self.write_lock:
+            block = to_block(block)
+            if not self.check_new_block(block):
+                return False
+            self._install_chain(self.chain + [block])
+            return True
+
     def replace_chain(self, new_chain):
-        if len(new_chain) > len(self.chain) and self.is_chain_valid(new_chain):
-            self.chain = new_chain
-            all_tx_ids = {self._calculate_transaction_id(tx) for block in self.chain for tx in block['transactions']}
-            self.pending_transactions = [tx for tx in self.pending_transactions if self._calculate_transaction_id(tx) not in all_tx_ids]
-            self.known_pending_tx_hashes = {self._calculate_transaction_id(tx) for tx in self.pending_transactions}
-            self.save_chain()
-            logger.info(f"Chain updated to block #{self.last_block['index']}.")
+        """
+        Replaces the chain with `new_chain` if it is longer and valid. Runs
+        under write_lock; readers keep using the previous state until the new
+        one is published in full.
+        """
+        with self.write_lock:
+            if len(new_chain) <= len(self.chain):
+                return False
+            new_chain = [to_block(block) for block in new_chain]
+            if not self.is_chain_valid(new_chain):
+                return False
+            self._install_chain(new_chain)
             return True
-        return False
+
+    def _install_chain(self, new_chain):
+        # Jika rantai baru hanya memperpanjang rantai lokal, cukup terapkan blok barunya.
+        extends_current = bool(self.chain) and \
+            self.hash_block(new_chain[len(self.chain) - 1]) == self.hash_block(self.last_block)
+        connected_blocks = new_chain[len(self.chain):] if extends_current else new_chain
+        old_chain = self.chain
+        fork_height = len(old_chain) if extends_current else self._fork_height(old_chain, new_chain)
+    
+        self.chain = new_chain
+        all_tx_ids = {self._calculate_transaction_id(tx) for block in connected_blocks for tx in block['transactions']}
+        self.pending_transactions = [tx for tx in self.pending_transactions if self._calculate_transaction_id(tx) not in all_tx_ids]
+        confirmed_ids = self.known_pending_tx_hashes.keys() & all_tx_ids
+        self.known_pending_tx_hashes = {tx['transaction_id']: i for i, tx in enumerate(self.pending_transactions)}
+        if self.mempool_log.needs_compaction(len(self.pending_transactions)):
+            self.mempool_log.compact(self.pending_transactions)
+        else:
+            self.mempool_log.remove(confirmed_ids)
+    
+        if extends_current:
+            for block in connected_blocks:
+                self._apply_block(block)
+                block_hash = self.hash_block(block)
+                self.hash_index[block_hash] = block['index']
+                self.filter_index.connect_block(block, block_hash)
+                self.block_store.connect_block(block, block_hash)
+            self.template.reset(self.balances, self.pending_transactions, self._calculate_transaction_id)
+        else:
+            self.pruned_height = sum(1 for block in self.chain if block.get('pruned'))
+            self._rebuild_state()
+        self.prune()
+        self._publish_state()
+        self.save_chain()
+        logger.info(f"Chain updated to block #{self.last_block['index']}.")
+        self._publish_chain_update(old_chain, fork_height, confirmed_ids)
+
+    def _fork_height(self, old_chain, new_chain):
+        """
+        Returns the height of the first block that differs between two valid chains.
+        """
+        limit = min(len(old_chain), len(new_chain))
+        for height in range(limit):
+            # Hash blok h tercatat sebagai previous_hash blok h+1; hanya blok terakhir perlu di-hash.
+            if height + 1 < limit:
+                same = old_chain[height + 1]['previous_hash'] == new_chain[height + 1]['previous_hash']
+            else:
+                same = self.hash_block(old_chain[height]) == self.hash_block(new_chain[height])
+            if not same:
+                return height
+        return limit
+
+    def _chain_block_hash(self, chain, height):
+        return chain[height + 1]['previous_hash'] if height + 1 < len(chain) else self.hash_block(chain[height])
+
+    def _publish_chain_update(self, old_chain, fork_height, confirmed_ids):
+        for height in range(len(old_chain) - 1, fork_height - 1, -1):
+            self.events.publish(BlockDisconnected(height, self._chain_block_hash(old_chain, height), old_chain[height]))
+        for height in range(fork_height, len(self.chain)):
+            self.events.publish(BlockConnected(height, self._chain_block_hash(self.chain, height), self.chain[height]))
+        for tx_id in confirmed_ids:
+            self.events.publish(TxRemoved(tx_id, 'confirmed'))
+        self.events.publish(TipChanged(len(self.chain) - 1, self.hash_block(self.last_block), False))
+
+    def prune(self):
+        """
+        In pruned mode, writes a state checkpoint and then drops the bodies of
+        all blocks more than prune_depth below the tip. Headers and hashes stay.
+        """
+        if not self.prune_depth:
+            return
+        target = len(self.chain) - 1 - self.prune_depth
+        # Body sejak snapshot terakhir disimpan agar node baru bisa fast sync dari sini.
+        if self.snapshot:
+            target = min(target, self.snapshot['height'])
+        if target + 1 - self.pruned_height < self.PRUNE_BATCH:
+            return
+        
+        # Saldo pada tinggi target = saldo tip dikurangi efek blok di atasnya.
+        balances = dict(self.balances)
+        for block in self.chain[target + 1:]:
+            for tx in block['transactions']:
+                outputs = transaction_output_units(tx)
+                if tx['sender'] != '0':
+                    balances[tx['sender']] += sum(units for _, units in outputs)
+                for recipient, units in outputs:
+                    balances[recipient] -= units
+        self.checkpoint = {
+            'height': target, 'block_hash': self.hash_block(self.chain[target]),
+            'balances': {addr: format_amount(units) for addr, units in balances.items() if units},
+            'keys': self.key_registry.keys_at(target)
+        }
+        # Checkpoint harus tersimpan sebelum rantai yang dipangkas ditulis ke disk.
+        save_json_file(self.checkpoint_file, self.checkpoint)
+        
+        chain = list(self.chain)
+        for height in range(self.pruned_height, target + 1):
+            block = chain[height]
+            for tx in block['transactions']:
+                self.tx_index.pop(self._calculate_transaction_id(tx), None)
+            pruned_block = block_header(block)
+            pruned_block.update({
+                'hash': self.hash_block(block), 'pruned': True,
+                'tx_count': len(block['transactions']), 'transactions': []
+            })
+            chain[height] = Block(pruned_block)
+        self.chain = chain
+        self.pruned_height = target + 1
+        self.block_store.prune(self.pruned_height)
+        logger.info(f"Pruned block bodies below height {self.pruned_height}.")
 
     def save_chain(self):
         save_json_file(self.blockchain_file, self.chain)
+        self.filter_index.save()
+        self.block_store.save()
+        if self._snapshot_dirty:
+            save_json_file(self.snapshot_file, self.snapshot or {})
+            self._snapshot_dirty = False
@@ -0,0 +1,170 @@
+# artha_blockstore.py
+
+import json
+import os
+import threading
+import logging
+
+from artha_utils import get_data_dir, load_json_file, save_json_file, DecimalEncoder
+
+logger = logging.getLogger(__name__)
+
+# Blok teratas yang byte-nya juga disimpan di memori.
+MEMORY_BLOCKS = 200
+# File data dipadatkan jika lebih besar dari ini dan lebih dari dua kali isi yang masih dipakai.
+COMPACT_MIN_BYTES = 8 * 2**20
+
+def encode_block(block):
+    """
+    Returns the wire form of a block: the JSON text it has inside P2P messages.
+    """
+    return json.dumps(block, cls=DecimalEncoder).encode('utf-8')
+
+class BlockWireStore:
+    """
+    Wire-encoded bytes of every unpruned block, so blocks can be sent to peers
+    without serializing them again. Each block is appended to a data file as
+    its JSON followed by a comma; consecutive blocks therefore form a valid
+    JSON array body that can be sent straight from the file. The index of
+    [offset, length, block_hash] entries per height is persisted next to the
+    chain, and the bytes of the newest MEMORY_BLOCKS blocks are also kept in memory.
+    """
+
+    def __init__(self, data_file='block_wire.dat', index_file='block_wire_index.json'):
+        self.path = os.path.join(get_data_dir(), data_file)
+        self.index_file = index_file
+        self.lock = threading.Lock()
+        self.entries = []
+        self.recent = {}
+        self._dirty = False
+        loaded = load_json_file(self.index_file)
+        self._loaded = loaded if isinstance(loaded, list) else []
+        self.size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def rebuild(self, chain, hash_block):
+        # Entri tersimpan dipakai ulang selama hash bloknya masih cocok dan byte-nya ada di file.
+        previous = self._loaded if self._loaded is not None else self.entries
+        self._loaded = None
+        with self.lock:
+            self.entries = []
+            self.recent = {}
+            for height, block in enumerate(chain):
+                if block.get('pruned'):
+                    self.entries.append(None)
+                    continue
+                # Rantai sudah divalidasi, jadi hash blok ini tercatat di blok berikutnya.
+                block_hash = chain[height + 1]['previous_hash'] if height + 1 < len(chain) else hash_block(block)
+                entry = previous[height] if height < len(previous) else None
+                if entry and entry[2] == block_hash and entry[0] + entry[1] < self.size:
+                    self.entries.append(entry)
+                else:
+                    self._append(height, block, block_hash)
+            self._trim_recent(len(chain) - 1)
+            if len(previous) != len(self.entries):
+                self._dirty = True
+
+    def connect_block(self, block, block_hash):
+        with self.lock:
+            del self.entries[block['index']:]
+            self._append(block['index'], block, block_hash)
+            self._trim_recent(block['index'])
+
+    def prune(self, pruned_height):
+        """
+        Forgets the blocks below `pruned_height`; their bytes are dropped at the next compaction.
+        """
+        with self.lock:
+            for height in range(min(pruned_height, len(self.entries))):
+                if self.entries[height]:
+                    self.entries[height] = None
+                    self._dirty = True
+            self._trim_recent(len(self.entries) - 1)
+
+    def _trim_recent(self, tip_height):
+        for height in [h for h in self.recent if h <= tip_height - MEMORY_BLOCKS or h > tip_height
+                       or not self.entries[h]]:
+            del self.recent[height]
+
+    def _append(self, height, block, block_hash):
+        data = encode_block(block)
+        with open(self.path, 'ab') as f:
+            f.write(data + b',')
+        self.entries.append([self.size, len(data), block_hash])
+        self.size += len(data) + 1
+        self.recent[height] = data
+        self._dirty = True
+
+    def get(self, height):
+        """
+        Returns the wire bytes of the block at `height`, or None if it is pruned or unknown.
+        """
+        with self.lock:
+            if height in self.recent:
+                return self.recent[height]
+            entry = self.entries[height] if 0 <= height < len(self.entries) else None
+        if not entry:
+            return None
+        with open(self.path, 'rb') as f:
+            f.seek(entry[0])
+            return f.read(entry[1])
+
+    def block_hash(self, height):
+        with self.lock:
+            entry = self.entries[height] if 0 <= height < len(self.entries) else None
+        return entry[2] if entry else None
+
+    def segments(self, heights):
+        """
+        Returns (data_file, segments) for the blocks at `heights`: segments are
+        to be joined with b',' into a JSON array body, each either bytes or an
+        (offset, length) range of `data_file` covering consecutive blocks. The
+        caller closes `data_file`, which is opened here so a compaction cannot
+        move the ranges. Returns (None, None) if a block is pruned or unknown.
+        """
+        segments = []
+        with self.lock:
+            for height in heights:
+                entry = self.entries[height] if 0 <= height < len(self.entries) else None
+                if not entry:
+                    return None, None
+                if height in self.recent:
+                    segments.append(self.recent[height])
+                    continue
+                last = segments[-1] if segments else None
+                # Blok yang bersebelahan di file digabung menjadi satu range.
+                if isinstance(last, tuple) and last[0] + last[1] + 1 == entry[0]:
+                    segments[-1] = (last[0], last[1] + 1 + entry[1])
+                else:
+                    segments.append((entry[0], entry[1]))
+            # File yang sudah terbuka tetap utuh walau store dipadatkan saat peer masih dilayani.
+            data_file = open(self.path, 'rb') if any(isinstance(segment, tuple) for segment in segments) else None
+        return data_file, segments
+
+    def save(self):
+        with self.lock:
+            if not self._dirty:
+                return
+            live_bytes = sum(entry[1] + 1 for entry in self.entries if entry)
+            if self.size > max(COMPACT_MIN_BYTES, 2 * live_bytes):
+                self._compact()
+            save_json_file(self.index_file, self.entries)
+            self._dirty = False
+
+    def _compact(self):
+        # Ditulis ke file sementara lalu di-rename; pengirim yang masih membaca file lama tidak terganggu.
+        temp_path = self.path + '.tmp'
+        entries = []
+        with open(self.path, 'rb') as source, open(temp_path, 'wb') as target:
+            offset = 0
+            for entry in self.entries:
+                if not entry:
+                    entries.append(None)
+                    continue
+                source.seek(entry[0])
+                target.write(source.read(entry[1] + 1))
+                entries.append([offset, entry[1], entry[2]])
+                offset += entry[1] + 1
+        os.replace(temp_path, self.path)
+        logger.debug(f"Block store compacted from {self.size} to {offset} bytes.")
+        self.entries = entries
+        self.size = offset
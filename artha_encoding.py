@@ -0,0 +1,135 @@
+# artha_encoding.py
+
+import struct
+
+# Encoding biner kanonik untuk header blok (versi >= 7) dan transaksi (versi >= 2).
+# Setiap bentuk diawali tag jenis objek dan versi encoding, sehingga byte yang
+# di-hash atau ditandatangani tidak bisa tertukar antarjenis maupun antarversi.
+#
+# Header:    'H' ENC  version:u16 index:u64 timestamp:f64 difficulty:u64
+#            previous_hash miner_address merkle_root state_hash? [nonce:u64]
+# Transaksi: 'S'/'T' ENC  tx_version:u8 kind:u8 sender payload [timestamp:f64 signature]
+#            payload = recipient amount:u64 (kind 0) | count:u16 (recipient amount:u64)* (kind 1)
+#
+# Teks (alamat, hash, tanda tangan) ditulis sebagai 0x01 len:u16 bytes jika berupa hex
+# huruf kecil dengan panjang genap, selain itu 0x00 len:u16 utf-8. Jumlah ARTH harus
+# dalam bentuk kanonik 8 desimal dan ditulis sebagai satuan dasar.
+
+ENCODING_VERSION = 1
+# Versi blok dan transaksi pertama yang di-hash dan ditandatangani dengan encoding ini.
+BINARY_BLOCK_VERSION = 7
+TX_VERSION = 2
+
+HEADER_TAG = b'H'
+SIGNED_TX_TAG = b'S'
+TX_TAG = b'T'
+
+HEADER_FIELDS = frozenset(('version', 'index', 'timestamp', 'nonce', 'previous_hash', 'miner_address',
+                           'difficulty', 'merkle_root', 'state_hash'))
+
+_HEADER_START = struct.Struct('>cBHQdQ')
+_TX_START = struct.Struct('>cBBB')
+_U16 = struct.Struct('>H')
+_U64 = struct.Struct('>Q')
+_F64 = struct.Struct('>d')
+
+class EncodingError(ValueError):
+    """Raised when a value has no canonical binary encoding."""
+
+def _text(value):
+    if value.__class__ is not str:
+        raise EncodingError(f"Expected a string, got {type(value).__name__}")
+    if len(value) % 2 == 0 and value == value.lower():
+        try:
+            raw = bytes.fromhex(value)
+        except ValueError:
+            raw = None
+        # fromhex melewatkan spasi; panjang yang cocok memastikan string-nya hex murni.
+        if raw is not None and len(raw) * 2 == len(value):
+            if len(raw) > 0xFFFF:
+                raise EncodingError("Value too long to encode")
+            return b'\x01' + _U16.pack(len(raw)) + raw
+    raw = value.encode('utf-8')
+    if len(raw) > 0xFFFF:
+        raise EncodingError("Value too long to encode")
+    return b'\x00' + _U16.pack(len(raw)) + raw
+
+def _amount(value):
+    if value.__class__ is str and len(value) > 9 and value[-9] == '.':
+        whole, frac = value[:-9], value[-8:]
+        if whole.isdigit() and frac.isdigit() and (whole + frac).isascii() and (whole == '0' or whole[0] != '0'):
+            units = int(whole + frac)
+            if units < 2**64:
+                return _U64.pack(units)
+    raise EncodingError(f"Amount is not canonical: {value!r}")
+
+def _uint(struct_format, value):
+    if value.__class__ is not int or value < 0:
+        raise EncodingError(f"Expected a non-negative integer, got {value!r}")
+    try:
+        return struct_format.pack(value)
+    except struct.error:
+        raise EncodingError(f"Integer out of range: {value}") from None
+
+def _timestamp_value(value):
+    if value.__class__ not in (int, float):
+        raise EncodingError(f"Expected a number, got {value!r}")
+    return value
+
+def encode_header(header, include_nonce=True):
+    """
+    Encodes a version 7+ block header. Fields outside HEADER_FIELDS have no
+    place in the encoding, so a header carrying them is rejected instead of
+    hashing to the same value as one without.
+    """
+    extra = header.keys() - HEADER_FIELDS
+    if extra:
+        raise EncodingError(f"Unknown header fields: {sorted(extra)}")
+    try:
+        if any(header[key].__class__ is not int for key in ('version', 'index', 'difficulty')):
+            raise EncodingError("Header version, index and difficulty must be integers")
+        start = _HEADER_START.pack(HEADER_TAG, ENCODING_VERSION, header['version'], header['index'],
+                                   _timestamp_value(header['timestamp']), header['difficulty'])
+    except (KeyError, struct.error) as e:
+        raise EncodingError(f"Invalid header: {e}") from None
+    parts = [start, _text(header['previous_hash']), _text(header['miner_address']), _text(header.get('merkle_root'))]
+    state_hash = header.get('state_hash')
+    parts.append(b'\x00' if state_hash is None else b'\x01' + _text(state_hash))
+    if include_nonce:
+        parts.append(_uint(_U64, header.get('nonce')))
+    return b''.join(parts)
+
+def _transaction_body(tag, tx):
+    sender = tx['sender']
+    if 'outputs' in tx:
+        outputs = tx['outputs']
+        parts = [_TX_START.pack(tag, ENCODING_VERSION, TX_VERSION, 1), _text(sender), _uint(_U16, len(outputs))]
+        for recipient, amount in outputs:
+            parts.append(_text(recipient))
+            parts.append(_amount(amount))
+    else:
+        parts = [_TX_START.pack(tag, ENCODING_VERSION, TX_VERSION, 0), _text(sender),
+                 _text(tx['recipient']), _amount(tx['amount'])]
+    return parts
+
+def encode_signed_transaction(tx):
+    """
+    Encodes the part of a version 2 transaction that its signature covers.
+    """
+    try:
+        return b''.join(_transaction_body(SIGNED_TX_TAG, tx))
+    except (KeyError, TypeError) as e:
+        raise EncodingError(f"Invalid transaction: {e}") from None
+
+def encode_transaction(tx):
+    """
+    Encodes a version 2 transaction for its ID: the signed part, the
+    timestamp and the signature. Like the JSON ID, the public key is left out.
+    """
+    try:
+        parts = _transaction_body(TX_TAG, tx)
+        parts.append(_F64.pack(_timestamp_value(tx['timestamp'])))
+        parts.append(_text(tx['signature']))
+    except (KeyError, TypeError) as e:
+        raise EncodingError(f"Invalid transaction: {e}") from None
+    return b''.join(parts)
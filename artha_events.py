@@ -0,0 +1,144 @@
+# artha_events.py
+
+import logging
+import queue
+import threading
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# Jumlah event yang ditampung per pelanggan sebelum event baru dibuang.
+DEFAULT_QUEUE_SIZE = 10000
+
+class BlockConnected(namedtuple('BlockConnected', 'height block_hash block')):
+    """A block was appended to the best chain."""
+    __slots__ = ()
+
+class BlockDisconnected(namedtuple('BlockDisconnected', 'height block_hash block')):
+    """A block was taken off the best chain by a reorganization."""
+    __slots__ = ()
+
+class TipChanged(namedtuple('TipChanged', 'height block_hash reset')):
+    """
+    Published once after every chain update, following its BlockConnected and
+    BlockDisconnected events. `reset` is True when the chain was replaced
+    without per-block events (snapshot install) and consumers must rescan.
+    """
+    __slots__ = ()
+
+class TxAdded(namedtuple('TxAdded', 'tx_id tx')):
+    """A transaction was accepted into the mempool."""
+    __slots__ = ()
+
+class TxRemoved(namedtuple('TxRemoved', 'tx_id reason')):
+    """A transaction left the mempool; `reason` is 'confirmed' or 'cleared'."""
+    __slots__ = ()
+
+class PeerUp(namedtuple('PeerUp', 'peer')):
+    __slots__ = ()
+
+class PeerDown(namedtuple('PeerDown', 'peer reason')):
+    __slots__ = ()
+
+_CLOSED = object()
+
+class Subscription:
+    """
+    A subscriber's queue of events. Events are offered without blocking: when
+    the queue is full they are dropped and counted in `missed`, and the
+    subscriber should rebuild its view from the current state.
+    """
+
+    def __init__(self, bus, event_types, maxsize, callback=None):
+        self.bus = bus
+        self.event_types = tuple(event_types) if event_types else None
+        self.queue = queue.Queue(maxsize)
+        self.missed = 0
+        self.callback = callback
+        if callback:
+            threading.Thread(target=self._dispatch_loop, daemon=True).start()
+
+    def _offer(self, event):
+        if self.event_types and not isinstance(event, self.event_types):
+            return
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.missed += 1
+
+    def get(self, timeout=None):
+        """
+        Returns the next event, waiting up to `timeout` seconds, or None.
+        """
+        try:
+            event = self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        return None if event is _CLOSED else event
+
+    def drain(self):
+        """
+        Returns all events queued so far without waiting.
+        """
+        events = []
+        while True:
+            try:
+                event = self.queue.get_nowait()
+            except queue.Empty:
+                return events
+            if event is not _CLOSED:
+                events.append(event)
+
+    def take_missed(self):
+        """
+        Returns how many events were dropped since the last call and resets the count.
+        """
+        missed, self.missed = self.missed, 0
+        return missed
+
+    def close(self):
+        self.bus.unsubscribe(self)
+        try:
+            self.queue.put_nowait(_CLOSED)
+        except queue.Full:
+            pass
+
+    def _dispatch_loop(self):
+        while True:
+            event = self.queue.get()
+            if event is _CLOSED:
+                return
+            try:
+                self.callback(event)
+            except Exception as e:
+                logger.error(f"Event subscriber failed on {type(event).__name__}: {e}")
+
+class EventBus:
+    """
+    Typed chain, mempool and peer events. publish() never blocks: each
+    subscriber has its own bounded queue, read with Subscription.get() or
+    handed to a callback on the subscription's own thread.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = []
+
+    def subscribe(self, event_types=None, callback=None, maxsize=DEFAULT_QUEUE_SIZE):
+        """
+        Subscribes to events of the given classes (all events if None). With a
+        callback, events are delivered to it in order on a dedicated thread.
+        """
+        subscription = Subscription(self, event_types, maxsize, callback)
+        with self.lock:
+            self.subscriptions = self.subscriptions + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions = [s for s in self.subscriptions if s is not subscription]
+
+    def publish(self, event):
+        # Daftar pelanggan diganti (bukan diubah) saat subscribe, jadi aman dibaca tanpa lock.
+        for subscription in self.subscriptions:
+            subscription._offer(event)
@@ -0,0 +1,125 @@
+# artha_fastsync.py
+
+import time
+import logging
+
+from artha_utils import block_version, merkle_root
+
+logger = logging.getLogger(__name__)
+
+MAX_HEADERS_PER_MESSAGE = 2000
+MAX_BLOCKS_PER_REQUEST = 50
+# Sinkronisasi dibatalkan jika peer tidak menjawab selama ini.
+SNAPSHOT_SYNC_TIMEOUT = 120
+
+class SnapshotSync:
+    """
+    Fast sync of a node without blocks from a single peer: all headers first,
+    then the balance snapshot committed in the state_hash of a version 3 block,
+    then only the blocks after the snapshot, which are validated as usual.
+
+    Node -> peer: GET_SNAPSHOT_INFO {}, GET_HEADERS {start, end},
+                  GET_SNAPSHOT_CHUNK {height, index}, GET_BLOCKS {heights}
+    Peer -> node: SNAPSHOT_INFO {height, block_hash, state_hash, chunk_hashes},
+                  HEADERS {start, headers}, SNAPSHOT_CHUNK {height, index, entries}, BLOCKS {blocks}
+    """
+
+    def __init__(self, node, peer):
+        self.node = node
+        self.blockchain = node.blockchain
+        self.peer = peer
+        self.info = None
+        self.headers = []
+        self.chunks = {}
+        self.tip_height = 0
+        self.started = time.time()
+        self.last_progress = self.started
+
+    def start(self):
+        logger.info(f"Starting snapshot sync from {self.peer}")
+        self.node.send_message(self.peer, 'GET_SNAPSHOT_INFO', {})
+
+    def is_timed_out(self):
+        return time.time() - self.last_progress > SNAPSHOT_SYNC_TIMEOUT
+
+    def on_snapshot_info(self, data):
+        if not data.get('height'):
+            return self.abort("peer has no state snapshot")
+        if merkle_root(data['chunk_hashes']) != data['state_hash']:
+            return self.abort("chunk hashes do not match the state hash")
+        self.info = data
+        self.last_progress = time.time()
+        self._request_headers()
+
+    def _request_headers(self):
+        start = len(self.headers)
+        self.node.send_message(self.peer, 'GET_HEADERS', {'start': start, 'end': start + MAX_HEADERS_PER_MESSAGE})
+
+    def on_headers(self, data):
+        if self.info is None or data['start'] != len(self.headers):
+            return
+        self.headers.extend(data['headers'])
+        self.last_progress = time.time()
+        if len(data['headers']) == MAX_HEADERS_PER_MESSAGE:
+            return self._request_headers()
+
+        height = self.info['height']
+        if len(self.headers) <= height + 1 or not self.blockchain.is_header_chain_valid(self.headers):
+            return self.abort("invalid header chain")
+        # Snapshot hanya dipercaya jika hash-nya di-commit oleh header yang sudah diverifikasi PoW-nya.
+        committing_header = self.headers[height + 1]
+        if block_version(committing_header) < 3 or committing_header.get('state_hash') != self.info['state_hash'] or \
+           self.headers[height]['hash'] != self.info['block_hash']:
+            return self.abort("state hash is not committed in the header chain")
+
+        self.tip_height = len(self.headers) - 1
+        logger.info(f"Headers verified up to #{self.tip_height}, downloading snapshot at height {height}.")
+        if not self.info['chunk_hashes']:
+            return self._install()
+        for index in range(len(self.info['chunk_hashes'])):
+            self.node.send_message(self.peer, 'GET_SNAPSHOT_CHUNK', {'height': height, 'index': index})
+
+    def on_snapshot_chunk(self, data):
+        if self.info is None or data.get('height') != self.info['height']:
+            return
+        index = data['index']
+        if not 0 <= index < len(self.info['chunk_hashes']) or \
+           self.blockchain.chunk_hash(data['entries']) != self.info['chunk_hashes'][index]:
+            return self.abort(f"invalid snapshot chunk {index}")
+        self.chunks[index] = data['entries']
+        self.last_progress = time.time()
+        if len(self.chunks) == len(self.info['chunk_hashes']):
+            self._install()
+
+    def _install(self):
+        snapshot = {
+            'height': self.info['height'], 'block_hash': self.info['block_hash'],
+            'state_hash': self.info['state_hash'],
+            'chunks': [self.chunks[i] for i in range(len(self.info['chunk_hashes']))]
+        }
+        self.blockchain.install_snapshot(self.headers, snapshot)
+        self.headers = []
+        self._request_blocks()
+
+    def _request_blocks(self):
+        next_height = self.blockchain.get_current_block_height() + 1
+        if next_height > self.tip_height:
+            return self._finish()
+        heights = list(range(next_height, min(self.tip_height + 1, next_height + MAX_BLOCKS_PER_REQUEST)))
+        self.node.send_message(self.peer, 'GET_BLOCKS', {'heights': heights})
+
+    def on_blocks(self, data):
+        blocks = sorted(data['blocks'], key=lambda b: b['index'])
+        if not blocks or not self.blockchain.replace_chain(self.blockchain.state.chain + blocks):
+            return self.abort("peer sent blocks that do not connect")
+        self.last_progress = time.time()
+        self._request_blocks()
+
+    def _finish(self):
+        logger.info(f"Snapshot sync finished at block #{self.blockchain.get_current_block_height()} "
+                    f"in {time.time() - self.started:.1f}s.")
+        self.node.finish_snapshot_sync(self, success=True)
+
+    def abort(self, reason):
+        logger.warning(f"Snapshot sync from {self.peer} failed: {reason}")
+        self.node.finish_snapshot_sync(self, success=False)
@@ -0,0 +1,133 @@
+# artha_filters.py
+
+import hashlib
+import logging
+
+from artha_utils import load_json_file, save_json_file, transaction_outputs
+
+logger = logging.getLogger(__name__)
+
+# Parameter Golomb-Rice seperti BIP158: peluang false positive sekitar 1/784931.
+FILTER_P = 19
+FILTER_M = 784931
+
+def block_addresses(block):
+    """
+    Returns the set of sender and recipient addresses touched by a block.
+    """
+    addresses = set()
+    for tx in block['transactions']:
+        if tx['sender'] != '0':
+            addresses.add(tx['sender'])
+        addresses.update(recipient for recipient, _ in transaction_outputs(tx))
+    return addresses
+
+def _hashed_values(items, key, modulus):
+    values = []
+    for item in items:
+        digest = hashlib.sha256(key + item.encode('utf-8')).digest()
+        values.append((int.from_bytes(digest[:8], 'big') * modulus) >> 64)
+    return sorted(values)
+
+def build_filter(block_hash, addresses):
+    """
+    Builds a Golomb-coded set over the addresses of one block. The filter is
+    keyed with the block hash, so it is returned together with it.
+    """
+    key = bytes.fromhex(block_hash)[:16]
+    n = len(addresses)
+    bits = 0
+    bit_count = 0
+    last = 0
+    for value in _hashed_values(addresses, key, n * FILTER_M):
+        delta = value - last
+        last = value
+        quotient = delta >> FILTER_P
+        # Unary: `quotient` bit 1 diikuti bit 0, lalu sisa FILTER_P bit.
+        bits = (bits << (quotient + 1)) | (((1 << quotient) - 1) << 1)
+        bits = (bits << FILTER_P) | (delta & ((1 << FILTER_P) - 1))
+        bit_count += quotient + 1 + FILTER_P
+    padding = (-bit_count) % 8
+    data = (bits << padding).to_bytes((bit_count + padding) // 8, 'big') if bit_count else b''
+    return {'block_hash': block_hash, 'n': n, 'data': data.hex()}
+
+def _decode_values(block_filter):
+    data = bytes.fromhex(block_filter['data'])
+    bits = int.from_bytes(data, 'big') if data else 0
+    position = len(data) * 8
+    value = 0
+    for _ in range(block_filter['n']):
+        quotient = 0
+        while (bits >> (position - 1)) & 1:
+            quotient += 1
+            position -= 1
+        position -= 1
+        position -= FILTER_P
+        remainder = (bits >> position) & ((1 << FILTER_P) - 1)
+        value += (quotient << FILTER_P) | remainder
+        yield value
+
+def filter_matches_any(block_filter, addresses):
+    """
+    Returns True if any of `addresses` may be in the block (false positives are
+    possible, false negatives are not).
+    """
+    if not block_filter:
+        return False
+    n = block_filter['n']
+    if not n or not addresses:
+        return False
+    key = bytes.fromhex(block_filter['block_hash'])[:16]
+    wanted = _hashed_values(addresses, key, n * FILTER_M)
+    i = 0
+    for value in _decode_values(block_filter):
+        while i < len(wanted) and wanted[i] < value:
+            i += 1
+        if i == len(wanted):
+            return False
+        if wanted[i] == value:
+            return True
+    return False
+
+class BlockFilterIndex:
+    """
+    Per-block address filters of a full node, persisted next to the chain.
+    """
+
+    def __init__(self, filters_file='block_filters.json'):
+        self.filters_file = filters_file
+        self.filters = []
+        self._dirty = False
+        loaded = load_json_file(self.filters_file)
+        self._loaded = loaded if isinstance(loaded, list) else []
+
+    def rebuild(self, chain, hash_block):
+        # Filter tersimpan dipakai ulang selama hash bloknya masih cocok.
+        previous = self._loaded or self.filters
+        self.filters = []
+        for height, block in enumerate(chain):
+            block_hash = hash_block(block)
+            if height < len(previous) and previous[height] and previous[height].get('block_hash') == block_hash:
+                self.filters.append(previous[height])
+            elif block.get('pruned'):
+                # Body sudah dipangkas: filter tidak bisa dibangun ulang.
+                self.filters.append(None)
+            else:
+                self.filters.append(build_filter(block_hash, block_addresses(block)))
+                self._dirty = True
+        self._loaded = None
+        if len(previous) != len(self.filters):
+            self._dirty = True
+
+    def connect_block(self, block, block_hash):
+        del self.filters[block['index']:]
+        self.filters.append(build_filter(block_hash, block_addresses(block)))
+        self._dirty = True
+
+    def get_filters(self, start, end):
+        return self.filters[max(0, start):max(0, end)]
+
+    def save(self):
+        if self._dirty:
+            save_json_file(self.filters_file, self.filters)
+            self._dirty = False
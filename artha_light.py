@@ -0,0 +1,129 @@
+# artha_light.py
+
+import threading
+import time
+import logging
+
+from artha_utils import load_json_file, save_json_file
+from artha_fastsync import MAX_HEADERS_PER_MESSAGE
+
+logger = logging.getLogger(__name__)
+
+# Sinkronisasi header dibatalkan jika peer tidak menjawab selama ini.
+HEADER_SYNC_TIMEOUT = 120
+
+class HeaderChain:
+    """
+    Block headers without bodies, for light clients such as point-of-sale
+    terminals: enough to check Merkle proofs of payments. A header is only
+    connected if it links to the one before it, carries a valid proof-of-work
+    and has the difficulty the adjustment schedule demands, and a branch
+    only replaces the current one if it is longer. `blockchain` is only used
+    for its consensus rules; its chain is not touched.
+    """
+
+    def __init__(self, blockchain, headers_file='light_headers.json'):
+        self.blockchain = blockchain
+        self.headers_file = headers_file
+        self.lock = threading.Lock()
+        self.headers = []
+        stored = load_json_file(headers_file)
+        if stored and self._is_branch_valid(0, stored):
+            self.headers = stored
+            logger.info(f"Header chain loaded. Height: {self.height}")
+
+    @property
+    def height(self):
+        return len(self.headers) - 1
+
+    def get_block_hash(self, height):
+        headers = self.headers
+        return headers[height]['hash'] if 0 <= height < len(headers) else None
+
+    def connect(self, start, headers):
+        """
+        Connects `headers` (heights start, start + 1, ...) on top of the header
+        at start - 1. Returns False and keeps the current headers if they are
+        invalid or do not make the chain longer.
+        """
+        with self.lock:
+            if not headers or not 0 <= start <= len(self.headers) or start + len(headers) <= len(self.headers):
+                return False
+            if not self._is_branch_valid(start, headers):
+                return False
+            self.headers = self.headers[:start] + list(headers)
+            save_json_file(self.headers_file, self.headers)
+        logger.info(f"Header chain extended to #{self.height}.")
+        return True
+
+    def _is_branch_valid(self, start, headers):
+        blockchain = self.blockchain
+        interval = blockchain.DIFFICULTY_ADJUSTMENT_INTERVAL
+        # Jadwal kesulitan hanya melihat header terakhir dan yang `interval` blok sebelumnya.
+        window = self.headers[max(0, start - interval):start]
+        for i, header in enumerate(headers):
+            previous = window[-1] if window else None
+            if header.get('index') != start + i:
+                return False
+            if previous is None and header.get('previous_hash') != '0':
+                return False
+            if not blockchain.is_header_valid(header, previous):
+                return False
+            # Tanpa cek ini peer bisa membuat cabang header murah dengan kesulitan 1.
+            if previous is not None and header['difficulty'] != blockchain.get_current_difficulty(window):
+                return False
+            window.append(header)
+            if len(window) > interval:
+                del window[0]
+        return True
+
+class HeaderSync:
+    """
+    Downloads the headers above the local tip from a single peer into a
+    HeaderChain. If the peer's chain forks below the local tip, the download
+    restarts from genesis and HeaderChain.connect() keeps the longer chain.
+
+    Node -> peer: GET_HEADERS {start, end}
+    Peer -> node: HEADERS {start, headers}
+    """
+
+    def __init__(self, node, peer, header_chain):
+        self.node = node
+        self.peer = peer
+        self.header_chain = header_chain
+        self.first_height = header_chain.height + 1
+        self.headers = []
+        self.last_progress = time.time()
+
+    def start(self):
+        logger.info(f"Starting header sync from {self.peer} at #{self.first_height}")
+        self._request_headers()
+
+    def is_timed_out(self):
+        return time.time() - self.last_progress > HEADER_SYNC_TIMEOUT
+
+    def _request_headers(self):
+        start = self.first_height + len(self.headers)
+        self.node.send_message(self.peer, 'GET_HEADERS', {'start': start, 'end': start + MAX_HEADERS_PER_MESSAGE})
+
+    def on_headers(self, data):
+        if data.get('start') != self.first_height + len(self.headers):
+            return
+        self.headers.extend(data['headers'])
+        self.last_progress = time.time()
+        if len(data['headers']) == MAX_HEADERS_PER_MESSAGE:
+            return self._request_headers()
+
+        if not self.headers:
+            return self.node.finish_header_sync(self)
+        if self.first_height and self.headers[0].get('previous_hash') != self.header_chain.get_block_hash(self.first_height - 1):
+            # Rantai peer bercabang di bawah tip lokal: unduh ulang dari genesis.
+            self.first_height, self.headers = 0, []
+            return self._request_headers()
+        if not self.header_chain.connect(self.first_height, self.headers):
+            logger.warning(f"Header sync from {self.peer} failed: invalid or shorter header chain")
+        self.node.finish_header_sync(self)
+
+    def abort(self, reason):
+        logger.warning(f"Header sync from {self.peer} failed: {reason}")
+        self.node.finish_header_sync(self)
@@ -0,0 +1,77 @@
+# artha_mempool.py
+
+import json
+import os
+import threading
+import logging
+
+from artha_utils import get_data_dir, DecimalEncoder
+
+logger = logging.getLogger(__name__)
+
+# Log dipadatkan jika jumlah baris melebihi ini dan lebih dari dua kali ukuran mempool.
+COMPACT_MIN_LINES = 1000
+
+class MempoolLog:
+    """
+    Append-only log of the mempool in the data directory. Every accepted
+    transaction is appended as an 'add' entry and confirmed ones as a 'remove'
+    entry; compact() rewrites the file with only the current transactions.
+    """
+
+    def __init__(self, log_file='mempool.log'):
+        self.path = os.path.join(get_data_dir(), log_file)
+        self.lock = threading.Lock()
+        self.line_count = 0
+
+    def load(self):
+        """
+        Replays the log and returns the transactions that were still pending,
+        in the order they were accepted.
+        """
+        transactions = {}
+        if not os.path.exists(self.path):
+            return []
+        with self.lock, open(self.path, 'r') as f:
+            self.line_count = 0
+            for line in f:
+                self.line_count += 1
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Baris terakhir bisa terpotong jika proses mati saat menulis.
+                    logger.warning(f"Skipping corrupt mempool log entry in {self.path}")
+                    continue
+                if entry.get('op') == 'add':
+                    transactions[entry['tx']['transaction_id']] = entry['tx']
+                elif entry.get('op') == 'remove':
+                    for tx_id in entry['ids']:
+                        transactions.pop(tx_id, None)
+        return list(transactions.values())
+
+    def _append(self, entry):
+        with self.lock:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(entry, cls=DecimalEncoder) + '\n')
+            self.line_count += 1
+
+    def append(self, tx):
+        self._append({'op': 'add', 'tx': tx})
+
+    def remove(self, tx_ids):
+        if tx_ids:
+            self._append({'op': 'remove', 'ids': sorted(tx_ids)})
+
+    def needs_compaction(self, pending_count):
+        return self.line_count > max(COMPACT_MIN_LINES, 2 * pending_count)
+
+    def compact(self, pending_transactions):
+        # Ditulis ke file sementara lalu di-rename agar log lama tetap utuh jika gagal.
+        temp_path = self.path + '.tmp'
+        with self.lock:
+            with open(temp_path, 'w') as f:
+                for tx in pending_transactions:
+                    f.write(json.dumps({'op': 'add', 'tx': tx}, cls=DecimalEncoder) + '\n')
+            os.replace(temp_path, self.path)
+            self.line_count = len(pending_transactions)
+        logger.debug(f"Mempool log compacted to {self.line_count} transactions.")
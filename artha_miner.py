@@ -2,14 +2,21 @@ import time
 import logging
 import os
 import sys
+import argparse
 import getpass
 import threading
 from artha_blockchain import ArthaBlockchain
-from artha_wallet import ArthaWallet
+from artha_wallet import ArthaWallet, KEY_TYPE_ED25519, KEY_TYPE_RSA
 from artha_node import ArthaNode
+from artha_events import TipChanged, TxAdded
+from artha_mining import MiningEngine, MinerStats, default_worker_count
+from artha_utils import save_json_file, proof_prefix
+from artha_workserver import WorkServer, WORK_SERVER_HOST
+from artha_rpc import RpcServer, RPC_HOST
 
 MINER_HOST = '0.0.0.0'
 MINER_PORT = 5001
+STATS_INTERVAL = 30
 
 def setup_logging(port):
     log_dir = os.path.join(os.path.expanduser("~"), ".artha_chain", "logs")
@@ -35,70 +42,142 @@ def setup_logging(port):
     console_handler.setFormatter(formatter)
     root_logger.addHandler(console_handler)
 
-def mine_a_block(blockchain, miner_address):
-    last_block = blockchain.last_block
+def mine_a_block(blockchain, miner_address, engine, stats):
+    last_block = blockchain.state.tip
     if not last_block:
         return None
     
-    previous_hash = blockchain.hash_block(last_block)
-    nonce = 0
+    candidate = blockchain.prepare_block(miner_address)
+    if not candidate:
+        return None
+    
+    def tip_changed():
+        return blockchain.state.tip is not last_block
     
-    while not blockchain.is_valid_proof(previous_hash, nonce, blockchain.get_current_difficulty()):
-        nonce += 1
-        if blockchain.last_block and blockchain.last_block['index'] > last_block['index']:
+    job_started = time.perf_counter()
+    nonce = engine.search(proof_prefix(candidate), candidate['difficulty'], is_stale=tip_changed)
+    job_time = time.perf_counter() - job_started
+    if nonce is None:
+        if tip_changed():
             logging.info("Mining interrupted by new block from network.")
-            return None
+            stats.record_job(job_time, 'stale')
+        else:
+            logging.info("Block template changed. Refreshing mining job...")
+            stats.record_job(job_time, 'refreshed')
+        return None
     
-    if blockchain.last_block and blockchain.hash_block(blockchain.last_block) != previous_hash:
+    stats.mark_solution()
+    if blockchain.state.tip_hash != candidate['previous_hash']:
         logging.warning("Mined a block for an orphaned chain. Discarding.")
+        stats.record_job(job_time, 'orphaned')
         return None
     
-    return blockchain.new_block(nonce, previous_hash, miner_address)
+    stats.record_job(job_time, 'found')
+    candidate['nonce'] = nonce
+    return candidate
 
-def mining_worker(blockchain, node, miner_address, new_tx_event):
+def stats_reporter(stats, port):
+    stats_file = f"miner_stats_{port}.json"
+    stats.sample()
     while True:
-        triggered = new_tx_event.wait(timeout=blockchain.TARGET_BLOCK_TIME_SECONDS)
-        if triggered:
-            logging.info("New transaction detected! Triggering mining...")
-        else:
-            logging.info("Timeout reached. Mining a block...")
+        time.sleep(STATS_INTERVAL)
+        stats.sample()
+        save_json_file(stats_file, stats.snapshot())
+        logging.info(f"Statistik: {stats.summary()}")
+
+def mining_worker(blockchain, node, miner_address, tx_events, engine, stats):
+    mine_now = False
+    while True:
+        if not mine_now:
+            if tx_events.get(timeout=blockchain.TARGET_BLOCK_TIME_SECONDS):
+                logging.info("New transaction detected! Triggering mining...")
+            else:
+                logging.info("Timeout reached. Mining a block...")
         
-        new_block = mine_a_block(blockchain, miner_address)
+        # Transaksi yang datang selama job berjalan memicu job berikutnya.
+        tx_events.drain()
+        tip = blockchain.state.tip
+        new_block = mine_a_block(blockchain, miner_address, engine, stats)
         if new_block:
-            if node.handle_new_block(new_block):
+            # Transaksi kandidat sudah diverifikasi: cukup cek header dan tip, siarkan, lalu sambungkan.
+            if blockchain.check_found_block(new_block):
                 logging.info(f"Successfully mined and broadcasting block #{new_block['index']}")
-                node.broadcast_message('NEW_BLOCK', {'block': new_block})
+                node.broadcast_block(new_block)
+                stats.record_broadcast()
+                if not blockchain.connect_found_block(new_block):
+                    logging.warning(f"Mined block #{new_block['index']} was broadcast but no longer extends the tip.")
+            else:
+                stats.record_rejected()
         
-        if new_tx_event.is_set():
-            new_tx_event.clear()
-        time.sleep(1)
+        # Job basi dibuang karena tip berubah: langsung menambang di atas tip baru.
+        mine_now = new_block is None and blockchain.state.tip is not tip
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="ArthaChain miner")
+    parser.add_argument('port', nargs='?', type=int, default=MINER_PORT)
+    parser.add_argument('-w', '--workers', type=int, default=default_worker_count(),
+                        help="Jumlah proses penambang lokal, 0 untuk hanya melayani worker (default: jumlah core CPU)")
+    parser.add_argument('--work-server', type=int, metavar='PORT',
+                        help="Jalankan work server untuk worker eksternal (artha_worker.py) di port ini")
+    parser.add_argument('--work-host', default=WORK_SERVER_HOST,
+                        help=f"Alamat bind work server (default: {WORK_SERVER_HOST})")
+    parser.add_argument('--rpc', type=int, metavar='PORT',
+                        help="Jalankan server JSON-RPC lokal di port ini")
+    parser.add_argument('--rpc-host', default=RPC_HOST,
+                        help=f"Alamat bind server JSON-RPC (default: {RPC_HOST})")
+    parser.add_argument('--prune', type=int, metavar='DEPTH',
+                        help="Mode pangkas: buang body blok yang lebih dalam dari DEPTH blok di bawah tip")
+    parser.add_argument('--key-type', choices=[KEY_TYPE_ED25519, KEY_TYPE_RSA], default=KEY_TYPE_ED25519,
+                        help="Jenis kunci untuk dompet baru (default: ed25519)")
+    return parser.parse_args()
 
 def run_miner():
-    port = int(sys.argv[1]) if len(sys.argv) > 1 else MINER_PORT
+    args = parse_args()
+    port = args.port
     setup_logging(port)
     
     try:
         password = getpass.getpass("Masukkan password dompet Miner: ")
-        wallet = ArthaWallet(password=password)
+        wallet = ArthaWallet(password=password, key_type=args.key_type)
     except Exception as e:
         print(f"Gagal memuat dompet: {e}")
         return
         
     miner_address = wallet.get_public_address()
-    blockchain = ArthaBlockchain()
-    new_tx_event = threading.Event()
-    node = ArthaNode(MINER_HOST, port, blockchain, is_miner=True, new_tx_event=new_tx_event)
+    # Proses worker dibuat sebelum thread node berjalan agar fork tetap aman.
+    engine = MiningEngine(args.workers) if args.workers > 0 else None
+    stats = MinerStats(engine)
+    blockchain = ArthaBlockchain(prune_depth=args.prune)
+    node = ArthaNode(MINER_HOST, port, blockchain, is_miner=True)
+    if engine:
+        tx_events = blockchain.events.subscribe((TxAdded,))
+        # PoW mengikat Merkle root, jadi job juga diperbarui saat template berubah.
+        blockchain.events.subscribe((TipChanged, TxAdded), callback=lambda event: engine.cancel())
+    
+    work_server = None
+    if args.work_server:
+        work_server = WorkServer(blockchain, node, miner_address, args.work_host, args.work_server, stats=stats)
+        work_server.start()
     node.start()
+    rpc_server = None
+    if args.rpc:
+        rpc_server = RpcServer(blockchain, node, args.rpc_host, args.rpc)
+        rpc_server.start()
     
     logging.info(f"\nPENAMBANG HYBRID DIMULAI\nAlamat: {miner_address}\nNode di: {MINER_HOST}:{port}")
-    logging.info(f"Menambang setiap ada transaksi ATAU setiap ~{blockchain.TARGET_BLOCK_TIME_SECONDS} detik.")
+    if work_server:
+        logging.info(f"Work server untuk worker eksternal di {args.work_host}:{args.work_server}")
+    
+    if engine:
+        logging.info(f"Menambang setiap ada transaksi ATAU setiap ~{blockchain.TARGET_BLOCK_TIME_SECONDS} detik.")
+        miner_thread = threading.Thread(
+            target=mining_worker,
+            args=(blockchain, node, miner_address, tx_events, engine, stats),
+            daemon=True
+        )
+        miner_thread.start()
     
-    miner_thread = threading.Thread(
-        target=mining_worker,
-        args=(blockchain, node, miner_address, new_tx_event),
-        daemon=True
-    )
-    miner_thread.start()
+    threading.Thread(target=stats_reporter, args=(stats, port), daemon=True).start()
     
     try:
         while True:
@@ -106,6 +185,12 @@ def run_miner():
     except KeyboardInterrupt:
         logging.info("\nPenambang dihentikan.")
     finally:
+        if work_server:
+            work_server.stop()
+        if rpc_server:
+            rpc_server.stop()
+        if engine:
+            engine.stop()
         node.stop()
 
 if __name__ == '__main__':
@@ -0,0 +1,274 @@
+# artha_mining.py
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Jumlah nonce yang diperiksa worker sebelum mengecek apakah job masih berlaku.
+NONCE_CHUNK_SIZE = 20000
+
+def default_worker_count():
+    """
+    Returns the number of mining processes to use when none is configured.
+    """
+    return os.cpu_count() or 1
+
+def proof_target(difficulty):
+    """
+    Returns the proof-of-work target as 32 big-endian bytes. A digest is a valid
+    proof when it compares less than or equal to these bytes.
+    """
+    target = (2**256 - 1) // (difficulty if difficulty > 0 else 1)
+    return target.to_bytes(32, 'big')
+
+def prefix_state(prefix):
+    """
+    Returns a SHA-256 state that has already absorbed the proof prefix
+    (see artha_utils.proof_prefix).
+    """
+    return hashlib.sha256(prefix.encode('utf-8'))
+
+def search_nonce(prefix, target, start, end):
+    """
+    Scans nonces in [start, end) and returns the first one whose proof hash
+    meets `target`, or None. `prefix` is a state from prefix_state() and
+    `target` comes from proof_target(); both are fixed for the whole job.
+    """
+    copy_prefix = prefix.copy
+    for nonce in range(start, end):
+        guess = copy_prefix()
+        guess.update(b'%d' % nonce)
+        if guess.digest() <= target:
+            return nonce
+    return None
+
+def _search_worker(worker_index, worker_count, job_queue, result_queue, current_job, hash_counts):
+    """
+    Worker process loop. Each job is searched in interleaved chunks so that
+    worker i covers nonces [nonce_start + (i + k * worker_count) * NONCE_CHUNK_SIZE, ...).
+    A worker reports (job_id, None) once its share of a bounded range is exhausted.
+    """
+    while True:
+        job = job_queue.get()
+        if job is None:
+            return
+        job_id, proof_prefix, difficulty, nonce_start, nonce_end = job
+        prefix = prefix_state(proof_prefix)
+        target = proof_target(difficulty)
+        chunk = worker_index
+
+        while current_job.value == job_id:
+            start = nonce_start + chunk * NONCE_CHUNK_SIZE
+            if nonce_end is not None and start >= nonce_end:
+                result_queue.put((job_id, None))
+                break
+            end = start + NONCE_CHUNK_SIZE
+            if nonce_end is not None:
+                end = min(end, nonce_end)
+            nonce = search_nonce(prefix, target, start, end)
+            if nonce is not None:
+                hash_counts[worker_index] += nonce - start + 1
+                result_queue.put((job_id, nonce))
+                break
+            hash_counts[worker_index] += end - start
+            chunk += worker_count
+
+class MiningEngine:
+    """
+    Splits the nonce search for a block across a pool of worker processes.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = max(1, workers or default_worker_count())
+        self._current_job = multiprocessing.Value('q', 0, lock=False)
+        # Setiap worker hanya menulis slotnya sendiri, jadi tidak perlu lock.
+        self._hash_counts = multiprocessing.Array('Q', self.workers, lock=False)
+        self._result_queue = multiprocessing.Queue()
+        self._job_queues = []
+        self._processes = []
+        self._job_id = 0
+        self._job_lock = threading.Lock()
+
+        for i in range(self.workers):
+            job_queue = multiprocessing.Queue()
+            process = multiprocessing.Process(
+                target=_search_worker,
+                args=(i, self.workers, job_queue, self._result_queue, self._current_job, self._hash_counts),
+                daemon=True
+            )
+            process.start()
+            self._job_queues.append(job_queue)
+            self._processes.append(process)
+        logger.info(f"Mining engine started with {self.workers} worker process(es).")
+
+    def search(self, proof_prefix, difficulty, is_stale=None, nonce_start=0, nonce_end=None):
+        """
+        Searches [nonce_start, nonce_end) for a valid nonce (unbounded when
+        nonce_end is None). Returns None if the range is exhausted, the job is
+        cancelled, or `is_stale()` already reports it as outdated once dispatched.
+        """
+        with self._job_lock:
+            self._job_id += 1
+            job_id = self._job_id
+            self._current_job.value = job_id
+        for job_queue in self._job_queues:
+            job_queue.put((job_id, proof_prefix, difficulty, nonce_start, nonce_end))
+
+        # Tip bisa berubah sebelum job terkirim; setelah itu cancel() yang menangani.
+        if is_stale and is_stale():
+            self.cancel()
+
+        exhausted = 0
+        try:
+            while True:
+                result_job_id, nonce = self._result_queue.get()
+                if result_job_id != job_id:
+                    continue
+                if nonce is not None:
+                    return nonce
+                exhausted += 1
+                if exhausted >= self.workers or self._current_job.value != job_id:
+                    return None
+        finally:
+            # Menghentikan semua worker begitu solusi ditemukan atau job kedaluwarsa.
+            with self._job_lock:
+                if self._current_job.value == job_id:
+                    self._current_job.value = 0
+
+    def hash_counts(self):
+        """
+        Returns the total number of hashes computed so far by each worker.
+        """
+        return list(self._hash_counts)
+
+    def cancel(self):
+        """
+        Drops the running job, if any. Safe to call from any thread; workers stop
+        within one nonce chunk and search() returns None immediately.
+        """
+        with self._job_lock:
+            job_id = self._current_job.value
+            if not job_id:
+                return
+            self._current_job.value = 0
+        self._result_queue.put((job_id, None))
+
+    def stop(self):
+        self.cancel()
+        for job_queue in self._job_queues:
+            job_queue.put(None)
+        for process in self._processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+        self._processes.clear()
+        self._job_queues.clear()
+
+class MinerStats:
+    """
+    Mining telemetry: rolling hashrate per worker, time per job, stale and
+    orphaned work, and latency from a found solution to its broadcast.
+    """
+
+    def __init__(self, engine=None, window_seconds=60):
+        self.engine = engine
+        self.window_seconds = window_seconds
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.hash_samples = deque()
+        self.job_outcomes = {'found': 0, 'stale': 0, 'orphaned': 0, 'refreshed': 0, 'exhausted': 0}
+        self.blocks_rejected = 0
+        self.job_times = deque(maxlen=100)
+        self.broadcast_latencies = deque(maxlen=100)
+        self.solution_found_at = None
+        self.blocks_broadcast = 0
+        self.remote_workers = {}
+
+    def sample(self):
+        if not self.engine:
+            return
+        now = time.time()
+        with self.lock:
+            self.hash_samples.append((now, self.engine.hash_counts()))
+            while len(self.hash_samples) > 2 and now - self.hash_samples[0][0] > self.window_seconds:
+                self.hash_samples.popleft()
+
+    def hashrates(self):
+        with self.lock:
+            if len(self.hash_samples) < 2:
+                return []
+            (t0, first), (t1, last) = self.hash_samples[0], self.hash_samples[-1]
+        elapsed = max(t1 - t0, 1e-9)
+        return [(b - a) / elapsed for a, b in zip(first, last)]
+
+    def record_job(self, duration, outcome):
+        """
+        Records a finished job. `duration` is None for jobs that ran elsewhere,
+        e.g. stale solutions submitted by remote workers.
+        """
+        with self.lock:
+            self.job_outcomes[outcome] = self.job_outcomes.get(outcome, 0) + 1
+            if duration is not None:
+                self.job_times.append(duration)
+
+    def record_rejected(self):
+        with self.lock:
+            self.blocks_rejected += 1
+        self.solution_found_at = None
+
+    def mark_solution(self):
+        self.solution_found_at = time.perf_counter()
+
+    def record_broadcast(self):
+        found_at = self.solution_found_at
+        if found_at is None:
+            return
+        with self.lock:
+            self.broadcast_latencies.append(time.perf_counter() - found_at)
+            self.blocks_broadcast += 1
+        self.solution_found_at = None
+
+    def record_remote_worker(self, worker_address, hashrate):
+        with self.lock:
+            self.remote_workers[worker_address] = {'hashrate': hashrate, 'last_seen': time.time()}
+
+    def remove_remote_worker(self, worker_address):
+        with self.lock:
+            self.remote_workers.pop(worker_address, None)
+
+    def snapshot(self):
+        worker_rates = self.hashrates()
+        with self.lock:
+            job_times = list(self.job_times)
+            latencies = list(self.broadcast_latencies)
+            outcomes = dict(self.job_outcomes)
+            remote = {k: dict(v) for k, v in self.remote_workers.items()}
+        total_jobs = sum(outcomes.values())
+        wasted = outcomes.get('stale', 0) + outcomes.get('orphaned', 0)
+        return {
+            'timestamp': time.time(),
+            'uptime_seconds': time.time() - self.started_at,
+            'hashrate_total': sum(worker_rates) + sum(w['hashrate'] for w in remote.values()),
+            'hashrate_per_worker': worker_rates,
+            'remote_workers': remote,
+            'jobs': outcomes,
+            'stale_share': wasted / total_jobs if total_jobs else 0.0,
+            'avg_job_seconds': sum(job_times) / len(job_times) if job_times else None,
+            'blocks_broadcast': self.blocks_broadcast,
+            'blocks_rejected': self.blocks_rejected,
+            'avg_broadcast_latency_ms': 1000 * sum(latencies) / len(latencies) if latencies else None,
+            'last_broadcast_latency_ms': 1000 * latencies[-1] if latencies else None
+        }
+
+    def summary(self):
+        stats = self.snapshot()
+        latency = stats['avg_broadcast_latency_ms']
+        return (f"Hashrate {stats['hashrate_total']:,.0f} H/s | jobs {stats['jobs']} | "
+                f"stale {stats['stale_share']:.1%} | latensi broadcast "
+                f"{'-' if latency is None else f'{latency:.1f} ms'}")
@@ -7,6 +7,12 @@ from decimal import Decimal
 from queue import Queue
 import urllib.request
 from urllib.error import URLError
+from artha_wallet import ArthaWallet
+from artha_utils import DecimalEncoder
+from artha_filters import filter_matches_any
+from artha_fastsync import SnapshotSync, MAX_HEADERS_PER_MESSAGE
+from artha_light import HeaderChain, HeaderSync
+from artha_events import PeerUp, PeerDown
 
 logger = logging.getLogger(__name__)
 
@@ -16,9 +22,11 @@ PEER_UPDATE_INTERVAL = 3600
 PEER_TIMEOUT = 120
 RECONNECT_INTERVAL = 30
 HEARTBEAT_INTERVAL = 60
+MAX_FILTERS_PER_MESSAGE = 1000
+MAX_BLOCKS_PER_MESSAGE = 50
 
 class ArthaNode:
-    def __init__(self, host, port, blockchain_instance, is_miner=False, new_tx_event=None):
+    def __init__(self, host, port, blockchain_instance, is_miner=False):
         self.host = host
         self.port = port
         self.blockchain = blockchain_instance
@@ -27,7 +35,16 @@ class ArthaNode:
         self.is_running = True
         self.is_miner = is_miner
         self.lock = threading.RLock()
-        self.new_tx_event = new_tx_event
+        # Event rantai dan mempool diterbitkan blockchain; node menambahkan event peer.
+        self.events = blockchain_instance.events
+        self.payment_proofs = {}
+        # Mode klien ringan: alamat yang dipantau lewat filter blok.
+        self.watch_addresses = set()
+        self.matched_blocks = {}
+        self.snapshot_sync = None
+        # Rantai header tanpa body untuk memverifikasi bukti pembayaran (dibuat oleh sync_headers()).
+        self.header_chain = None
+        self.header_sync = None
         self.message_queue = Queue()
         self.last_peer_update = 0
         self.bootstrap_peers = []
@@ -74,7 +91,17 @@ class ArthaNode:
                     except:
                         pass
                     del self.peers[peer]
+                    self.events.publish(PeerDown(peer, 'timeout'))
                     logger.warning(f"Peer {peer} timed out and was removed")
+                sync = self.snapshot_sync
+                sync_lost = sync and (sync.peer not in self.peers or sync.is_timed_out())
+                header_sync = self.header_sync
+                header_sync_lost = header_sync and (header_sync.peer not in self.peers or header_sync.is_timed_out())
+            
+            if sync_lost:
+                sync.abort("peer disconnected or stopped responding")
+            if header_sync_lost:
+                header_sync.abort("peer disconnected or stopped responding")
             
             if not self.peers and self.is_running:
                 logger.info("No active peers, attempting to reconnect...")
@@ -142,10 +169,13 @@ class ArthaNode:
         with self.lock:
             self.peers[peer_address] = {
                 'socket': conn,
+                'send_lock': threading.Lock(),
                 'last_seen': time.time()
             }
+        self.events.publish(PeerUp(peer_address))
         
         logger.info(f"Connection established with {peer_address}")
+        self.send_message(peer_address, 'HELLO', self._hello_data())
         buffer = b''
         
         try:
@@ -175,6 +205,7 @@ class ArthaNode:
             with self.lock:
                 if peer_address in self.peers:
                     del self.peers[peer_address]
+                    self.events.publish(PeerDown(peer_address, 'disconnected'))
             conn.close()
             logger.info(f"Connection to {peer_address} closed.")
 
@@ -186,41 +217,100 @@ class ArthaNode:
         try:
             if msg_type == 'PING':
                 self.send_message(sender_peer_address, 'PONG', {})
+            elif msg_type == 'HELLO':
+                with self.lock:
+                    if sender_peer_address in self.peers:
+                        self.peers[sender_peer_address]['height'] = message['data'].get('height', 0)
+                        self.peers[sender_peer_address]['pruned_height'] = message['data'].get('pruned_height', 0)
+                        self.peers[sender_peer_address]['snapshot_height'] = message['data'].get('snapshot_height')
             elif msg_type == 'PONG':
                 pass
             elif msg_type == 'NEW_TRANSACTION':
                 tx_data = message['data']
-                tx = tx_data['transaction']
-                pk = tx_data['public_key_str']
-                
-                if self.blockchain.add_transaction(
-                    tx['sender'],
-                    tx['recipient'],
-                    Decimal(tx['amount']),
-                    tx['signature'],
-                    pk,
-                    tx.get('timestamp')
-                ):
-                    if self.new_tx_event:
-                        self.new_tx_event.set()
-                    self.broadcast_message(
-                        'NEW_TRANSACTION',
-                        tx_data,
-                        exclude_peer=sender_peer_address
-                    )
+                self.submit_transaction(tx_data['transaction'], tx_data.get('public_key_str'),
+                                        exclude_peer=sender_peer_address)
             elif msg_type == 'NEW_BLOCK':
                 if self.handle_new_block(message['data']['block']):
-                    self.broadcast_message(
-                        'NEW_BLOCK',
-                        message['data'],
-                        exclude_peer=sender_peer_address
-                    )
+                    self.broadcast_block(message['data']['block'], exclude_peer=sender_peer_address)
             elif msg_type == 'REQUEST_CHAIN':
-                self.send_message(
-                    sender_peer_address,
-                    'RESPOND_CHAIN',
-                    {'chain': self.blockchain.chain}
-                )
+                # Node yang dipangkas tidak bisa menyajikan rantai lengkap.
+                if self.blockchain.pruned_height:
+                    return
+                # Byte blok diambil dari block store; tidak ada serialisasi ulang.
+                chain = self.blockchain.state.chain
+                if not self.send_blocks(sender_peer_address, 'RESPOND_CHAIN', 'chain', range(len(chain))):
+                    self.send_message(sender_peer_address, 'RESPOND_CHAIN', {'chain': chain})
+            elif msg_type == 'GET_MERKLE_PROOF':
+                tx_id = message['data']['transaction_id']
+                proof = self.blockchain.get_merkle_proof(tx_id)
+                response = {'transaction_id': tx_id, 'found': proof is not None}
+                if proof:
+                    response.update(proof)
+                self.send_message(sender_peer_address, 'MERKLE_PROOF', response)
+            elif msg_type == 'MERKLE_PROOF':
+                if message['data'].get('found'):
+                    self._accept_payment_proof(message['data'], sender_peer_address)
+            elif msg_type == 'GET_FILTERS':
+                start = int(message['data']['start'])
+                end = min(int(message['data']['end']), start + MAX_FILTERS_PER_MESSAGE)
+                self.send_message(sender_peer_address, 'FILTERS', {
+                    'start': start, 'filters': self.blockchain.filter_index.get_filters(start, end)
+                })
+            elif msg_type == 'FILTERS':
+                start = message['data']['start']
+                with self.lock:
+                    watched = set(self.watch_addresses)
+                matched = [start + i for i, block_filter in enumerate(message['data']['filters'])
+                           if filter_matches_any(block_filter, watched)]
+                for i in range(0, len(matched), MAX_BLOCKS_PER_MESSAGE):
+                    self.send_message(sender_peer_address, 'GET_BLOCKS', {'heights': matched[i:i + MAX_BLOCKS_PER_MESSAGE]})
+            elif msg_type == 'GET_BLOCKS':
+                chain = self.blockchain.state.chain
+                heights = message['data']['heights'][:MAX_BLOCKS_PER_MESSAGE]
+                heights = [h for h in heights if 0 <= h < len(chain) and not chain[h].get('pruned')]
+                if not self.send_blocks(sender_peer_address, 'BLOCKS', 'blocks', heights):
+                    self.send_message(sender_peer_address, 'BLOCKS', {'blocks': [chain[h] for h in heights]})
+            elif msg_type == 'GET_HEADERS':
+                start = int(message['data']['start'])
+                end = min(int(message['data']['end']), start + MAX_HEADERS_PER_MESSAGE)
+                self.send_message(sender_peer_address, 'HEADERS', {
+                    'start': start, 'headers': self.blockchain.get_headers(start, end)
+                })
+            elif msg_type == 'GET_SNAPSHOT_INFO':
+                snapshot = self.blockchain.snapshot
+                info = {'height': None}
+                if snapshot:
+                    info = {
+                        'height': snapshot['height'], 'block_hash': snapshot['block_hash'],
+                        'state_hash': snapshot['state_hash'],
+                        'chunk_hashes': [self.blockchain.chunk_hash(chunk) for chunk in snapshot['chunks']]
+                    }
+                self.send_message(sender_peer_address, 'SNAPSHOT_INFO', info)
+            elif msg_type == 'GET_SNAPSHOT_CHUNK':
+                snapshot = self.blockchain.snapshot
+                index = message['data']['index']
+                if snapshot and snapshot['height'] == message['data']['height'] and 0 <= index < len(snapshot['chunks']):
+                    self.send_message(sender_peer_address, 'SNAPSHOT_CHUNK', {
+                        'height': snapshot['height'], 'index': index, 'entries': snapshot['chunks'][index]
+                    })
+            elif msg_type in ('SNAPSHOT_INFO', 'HEADERS', 'SNAPSHOT_CHUNK'):
+                sync = self.snapshot_sync
+                header_sync = self.header_sync
+                if sync and sync.peer == sender_peer_address:
+                    handler = {'SNAPSHOT_INFO': sync.on_snapshot_info, 'HEADERS': sync.on_headers,
+                               'SNAPSHOT_CHUNK': sync.on_snapshot_chunk}[msg_type]
+                    handler(message['data'])
+                elif msg_type == 'HEADERS' and header_sync and header_sync.peer == sender_peer_address:
+                    header_sync.on_headers(message['data'])
+            elif msg_type == 'BLOCKS':
+                sync = self.snapshot_sync
+                if sync and sync.peer == sender_peer_address and sync.tip_height:
+                    sync.on_blocks(message['data'])
+                    return
+                with self.lock:
+                    for block in message['data']['blocks']:
+                        self.matched_blocks[block['index']] = block
+                logger.info(f"Received {len(message['data']['blocks'])} block(s) matching watched addresses.")
             elif msg_type == 'RESPOND_CHAIN':
                 self.blockchain.replace_chain(message['data']['chain'])
         except Exception as e:
@@ -232,7 +322,69 @@ class ArthaNode:
             'data': data,
             'timestamp': time.time()
         }
-        
+        return self._send(peer_address, [(json.dumps(message, cls=DecimalEncoder) + '\n').encode('utf-8')])
+
+    def _block_message(self, message_type, field, heights, as_list=True):
+        """
+        Frames a message whose data is {field: blocks} (or {field: block} if
+        not as_list) from the stored wire bytes of the blocks at `heights`.
+        Returns (data_file, parts) for _send(), or (None, None) if a block is
+        not in the block store.
+        """
+        data_file, segments = self.blockchain.block_store.segments(heights)
+        if segments is None:
+            return None, None
+        open_list, close_list = ('[', ']') if as_list else ('', '')
+        parts = [f'{{"type": {json.dumps(message_type)}, "data": {{{json.dumps(field)}: {open_list}'.encode('utf-8')]
+        for i, segment in enumerate(segments):
+            if i:
+                parts.append(b',')
+            parts.append(segment)
+        parts.append(f'{close_list}}}, "timestamp": {json.dumps(time.time())}}}\n'.encode('utf-8'))
+        return data_file, parts
+
+    def send_blocks(self, peer_address, message_type, field, heights):
+        """
+        Sends {field: [blocks at heights]} straight from the block store.
+        Returns False if the blocks are not available there.
+        """
+        data_file, parts = self._block_message(message_type, field, heights)
+        if parts is None:
+            return False
+        try:
+            self._send(peer_address, parts, data_file)
+        finally:
+            if data_file:
+                data_file.close()
+        return True
+
+    def broadcast_block(self, block, exclude_peer=None):
+        """
+        Announces a block that was just connected, using its stored wire bytes
+        when the block store holds this block at its height.
+        """
+        store = self.blockchain.block_store
+        data_file, parts = None, None
+        if store.block_hash(block['index']) == self.blockchain.hash_block(block):
+            data_file, parts = self._block_message('NEW_BLOCK', 'block', [block['index']], as_list=False)
+        if parts is None:
+            self.broadcast_message('NEW_BLOCK', {'block': block}, exclude_peer=exclude_peer)
+            return
+        with self.lock:
+            peers_copy = list(self.peers.keys())
+        try:
+            for peer in peers_copy:
+                if peer != exclude_peer:
+                    self._send(peer, parts, data_file)
+        finally:
+            if data_file:
+                data_file.close()
+
+    def _send(self, peer_address, parts, data_file=None):
+        """
+        Writes one framed message to a peer. Parts are bytes, or (offset, length)
+        ranges of `data_file` that are sent with sendfile().
+        """
         with self.lock:
             peer_data = self.peers.get(peer_address)
         
@@ -241,9 +393,13 @@ class ArthaNode:
             return False
         
         try:
-            peer_data['socket'].sendall(
-                (json.dumps(message) + '\n').encode('utf-8')
-            )
+            # Pesan yang ditulis dalam beberapa bagian tidak boleh diselingi pesan lain.
+            with peer_data['send_lock']:
+                for part in parts:
+                    if isinstance(part, tuple):
+                        peer_data['socket'].sendfile(data_file, part[0], part[1])
+                    else:
+                        peer_data['socket'].sendall(part)
             return True
         except OSError as e:
             logger.warning(f"Failed to send to {peer_address}: {e}")
@@ -254,6 +410,7 @@ class ArthaNode:
                     except:
                         pass
                     del self.peers[peer_address]
+                    self.events.publish(PeerDown(peer_address, 'send failed'))
             return False
 
     def broadcast_message(self, message_type, data, exclude_peer=None):
@@ -313,8 +470,139 @@ class ArthaNode:
             if self._fetch_peer_list():
                 self.connect_and_sync_initial()
 
+    def request_merkle_proof(self, tx_id):
+        """
+        Asks peers for an inclusion proof of a confirmed transaction. Verified
+        answers are stored in self.payment_proofs.
+        """
+        self.broadcast_message('GET_MERKLE_PROOF', {'transaction_id': tx_id})
+
+    def sync_headers(self):
+        """
+        Light-client mode: downloads only the block headers of the highest peer
+        into self.header_chain, so payment proofs can be checked without the
+        blocks. Call again to catch up with new blocks.
+        """
+        with self.lock:
+            if self.header_sync or not self.peers:
+                return
+            if self.header_chain is None:
+                self.header_chain = HeaderChain(self.blockchain)
+            peer = max(self.peers, key=lambda p: self.peers[p].get('height', 0))
+            self.header_sync = HeaderSync(self, peer, self.header_chain)
+        self.header_sync.start()
+
+    def finish_header_sync(self, sync):
+        with self.lock:
+            if self.header_sync is sync:
+                self.header_sync = None
+
+    def _verified_block_hash(self, height):
+        """
+        Returns (block hash at `height`, tip height) from the local chain, or
+        from the header chain of a light client if that one is longer.
+        """
+        header_chain = self.header_chain
+        if header_chain is not None and header_chain.height > self.blockchain.get_current_block_height():
+            return header_chain.get_block_hash(height), header_chain.height
+        return self.blockchain.get_block_hash(height), self.blockchain.get_current_block_height()
+
+    def _accept_payment_proof(self, data, sender_peer_address):
+        """
+        Stores a MERKLE_PROOF answer if its header is the block at that height
+        in the local chain or header chain, whose proof-of-work was verified
+        when it was connected. Confirmations are counted from the local tip;
+        the peer's tip_height is not trusted.
+        """
+        header = data['header']
+        height = header.get('index')
+        block_hash, tip_height = self._verified_block_hash(height) if isinstance(height, int) else (None, None)
+        if block_hash is None or not ArthaWallet.verify_merkle_proof(data['transaction_id'], header, data['proof'], block_hash):
+            logger.warning(f"Rejected Merkle proof for {str(data['transaction_id'])[:10]}... from {sender_peer_address}: "
+                           f"header is not in the local chain or the proof is invalid.")
+            return
+        confirmations = tip_height - height + 1
+        with self.lock:
+            self.payment_proofs[data['transaction_id']] = {'header': header, 'confirmations': confirmations}
+        logger.info(f"Payment {data['transaction_id'][:10]}... proven in block #{height} ({confirmations} confirmations)")
+
+    def request_filters(self, start, end):
+        """
+        Light-client scan: fetches block filters and then only the blocks that
+        may touch self.watch_addresses (collected in self.matched_blocks).
+        """
+        for batch_start in range(start, end, MAX_FILTERS_PER_MESSAGE):
+            self.broadcast_message('GET_FILTERS', {
+                'start': batch_start, 'end': min(end, batch_start + MAX_FILTERS_PER_MESSAGE)
+            })
+
+    def _hello_data(self):
+        return {
+            'height': self.blockchain.get_current_block_height(),
+            'pruned_height': self.blockchain.pruned_height,
+            'snapshot_height': self.blockchain.snapshot['height'] if self.blockchain.snapshot else None
+        }
+
+    def full_node_peers(self):
+        """
+        Returns peers that have not announced pruned block bodies.
+        """
+        with self.lock:
+            return [peer for peer, data in self.peers.items() if not data.get('pruned_height')]
+
     def trigger_full_resync(self):
-        self.broadcast_message('REQUEST_CHAIN', {})
+        # Node tanpa blok cukup mengunduh snapshot state terbaru dan blok setelahnya.
+        if self.blockchain.get_current_block_height() == 0:
+            with self.lock:
+                if self.snapshot_sync:
+                    return
+                candidates = [(data['snapshot_height'], peer) for peer, data in self.peers.items()
+                              if data.get('snapshot_height')]
+                if candidates:
+                    self.snapshot_sync = SnapshotSync(self, max(candidates)[1])
+            if candidates:
+                self.snapshot_sync.start()
+                return
+        for peer in self.full_node_peers():
+            self.send_message(peer, 'REQUEST_CHAIN', {})
+
+    def finish_snapshot_sync(self, sync, success):
+        with self.lock:
+            if self.snapshot_sync is not sync:
+                return
+            self.snapshot_sync = None
+        if not success:
+            for peer in self.full_node_peers():
+                self.send_message(peer, 'REQUEST_CHAIN', {})
+
+    def submit_transaction(self, tx, public_key_str=None, exclude_peer=None):
+        """
+        Adds a signed transaction to the mempool and relays it to the other
+        peers. Returns the accepted transaction, or None if it was rejected.
+        """
+        # Tanpa kunci jika pengirim sudah terdaftar di registri kunci rantai.
+        pk = public_key_str or tx.get('public_key_str')
+        if 'outputs' in tx:
+            added = self.blockchain.add_batch_transaction(
+                tx['sender'], tx['outputs'], tx['signature'], pk, tx.get('timestamp'), tx.get('version', 1)
+            )
+        else:
+            added = self.blockchain.add_transaction(
+                tx['sender'],
+                tx['recipient'],
+                Decimal(tx['amount']),
+                tx['signature'],
+                pk,
+                tx.get('timestamp'),
+                tx.get('version', 1)
+            )
+        if added:
+            self.broadcast_message(
+                'NEW_TRANSACTION',
+                {'transaction': tx, 'public_key_str': public_key_str},
+                exclude_peer=exclude_peer
+            )
+        return added
 
     def handle_new_block(self, block):
-        return self.blockchain.replace_chain(self.blockchain.chain + [block])
+        return self.blockchain.connect_block(block)
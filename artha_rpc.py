@@ -0,0 +1,243 @@
+# artha_rpc.py
+
+import inspect
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import InvalidOperation
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+from artha_utils import DecimalEncoder
+
+logger = logging.getLogger(__name__)
+
+RPC_HOST = '127.0.0.1'
+RPC_PORT = 5200
+# Setiap koneksi keep-alive memakai satu thread selama terbuka.
+RPC_THREADS = 16
+# Koneksi yang diam selama ini ditutup agar thread-nya bisa melayani klien lain.
+RPC_IDLE_TIMEOUT = 15
+MAX_REQUEST_BYTES = 1 * 2**20
+MAX_BATCH_SIZE = 1000
+MAX_HISTORY_BLOCKS = 100
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+TX_REJECTED = -32000
+
+class RpcError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+class RpcMethods:
+    """
+    The JSON-RPC methods. They read the published ChainState (balances,
+    tx_index, address_index, mempool) and never take the blockchain's write
+    lock, so queries cannot stall block processing.
+    """
+
+    def __init__(self, blockchain, node):
+        self.blockchain = blockchain
+        self.node = node
+
+    def get_tip(self):
+        state = self.blockchain.state
+        return {'height': state.height, 'hash': state.tip_hash}
+
+    def get_balance(self, address):
+        return f"{self.blockchain.get_balance(address):.8f}"
+
+    def get_balances(self, addresses):
+        if not isinstance(addresses, list) or len(addresses) > MAX_BATCH_SIZE:
+            raise RpcError(INVALID_PARAMS, f"addresses must be a list of at most {MAX_BATCH_SIZE}")
+        return {address: self.get_balance(address) for address in addresses}
+
+    def get_transaction(self, tx_id):
+        found = self.blockchain.get_transaction(tx_id)
+        if not found:
+            return None
+        tx, height = found
+        if height is None:
+            return {'transaction': tx, 'status': 'pending', 'block_index': None, 'confirmations': 0}
+        return {'transaction': tx, 'status': 'confirmed', 'block_index': height,
+                'confirmations': self.blockchain.get_current_block_height() - height + 1}
+
+    def get_block(self, block_id):
+        if _is_int(block_id):
+            chain = self.blockchain.state.chain
+            return chain[block_id] if 0 <= block_id < len(chain) else None
+        return self.blockchain.get_block_by_hash(block_id)
+
+    def get_address_history(self, address, before=None, limit=MAX_HISTORY_BLOCKS):
+        """
+        Returns a page of (height, transaction) rows, newest first; pass the
+        lowest height returned as `before` to fetch the next page.
+        """
+        if not _is_int(limit):
+            raise RpcError(INVALID_PARAMS, "limit must be an integer")
+        if before is not None and not _is_int(before):
+            raise RpcError(INVALID_PARAMS, "before must be an integer block height")
+        limit = max(1, min(limit, MAX_HISTORY_BLOCKS))
+        rows, more = self.blockchain.get_address_history(address, before=before, limit=limit)
+        return {'transactions': [{'block_index': height, 'transaction': tx} for height, tx in rows], 'more': more}
+
+    def get_mempool(self):
+        return [tx['transaction_id'] for tx in self.blockchain.state.pending]
+
+    def send_transaction(self, transaction, public_key_str=None):
+        """
+        Submits a transaction signed by the client and relays it to the peers.
+        """
+        if not isinstance(transaction, dict):
+            raise RpcError(INVALID_PARAMS, "transaction must be an object")
+        try:
+            added = self.node.submit_transaction(transaction, public_key_str)
+        except (KeyError, TypeError, ValueError, InvalidOperation) as e:
+            raise RpcError(INVALID_PARAMS, f"Malformed transaction: {e}")
+        if not added:
+            raise RpcError(TX_REJECTED, "Transaction rejected")
+        return added['transaction_id']
+
+    def call(self, name, params):
+        method = getattr(self, name, None) if not name.startswith('_') and name != 'call' else None
+        if not callable(method):
+            raise RpcError(METHOD_NOT_FOUND, f"Method not found: {name}")
+        try:
+            if isinstance(params, dict):
+                inspect.signature(method).bind(**params)
+                return method(**params)
+            inspect.signature(method).bind(*params)
+            return method(*params)
+        except TypeError as e:
+            raise RpcError(INVALID_PARAMS, str(e))
+
+def _error(request_id, code, message):
+    return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}}
+
+def handle_request(methods, request):
+    """
+    Runs one JSON-RPC 2.0 request object. Returns the response, or None for a notification.
+    """
+    if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+        return _error(None, INVALID_REQUEST, "Invalid request")
+    request_id = request.get('id')
+    params = request.get('params', [])
+    if not isinstance(params, (list, dict)):
+        return _error(request_id, INVALID_PARAMS, "params must be an array or an object")
+    try:
+        result = methods.call(request['method'], params)
+    except RpcError as e:
+        response = _error(request_id, e.code, e.message)
+    except Exception as e:
+        logger.error(f"RPC method {request['method']} failed: {e}")
+        response = _error(request_id, INTERNAL_ERROR, "Internal error")
+    else:
+        response = {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+    return response if 'id' in request else None
+
+def handle_payload(methods, payload):
+    """
+    Runs a single request or a batch (a JSON array of requests) and returns
+    the response object or list, or None if there is nothing to answer.
+    """
+    if isinstance(payload, list):
+        if not payload or len(payload) > MAX_BATCH_SIZE:
+            return _error(None, INVALID_REQUEST, f"Batch must hold 1 to {MAX_BATCH_SIZE} requests")
+        responses = [response for response in (handle_request(methods, request) for request in payload) if response]
+        return responses or None
+    return handle_request(methods, payload)
+
+class RpcRequestHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1: koneksi tetap terbuka untuk permintaan berikutnya (keep-alive).
+    protocol_version = 'HTTP/1.1'
+    timeout = RPC_IDLE_TIMEOUT
+    # Balasan kecil dikirim segera, tanpa menunggu ACK (Nagle).
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get('Content-Length', ''))
+        except ValueError:
+            self._reply(411, None)
+            self.close_connection = True
+            return
+        if length < 0:
+            self._reply(400, None)
+            self.close_connection = True
+            return
+        if length > MAX_REQUEST_BYTES:
+            self._reply(413, None)
+            self.close_connection = True
+            return
+        body = self.rfile.read(length)
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self._reply(200, _error(None, PARSE_ERROR, "Parse error"))
+            return
+        self._reply(200, handle_payload(self.server.methods, payload))
+
+    def do_GET(self):
+        self._reply(405, None)
+
+    def _reply(self, status, response):
+        body = b'' if response is None else json.dumps(response, cls=DecimalEncoder).encode('utf-8')
+        self.send_response(status if body or status != 200 else 204)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"RPC {self.address_string()} {format % args}")
+
+class RpcServer(HTTPServer):
+    """
+    Local JSON-RPC 2.0 server over HTTP/1.1 (POST /). Requests may be batched
+    and connections are kept alive; each connection is served by a thread of
+    a fixed pool, so at most `threads` clients are served at once and the
+    rest wait for a free thread.
+
+    Methods: get_tip, get_balance(address), get_balances(addresses),
+    get_transaction(tx_id), get_block(block_id), get_address_history(address,
+    before, limit), get_mempool, send_transaction(transaction, public_key_str).
+    """
+
+    daemon_threads = True
+
+    def __init__(self, blockchain, node, host=RPC_HOST, port=RPC_PORT, threads=RPC_THREADS):
+        self.methods = RpcMethods(blockchain, node)
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='artha-rpc')
+        super().__init__((host, port), RpcRequestHandler)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._serve, request, client_address)
+
+    def _serve(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def handle_error(self, request, client_address):
+        logger.debug(f"RPC connection from {client_address[0]}:{client_address[1]} failed.", exc_info=True)
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        logger.info(f"JSON-RPC server started at {self.server_address[0]}:{self.server_address[1]}")
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self.pool.shutdown(wait=False)
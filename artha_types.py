@@ -0,0 +1,188 @@
+# artha_types.py
+
+import sys
+
+from artha_utils import to_base_units, format_amount
+
+def _is_hex_digest(value, length=None):
+    """True if `value` is lowercase hex that survives a round trip through bytes."""
+    if not isinstance(value, str) or (length and len(value) != length) or len(value) % 2:
+        return False
+    try:
+        return bytes.fromhex(value).hex() == value
+    except ValueError:
+        return False
+
+class Record:
+    """
+    Compact in-memory record with a dict-like interface (r['key'], r.get(),
+    'key' in r, keys(), items()). Known fields live in __slots__, in a packed
+    form where that is smaller; unknown fields, and known fields whose value
+    _packs() does not accept, are kept in `extra` so that to_dict() always
+    gives back exactly the dict the record was made from.
+    """
+    __slots__ = ('extra',)
+    FIELDS = ()
+
+    def __init__(self, data):
+        self.extra = None
+        for key, value in data.items():
+            self[key] = value
+
+    def _packs(self, key, value):
+        return True
+
+    def _pack(self, key, value):
+        return value
+
+    def _unpack(self, key, value):
+        return value
+
+    def __setitem__(self, key, value):
+        if key in self.FIELD_SET and self._packs(key, value):
+            if self.extra and key in self.extra:
+                del self.extra[key]
+            setattr(self, key, self._pack(key, value))
+        else:
+            if key in self.FIELD_SET and hasattr(self, key):
+                delattr(self, key)
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __getitem__(self, key):
+        if key in self.FIELD_SET:
+            try:
+                return self._unpack(key, getattr(self, key))
+            except AttributeError:
+                pass
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        if key in self.FIELD_SET and hasattr(self, key):
+            return True
+        return bool(self.extra) and key in self.extra
+
+    def keys(self):
+        keys = [field for field in self.FIELDS if hasattr(self, field)]
+        if self.extra:
+            keys.extend(self.extra)
+        return keys
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+class Transaction(Record):
+    """
+    A confirmed transaction. Canonical amounts are kept as integer base units,
+    hex signatures as bytes, and addresses and public keys are interned so
+    repeated senders share one string.
+    """
+    FIELDS = ('sender', 'recipient', 'amount', 'outputs', 'timestamp', 'signature',
+              'public_key_str', 'transaction_id', 'version')
+    FIELD_SET = frozenset(FIELDS)
+    __slots__ = FIELDS
+
+    def _packs(self, key, value):
+        # Hanya jumlah berupa string yang dikemas; angka JSON (int/float) disimpan apa adanya di extra.
+        return key != 'amount' or isinstance(value, str)
+
+    def _pack(self, key, value):
+        if key == 'amount':
+            try:
+                units = to_base_units(value)
+            except ValueError:
+                return value
+            return units if format_amount(units) == value else value
+        if key == 'signature' and _is_hex_digest(value):
+            return bytes.fromhex(value)
+        if key in ('sender', 'recipient', 'public_key_str') and isinstance(value, str):
+            return sys.intern(value)
+        return value
+
+    def _unpack(self, key, value):
+        if key == 'amount' and isinstance(value, int):
+            return format_amount(value)
+        if key == 'signature' and isinstance(value, bytes):
+            return value.hex()
+        return value
+
+    def output_units(self):
+        """
+        Same as artha_utils.transaction_output_units(), without reparsing amounts.
+        """
+        if hasattr(self, 'outputs'):
+            return [(recipient, to_base_units(amount)) for recipient, amount in self.outputs]
+        amount = getattr(self, 'amount', None)
+        return ((self.recipient, amount if isinstance(amount, int) else to_base_units(self['amount'])),)
+
+class Block(Record):
+    """
+    A block of the chain. Transactions become Transaction records and 64-digit
+    hex hashes are kept as 32 bytes.
+    """
+    FIELDS = ('version', 'index', 'timestamp', 'transactions', 'nonce', 'previous_hash', 'miner_address',
+              'difficulty', 'merkle_root', 'state_hash', 'hash', 'pruned', 'tx_count')
+    FIELD_SET = frozenset(FIELDS)
+    __slots__ = FIELDS
+    HASH_FIELDS = frozenset(('previous_hash', 'merkle_root', 'state_hash', 'hash'))
+
+    def _pack(self, key, value):
+        if key == 'transactions' and isinstance(value, list):
+            return [to_transaction(tx) for tx in value]
+        if key in self.HASH_FIELDS and _is_hex_digest(value, 64):
+            return bytes.fromhex(value)
+        if key == 'miner_address' and isinstance(value, str):
+            return sys.intern(value)
+        return value
+
+    def _unpack(self, key, value):
+        if key in self.HASH_FIELDS and isinstance(value, bytes):
+            return value.hex()
+        return value
+
+    def to_dict(self):
+        """
+        Returns the wire form of the block, transactions included.
+        """
+        data = dict(self.items())
+        if 'transactions' in data:
+            data['transactions'] = [tx.to_dict() if isinstance(tx, Record) else tx for tx in data['transactions']]
+        return data
+
+def to_transaction(data):
+    return data if isinstance(data, Transaction) or not isinstance(data, dict) else Transaction(data)
+
+def to_block(data):
+    return data if isinstance(data, Block) else Block(data)
+
+def chain_object_hook(data):
+    """
+    json object_hook that turns blocks and transactions into records while a
+    chain file is parsed, so the full dict form is never held in memory.
+    """
+    if 'signature' in data and 'sender' in data:
+        return Transaction(data)
+    if 'previous_hash' in data and 'index' in data:
+        return Block(data)
+    return data
@@ -4,7 +4,9 @@ import hashlib
 import json
 import os
 import logging
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
+from artha_encoding import (BINARY_BLOCK_VERSION, TX_VERSION, encode_header,
+                            encode_signed_transaction, encode_transaction)
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +15,9 @@ class DecimalEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, Decimal):
             return str(obj)
+        # Blok dan transaksi ringkas (artha_types) ditulis dalam bentuk dict aslinya.
+        if hasattr(obj, 'to_dict'):
+            return obj.to_dict()
         return super(DecimalEncoder, self).default(obj)
 
 def hash_data(data):
@@ -27,6 +32,188 @@ def json_serialize(data):
     """
     return json.dumps(data, sort_keys=True, cls=DecimalEncoder).encode('utf-8')
 
+def check_proof(prefix, nonce, difficulty):
+    """
+    Checks a proof-of-work: SHA256(prefix + nonce) must not exceed 2**256 // difficulty.
+    """
+    guess_hash = hashlib.sha256(f'{prefix}{nonce}'.encode('utf-8')).hexdigest()
+    target = (2**256 - 1) // (difficulty if difficulty > 0 else 1)
+    return int(guess_hash, 16) <= target
+
+def block_version(block):
+    """
+    Returns the block format version. Blocks without a 'version' field are version 1.
+    """
+    return block.get('version', 1)
+
+# Jumlah ARTH ditulis sebagai string 8 desimal di jaringan dan disk, tetapi dihitung
+# di memori sebagai bilangan bulat satuan dasar (1 ARTH = 10**8 satuan).
+BASE_UNITS = 10**8
+
+def to_base_units(amount):
+    """
+    Converts an ARTH amount (string, Decimal or int) to integer base units.
+    Raises ValueError if it is not a finite number with at most 8 decimals.
+    """
+    # Jalur cepat untuk string kanonik seperti "12.50000000".
+    if amount.__class__ is str and len(amount) > 9 and amount[-9] == '.':
+        digits = amount[:-9] + amount[-8:]
+        if digits.isdigit() and digits.isascii():
+            return int(digits)
+    try:
+        units = Decimal(amount).scaleb(8)
+        if units != units.to_integral_value():
+            raise ValueError(f"Amount has more than 8 decimals: {amount}")
+        return int(units)
+    except (InvalidOperation, OverflowError, TypeError):
+        raise ValueError(f"Invalid amount: {amount}")
+
+def format_amount(units):
+    """
+    Formats integer base units as the canonical 8-decimal string.
+    """
+    sign = '-' if units < 0 else ''
+    whole, frac = divmod(abs(units), BASE_UNITS)
+    return f"{sign}{whole}.{frac:08d}"
+
+def units_to_decimal(units):
+    return Decimal(units).scaleb(-8)
+
+def transaction_outputs(tx):
+    """
+    Returns the [recipient, amount] outputs of a transaction. Batch transactions
+    carry an 'outputs' list; simple transactions have a single recipient.
+    """
+    if 'outputs' in tx:
+        return tx['outputs']
+    return [[tx['recipient'], tx['amount']]]
+
+def transaction_total(tx):
+    return sum((Decimal(amount) for _, amount in transaction_outputs(tx)), Decimal('0'))
+
+def transaction_output_units(tx):
+    """
+    Returns the outputs of a transaction as (recipient, base units) pairs.
+    """
+    if tx.__class__ is not dict:
+        return tx.output_units()
+    if 'outputs' not in tx:
+        return ((tx['recipient'], to_base_units(tx['amount'])),)
+    return [(recipient, to_base_units(amount)) for recipient, amount in tx['outputs']]
+
+def transaction_version(tx):
+    """
+    Returns the transaction format version. Transactions without a 'version' field are version 1.
+    """
+    return tx.get('version', 1)
+
+def signed_transaction_data(tx):
+    """
+    Returns the part of a transaction that its signature covers.
+    """
+    if 'outputs' in tx:
+        data = {'sender': tx['sender'], 'outputs': tx['outputs']}
+    else:
+        data = {'sender': tx['sender'], 'recipient': tx['recipient'], 'amount': tx['amount']}
+    if 'version' in tx:
+        data['version'] = tx['version']
+    return data
+
+def signing_bytes(transaction_data):
+    """
+    Returns the bytes a transaction signature is made over: the binary encoding
+    for version 2 transactions, sorted-key JSON for version 1.
+    """
+    if transaction_version(transaction_data) >= TX_VERSION:
+        return encode_signed_transaction(transaction_data)
+    return json_serialize(transaction_data)
+
+def transaction_id(tx):
+    """
+    Returns the ID of a transaction. Raises ValueError if a version 2
+    transaction has no canonical encoding.
+    """
+    if transaction_version(tx) >= TX_VERSION:
+        return hashlib.sha256(encode_transaction(tx)).hexdigest()
+    keys = ['sender', 'recipient', 'amount', 'timestamp', 'signature']
+    unique_data = {k: tx.get(k) for k in keys}
+    # ID transaksi sederhana tidak berubah; transaksi batch menambahkan outputs-nya.
+    if 'outputs' in tx:
+        unique_data['outputs'] = tx['outputs']
+    return hash_data(json_serialize(unique_data))
+
+# Kolom lokal yang ditambahkan saat body blok dipangkas; bukan bagian dari header.
+LOCAL_BLOCK_FIELDS = ('transactions', 'hash', 'pruned', 'tx_count')
+
+def block_header(block):
+    """
+    Returns the header of a block: every field except the transaction list and
+    the bookkeeping fields of pruned blocks.
+    """
+    return {k: v for k, v in block.items() if k not in LOCAL_BLOCK_FIELDS}
+
+def header_hash(header):
+    """
+    Returns the hash of a version 2+ block header: of its binary encoding from
+    version 7 on, of its JSON form before that.
+    """
+    if block_version(header) >= BINARY_BLOCK_VERSION:
+        return hashlib.sha256(encode_header(block_header(header))).hexdigest()
+    return hash_data(json_serialize(block_header(header)))
+
+def proof_prefix(block):
+    """
+    Returns the string the proof-of-work is computed over. Version 1 proofs only
+    commit to the previous hash; version 2 proofs commit to the whole header.
+    """
+    if block_version(block) < 2:
+        return block['previous_hash']
+    header = block_header(block)
+    if block_version(block) >= BINARY_BLOCK_VERSION:
+        return hashlib.sha256(encode_header(header, include_nonce=False)).hexdigest()
+    header.pop('nonce', None)
+    return hash_data(json_serialize(header))
+
+def merkle_root(leaves):
+    """
+    Computes the Merkle root of a list of hex hashes. A node without a sibling
+    is paired with itself.
+    """
+    if not leaves:
+        return hash_data(b'')
+    level = list(leaves)
+    while len(level) > 1:
+        if len(level) % 2:
+            level.append(level[-1])
+        level = [hash_data((level[i] + level[i + 1]).encode('utf-8')) for i in range(0, len(level), 2)]
+    return level[0]
+
+def merkle_proof(leaves, index):
+    """
+    Returns the inclusion proof for leaves[index] as a list of [sibling, side]
+    pairs from the bottom of the tree up; side is 'left' or 'right'.
+    """
+    proof = []
+    level = list(leaves)
+    while len(level) > 1:
+        if len(level) % 2:
+            level.append(level[-1])
+        sibling = index ^ 1
+        proof.append([level[sibling], 'left' if sibling < index else 'right'])
+        level = [hash_data((level[i] + level[i + 1]).encode('utf-8')) for i in range(0, len(level), 2)]
+        index //= 2
+    return proof
+
+def verify_merkle_proof(leaf, proof, root):
+    """
+    Checks that `leaf` is committed to by `root` using a proof from merkle_proof().
+    """
+    current = leaf
+    for sibling, side in proof:
+        pair = sibling + current if side == 'left' else current + sibling
+        current = hash_data(pair.encode('utf-8'))
+    return current == root
+
 def get_data_dir():
     """
     Returns the data directory path for ArthaChain.
@@ -45,7 +232,7 @@ def save_json_file(filename, data):
         json.dump(data, f, indent=4, cls=DecimalEncoder)
     logger.debug(f"File '{filename}' successfully saved.") 
 
-def load_json_file(filename):
+def load_json_file(filename, object_hook=None):
     """
     Loads JSON data from a file.
     """
@@ -53,7 +240,7 @@ def load_json_file(filename):
     if os.path.exists(filepath):
         try:
             with open(filepath, 'r') as f:
-                return json.load(f)
+                return json.load(f, object_hook=object_hook)
         except (json.JSONDecodeError, IOError) as e:
             logger.error(f"Failed to load or parse JSON file {filename}: {e}")
             return None
@@ -2,26 +2,39 @@
 
 import os
 import logging
-from Crypto.PublicKey import RSA
-from Crypto.Signature import pkcs1_15
+from Crypto.PublicKey import RSA, ECC
+from Crypto.Signature import pkcs1_15, eddsa
 from Crypto.Hash import SHA256
 from Crypto.Protocol.KDF import scrypt
 from Crypto.Cipher import AES
 import json
+from decimal import Decimal
 
-from artha_utils import hash_data, json_serialize, get_data_dir
+from artha_utils import (hash_data, signing_bytes, get_data_dir, check_proof, header_hash,
+                         proof_prefix, verify_merkle_proof)
+from artha_encoding import TX_VERSION
 
 logger = logging.getLogger(__name__)
 
+# Jenis kunci. Kunci publik RSA ditulis sebagai PEM (format lama tanpa prefiks),
+# kunci Ed25519 sebagai 'ed25519:' diikuti 32 byte kunci mentah dalam hex.
+KEY_TYPE_RSA = 'rsa'
+KEY_TYPE_ED25519 = 'ed25519'
+ED25519_PREFIX = KEY_TYPE_ED25519 + ':'
+
 class ArthaWallet:
-    def __init__(self, wallet_file='wallet.dat', password=None):
+    def __init__(self, wallet_file='wallet.dat', password=None, key_type=KEY_TYPE_ED25519):
         self.wallet_file = wallet_file
+        self.key_type = key_type
         self.private_key = None
         self.public_key = None
+        self.public_key_str = None
         self.address = None
 
         if not password:
             raise ValueError("Password is required to load or create a wallet.")
+        if key_type not in (KEY_TYPE_RSA, KEY_TYPE_ED25519):
+            raise ValueError(f"Unknown key type: {key_type}")
 
         self._load_or_create_wallet(password)
 
@@ -45,9 +58,13 @@ class ArthaWallet:
                 cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
                 private_key_pem = cipher.decrypt_and_verify(ciphertext, tag)
                 
-                self.private_key = RSA.import_key(private_key_pem)
-                self.public_key = self.private_key.publickey()
-                self.address = self._get_address_from_public_key(self.public_key.export_key().decode('utf-8'))
+                # Dompet lama tidak menyimpan jenis kunci: semuanya RSA.
+                self.key_type = wallet_data.get('key_type', KEY_TYPE_RSA)
+                if self.key_type == KEY_TYPE_ED25519:
+                    self.private_key = ECC.import_key(private_key_pem)
+                else:
+                    self.private_key = RSA.import_key(private_key_pem)
+                self._set_public_key()
                 logger.info(f"Wallet loaded successfully for address: {self.address}")
             except (ValueError, KeyError, TypeError) as e:
                 logger.error(f"Failed to load wallet. Incorrect password or corrupted file: {e}")
@@ -60,18 +77,29 @@ class ArthaWallet:
         """
         Membuat pasangan kunci baru dan menyimpannya dalam format terenkripsi.
         """
-        key = RSA.generate(2048)
-        self.private_key = key
-        self.public_key = key.publickey()
-        self.address = self._get_address_from_public_key(self.public_key.export_key().decode('utf-8'))
+        if self.key_type == KEY_TYPE_ED25519:
+            self.private_key = ECC.generate(curve='Ed25519')
+        else:
+            self.private_key = RSA.generate(2048)
+        self._set_public_key()
         self._save_wallet(password)
         logger.info(f"New wallet created! Your address: {self.address}")
 
+    def _set_public_key(self):
+        self.public_key = self.private_key.public_key()
+        if self.key_type == KEY_TYPE_ED25519:
+            self.public_key_str = ED25519_PREFIX + self.public_key.export_key(format='raw').hex()
+        else:
+            self.public_key_str = self.public_key.export_key().decode('utf-8')
+        self.address = self._get_address_from_public_key(self.public_key_str)
+
     def _save_wallet(self, password):
         """
         Menyimpan private key ke file, dienkripsi dengan password menggunakan AES-GCM.
         """
-        private_key_pem = self.private_key.export_key('PEM')
+        private_key_pem = self.private_key.export_key(format='PEM')
+        if isinstance(private_key_pem, str):
+            private_key_pem = private_key_pem.encode('utf-8')
         salt = os.urandom(16)
         key = scrypt(password.encode('utf-8'), salt, 32, N=2**14, r=8, p=1)
         cipher = AES.new(key, AES.MODE_GCM)
@@ -81,7 +109,8 @@ class ArthaWallet:
             'salt': salt.hex(),
             'nonce': cipher.nonce.hex(),
             'tag': tag.hex(),
-            'ciphertext': ciphertext.hex()
+            'ciphertext': ciphertext.hex(),
+            'key_type': self.key_type
         }
         
         filepath = os.path.join(get_data_dir(), self.wallet_file)
@@ -99,17 +128,73 @@ class ArthaWallet:
         if not self.private_key:
             raise ValueError("Private key not available for signing.")
         
-        tx_hash = SHA256.new(json_serialize(transaction_data))
+        if self.key_type == KEY_TYPE_ED25519:
+            return eddsa.new(self.private_key, 'rfc8032').sign(signing_bytes(transaction_data)).hex()
+        tx_hash = SHA256.new(signing_bytes(transaction_data))
         signer = pkcs1_15.new(self.private_key)
         return signer.sign(tx_hash).hex()
 
+    def sign_batch(self, outputs, version=TX_VERSION):
+        """
+        Signs a batch payment from this wallet to many recipients. `outputs` is a
+        list of (recipient, amount) pairs; returns the canonical outputs together
+        with the signature, ready for ArthaBlockchain.add_batch_transaction().
+        """
+        canonical_outputs = [[recipient, "{:.8f}".format(Decimal(amount))] for recipient, amount in outputs]
+        transaction_data = {'sender': self.address, 'outputs': canonical_outputs}
+        if version != 1:
+            transaction_data['version'] = version
+        return canonical_outputs, self.sign_transaction(transaction_data)
+
+    @staticmethod
+    def key_type_of(public_key_str):
+        return KEY_TYPE_ED25519 if public_key_str.startswith(ED25519_PREFIX) else KEY_TYPE_RSA
+
     @staticmethod
-    def verify_signature(transaction_data, public_key_str, signature_hex):
+    def import_public_key(public_key_str):
+        """
+        Parses a public key string into a key object. Raises ValueError if invalid.
+        """
+        if public_key_str.startswith(ED25519_PREFIX):
+            return eddsa.import_public_key(bytes.fromhex(public_key_str[len(ED25519_PREFIX):]))
+        return RSA.import_key(public_key_str)
+
+    @staticmethod
+    def verify_signature(transaction_data, public_key_str, signature_hex, public_key=None):
+        """
+        Verifies a transaction signature. `public_key` may be the already
+        imported form of `public_key_str`, to skip parsing it again.
+        """
         try:
-            public_key = RSA.import_key(public_key_str)
-            tx_hash = SHA256.new(json_serialize(transaction_data))
+            if public_key is None:
+                public_key = ArthaWallet.import_public_key(public_key_str)
+            if public_key_str.startswith(ED25519_PREFIX):
+                eddsa.new(public_key, 'rfc8032').verify(signing_bytes(transaction_data), bytes.fromhex(signature_hex))
+                return True
+            tx_hash = SHA256.new(signing_bytes(transaction_data))
             pkcs1_15.new(public_key).verify(tx_hash, bytes.fromhex(signature_hex))
             return True
-        except (ValueError, TypeError):
+        except (ValueError, TypeError, AttributeError):
             logger.debug("Signature verification failed.")
             return False
+
+    @staticmethod
+    def verify_merkle_proof(tx_id, header, proof, block_hash=None):
+        """
+        Light-client payment check: the transaction must be committed to by the
+        header's Merkle root and the header must carry a valid proof-of-work.
+        A peer can forge a low-difficulty header, so pass the hash of the block
+        at that height from a verified chain as `block_hash`; the header must
+        then hash to it.
+        """
+        try:
+            if header.get('version', 1) < 2:
+                return False
+            if block_hash is not None and header_hash(header) != block_hash:
+                return False
+            if not verify_merkle_proof(tx_id, proof, header['merkle_root']):
+                return False
+            return check_proof(proof_prefix(header), header['nonce'], header['difficulty'])
+        except (KeyError, TypeError, ValueError):
+            logger.debug("Merkle proof verification failed.")
+            return False
@@ -0,0 +1,144 @@
+# artha_worker.py
+#
+# Worker penambang ringan: mengambil job dari work server milik sebuah node
+# dan hanya melakukan hashing. Tidak butuh blockchain maupun dompet.
+#
+#   python3 artha_worker.py 127.0.0.1:5101 --workers 4
+
+import socket
+import threading
+import json
+import time
+import logging
+import sys
+import argparse
+
+from artha_mining import MiningEngine, MinerStats, default_worker_count
+
+RECONNECT_INTERVAL = 5
+STATS_INTERVAL = 30
+
+class WorkClient:
+    def __init__(self, host, port, engine, stats):
+        self.host = host
+        self.port = port
+        self.engine = engine
+        self.stats = stats
+        self.sock = None
+        self.send_lock = threading.Lock()
+        self.pending_job = None
+        self.job_event = threading.Event()
+
+    def connect(self):
+        self.sock = socket.create_connection((self.host, self.port), timeout=10)
+        self.sock.settimeout(None)
+        self.pending_job = None
+        self.job_event.clear()
+        threading.Thread(target=self._read_loop, args=(self.sock,), daemon=True).start()
+        logging.info(f"Terhubung ke work server {self.host}:{self.port}")
+
+    def _read_loop(self, sock):
+        buffer = b''
+        try:
+            while True:
+                data = sock.recv(4096)
+                if not data:
+                    break
+                buffer += data
+                while b'\n' in buffer:
+                    line, buffer = buffer.split(b'\n', 1)
+                    if line:
+                        self._handle_message(json.loads(line.decode('utf-8')))
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning(f"Koneksi ke work server terputus: {e}")
+        finally:
+            # Membangunkan loop utama agar menyambung ulang.
+            self.pending_job = None
+            self.engine.cancel()
+            self.job_event.set()
+
+    def _handle_message(self, message):
+        msg_type = message.get('type')
+        data = message.get('data') or {}
+        if msg_type == 'JOB':
+            self.pending_job = data
+            self.engine.cancel()
+            self.job_event.set()
+        elif msg_type == 'RESULT':
+            if data.get('accepted'):
+                logging.info(f"Solusi untuk job {data.get('job_id')} diterima!")
+            else:
+                logging.info(f"Solusi untuk job {data.get('job_id')} ditolak: {data.get('reason')}")
+
+    def send(self, message_type, data):
+        message = {'type': message_type, 'data': data, 'timestamp': time.time()}
+        with self.send_lock:
+            self.sock.sendall((json.dumps(message) + '\n').encode('utf-8'))
+
+    def request_job(self):
+        self.send('GET_JOB', {'hashrate': sum(self.stats.hashrates())})
+
+    def run(self):
+        self.request_job()
+        while True:
+            self.job_event.wait()
+            self.job_event.clear()
+            job = self.pending_job
+            if job is None:
+                return
+            logging.info(f"Job {job['job_id']}: kesulitan {job['difficulty']}, nonce {job['nonce_start']}..{job['nonce_end']}")
+            job_started = time.perf_counter()
+            # Job baru yang datang sebelum job ini terkirim ke engine belum bisa dibatalkan oleh cancel().
+            nonce = self.engine.search(job['proof_prefix'], job['difficulty'], is_stale=self.job_event.is_set,
+                                       nonce_start=job['nonce_start'], nonce_end=job['nonce_end'])
+            job_time = time.perf_counter() - job_started
+            if nonce is not None:
+                logging.info(f"Solusi ditemukan untuk job {job['job_id']}: nonce {nonce}")
+                self.stats.record_job(job_time, 'found')
+                self.send('SUBMIT', {'job_id': job['job_id'], 'nonce': nonce})
+                self.request_job()
+            elif not self.job_event.is_set():
+                # Rentang nonce habis tanpa job pengganti: minta job berikutnya.
+                self.stats.record_job(job_time, 'exhausted')
+                self.request_job()
+            else:
+                self.stats.record_job(job_time, 'stale')
+
+def stats_reporter(stats):
+    while True:
+        time.sleep(STATS_INTERVAL)
+        stats.sample()
+        logging.info(f"Statistik: {stats.summary()}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="ArthaChain mining worker")
+    parser.add_argument('server', help="Alamat work server, misalnya 127.0.0.1:5101")
+    parser.add_argument('-w', '--workers', type=int, default=default_worker_count(),
+                        help="Jumlah proses penambang (default: jumlah core CPU)")
+    return parser.parse_args()
+
+def run_worker():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', stream=sys.stdout)
+    host, port_str = args.server.rsplit(':', 1)
+
+    engine = MiningEngine(args.workers)
+    stats = MinerStats(engine)
+    stats.sample()
+    threading.Thread(target=stats_reporter, args=(stats,), daemon=True).start()
+    client = WorkClient(host, int(port_str), engine, stats)
+    try:
+        while True:
+            try:
+                client.connect()
+                client.run()
+            except OSError as e:
+                logging.warning(f"Gagal terhubung ke work server: {e}")
+            time.sleep(RECONNECT_INTERVAL)
+    except KeyboardInterrupt:
+        logging.info("\nWorker dihentikan.")
+    finally:
+        engine.stop()
+
+if __name__ == '__main__':
+    run_worker()
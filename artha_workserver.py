@@ -0,0 +1,270 @@
+# artha_workserver.py
+
+import socket
+import threading
+import json
+import time
+import logging
+from collections import deque
+
+from artha_events import TipChanged, TxAdded
+from artha_utils import proof_prefix
+
+logger = logging.getLogger(__name__)
+
+WORK_SERVER_HOST = '127.0.0.1'
+WORK_SERVER_PORT = 5101
+# Setiap permintaan job mendapat rentang nonce sendiri yang tidak tumpang tindih.
+NONCE_RANGE_SIZE = 2**28
+# Nonce di bawah offset ini dipakai oleh MiningEngine lokal di proses node.
+REMOTE_NONCE_OFFSET = 2**40
+# Solusi untuk job yang lebih lama dari ini ditolak; job lama beserta kandidatnya dibuang.
+MAX_JOBS_PER_WORKER = 4
+# Perubahan template (transaksi baru) dikirim ke worker paling sering sekali per interval ini.
+TEMPLATE_PUSH_INTERVAL = 1.0
+
+class WorkServer:
+    """
+    Hands out mining jobs (previous hash, proof prefix, difficulty, nonce range)
+    to external workers over newline-delimited JSON and turns their solutions
+    into blocks.
+
+    Client -> server: GET_JOB {hashrate}, SUBMIT {job_id, nonce}
+    Server -> client: JOB {job_id, previous_hash, proof_prefix, difficulty, nonce_start, nonce_end},
+                      RESULT {job_id, accepted, reason}
+    A JOB is also pushed to every worker when the chain tip or the block
+    template changes; workers must drop whatever they were doing when they
+    receive one. Template pushes are batched to one per
+    TEMPLATE_PUSH_INTERVAL and share one candidate block, and only the last
+    MAX_JOBS_PER_WORKER jobs of each worker are kept.
+    """
+
+    def __init__(self, blockchain, node, miner_address, host=WORK_SERVER_HOST, port=WORK_SERVER_PORT, stats=None):
+        self.blockchain = blockchain
+        self.node = node
+        self.miner_address = miner_address
+        self.stats = stats
+        self.host = host
+        self.port = port
+        self.server_socket = None
+        self.is_running = True
+        self.lock = threading.RLock()
+        self.workers = {}
+        self.jobs = {}
+        self.worker_jobs = {}
+        self.push_timer = None
+        self.last_template_push = 0
+        self.next_range = REMOTE_NONCE_OFFSET
+        self.job_counter = 0
+
+        node.events.subscribe((TipChanged, TxAdded), callback=self._on_event)
+
+    def start(self):
+        threading.Thread(target=self._start_server, daemon=True).start()
+        logger.info(f"Work server started at {self.host}:{self.port}")
+
+    def stop(self):
+        self.is_running = False
+        if self.server_socket:
+            try:
+                self.server_socket.close()
+            except OSError:
+                pass
+        with self.lock:
+            for conn in self.workers.values():
+                try:
+                    conn.close()
+                except OSError:
+                    pass
+            self.workers.clear()
+            if self.push_timer:
+                self.push_timer.cancel()
+
+    def _start_server(self):
+        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            self.server_socket.bind((self.host, self.port))
+            self.server_socket.listen(10)
+            while self.is_running:
+                try:
+                    conn, addr = self.server_socket.accept()
+                except OSError:
+                    break
+                worker_address = f"{addr[0]}:{addr[1]}"
+                threading.Thread(target=self._handle_worker, args=(conn, worker_address), daemon=True).start()
+        except Exception as e:
+            if self.is_running:
+                logger.error(f"Work server failed at {self.host}:{self.port}: {e}")
+        finally:
+            self.server_socket.close()
+
+    def _handle_worker(self, conn, worker_address):
+        with self.lock:
+            self.workers[worker_address] = conn
+        logger.info(f"Mining worker connected: {worker_address}")
+        buffer = b''
+        try:
+            while self.is_running:
+                data = conn.recv(4096)
+                if not data:
+                    break
+                buffer += data
+                while b'\n' in buffer:
+                    line, buffer = buffer.split(b'\n', 1)
+                    if not line:
+                        continue
+                    try:
+                        message = json.loads(line.decode('utf-8'))
+                    except json.JSONDecodeError:
+                        logger.debug(f"Invalid JSON from worker {worker_address}")
+                        continue
+                    self._process_message(message, worker_address)
+        except OSError as e:
+            logger.info(f"Worker {worker_address} disconnected: {e}")
+        finally:
+            with self.lock:
+                self.workers.pop(worker_address, None)
+                for job_id in self.worker_jobs.pop(worker_address, ()):
+                    self.jobs.pop(job_id, None)
+            if self.stats:
+                self.stats.remove_remote_worker(worker_address)
+            conn.close()
+            logger.info(f"Mining worker {worker_address} closed.")
+
+    def _process_message(self, message, worker_address):
+        msg_type = message.get('type')
+        data = message.get('data') or {}
+        if msg_type == 'GET_JOB':
+            if self.stats and isinstance(data.get('hashrate'), (int, float)):
+                self.stats.record_remote_worker(worker_address, data['hashrate'])
+            job = self._new_job(worker_address)
+            if job:
+                self._send(worker_address, 'JOB', job)
+        elif msg_type == 'SUBMIT':
+            accepted, reason = self._submit(data.get('job_id'), data.get('nonce'))
+            self._send(worker_address, 'RESULT', {'job_id': data.get('job_id'), 'accepted': accepted, 'reason': reason})
+
+    def _new_job(self, worker_address, candidate=None):
+        """
+        Returns a job with a fresh nonce range over `candidate` (default: a
+        newly prepared block) and forgets the worker's oldest job if it has
+        more than MAX_JOBS_PER_WORKER.
+        """
+        candidate = candidate or self.blockchain.prepare_block(self.miner_address)
+        if not candidate:
+            return None
+        with self.lock:
+            self.job_counter += 1
+            nonce_start = self.next_range
+            self.next_range += NONCE_RANGE_SIZE
+            job = {
+                'job_id': f"{candidate['index']}-{self.job_counter}",
+                'previous_hash': candidate['previous_hash'],
+                'proof_prefix': proof_prefix(candidate),
+                'difficulty': candidate['difficulty'],
+                'nonce_start': nonce_start,
+                'nonce_end': nonce_start + NONCE_RANGE_SIZE
+            }
+            self.jobs[job['job_id']] = (job, candidate)
+            worker_jobs = self.worker_jobs.setdefault(worker_address, deque())
+            worker_jobs.append(job['job_id'])
+            if len(worker_jobs) > MAX_JOBS_PER_WORKER:
+                self.jobs.pop(worker_jobs.popleft(), None)
+        return job
+
+    def _submit(self, job_id, nonce):
+        with self.lock:
+            job, candidate = self.jobs.get(job_id, (None, None))
+        if not job or not isinstance(nonce, int):
+            return False, 'unknown job'
+        if not job['nonce_start'] <= nonce < job['nonce_end']:
+            return False, 'nonce out of range'
+        if self.blockchain.state.tip_hash != job['previous_hash']:
+            if self.stats:
+                self.stats.record_job(None, 'stale')
+            return False, 'stale'
+        if not self.blockchain.is_valid_proof(job['proof_prefix'], nonce, job['difficulty']):
+            return False, 'invalid proof'
+
+        if self.stats:
+            self.stats.mark_solution()
+        new_block = dict(candidate, nonce=nonce)
+        if self.blockchain.check_found_block(new_block):
+            logger.info(f"Block #{new_block['index']} found by external worker, broadcasting.")
+            self.node.broadcast_block(new_block)
+            if self.stats:
+                self.stats.record_job(None, 'found')
+                self.stats.record_broadcast()
+            if not self.blockchain.connect_found_block(new_block):
+                logger.warning(f"Block #{new_block['index']} was broadcast but no longer extends the tip.")
+            return True, 'ok'
+        if self.stats:
+            self.stats.record_rejected()
+        return False, 'rejected'
+
+    def _on_event(self, event):
+        if isinstance(event, TipChanged):
+            self._on_tip_changed()
+        else:
+            self._on_template_changed()
+
+    def _on_tip_changed(self):
+        with self.lock:
+            self.jobs.clear()
+            self.worker_jobs.clear()
+            self.next_range = REMOTE_NONCE_OFFSET
+            if self.push_timer:
+                self.push_timer.cancel()
+                self.push_timer = None
+        # Pekerjaan lama tidak lagi berguna: kirim job baru ke semua worker.
+        self._push_jobs()
+
+    def _on_template_changed(self):
+        # Job lama tetap sah (kandidatnya lengkap), tetapi job baru memuat transaksi terbaru.
+        # Transaksi yang datang beruntun digabung dalam satu pengiriman.
+        with self.lock:
+            if self.push_timer or not self.is_running:
+                return
+            now = time.monotonic()
+            delay = self.last_template_push + TEMPLATE_PUSH_INTERVAL - now
+            if delay > 0:
+                self.push_timer = threading.Timer(delay, self._push_template)
+                self.push_timer.daemon = True
+                self.push_timer.start()
+                return
+            self.last_template_push = now
+        self._push_jobs()
+
+    def _push_template(self):
+        with self.lock:
+            self.push_timer = None
+        self._push_jobs()
+
+    def _push_jobs(self):
+        with self.lock:
+            worker_addresses = list(self.workers.keys())
+            self.last_template_push = time.monotonic()
+        if not worker_addresses:
+            return
+        # Satu kandidat untuk semua worker; rentang nonce tiap job tetap berbeda.
+        candidate = self.blockchain.prepare_block(self.miner_address)
+        if not candidate:
+            return
+        for worker_address in worker_addresses:
+            job = self._new_job(worker_address, candidate)
+            if job:
+                self._send(worker_address, 'JOB', job)
+
+    def _send(self, worker_address, message_type, data):
+        message = {'type': message_type, 'data': data, 'timestamp': time.time()}
+        with self.lock:
+            conn = self.workers.get(worker_address)
+            if not conn:
+                return False
+            try:
+                conn.sendall((json.dumps(message) + '\n').encode('utf-8'))
+                return True
+            except OSError as e:
+                logger.warning(f"Failed to send to worker {worker_address}: {e}")
+                return False
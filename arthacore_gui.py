@@ -16,6 +16,10 @@ try:
     from artha_wallet import ArthaWallet
     from artha_blockchain import ArthaBlockchain
     from artha_node import ArthaNode
+    from artha_utils import transaction_outputs, transaction_total, transaction_id
+    from artha_encoding import TX_VERSION
+    from artha_events import (BlockConnected, BlockDisconnected, TipChanged, TxAdded, TxRemoved,
+                              PeerUp, PeerDown)
 except ImportError as e:
     print(f"Error: Pastikan semua modul ArthaChain tersedia di folder ini. ({e})")
     sys.exit(1)
@@ -23,6 +27,12 @@ except ImportError as e:
 # --- Konfigurasi Logging ---
 LOG_FILE_PATH = ""
 
+# Penjelajah: jumlah blok per halaman dan baris maksimum yang dimuat per daftar.
+EXPLORER_PAGE_SIZE = 50
+EXPLORER_WINDOW = 200
+# Halaman berikutnya dimuat saat posisi gulir sejauh ini dari ujung daftar.
+EXPLORER_PRELOAD = 0.1
+
 class QueueHandler(logging.Handler):
     def __init__(self, log_queue):
         super().__init__()
@@ -30,6 +40,225 @@ class QueueHandler(logging.Handler):
     def emit(self, record):
         self.log_queue.put(self.format(record))
 
+# --- Pekerja Query Latar Belakang ---
+class QueryJob:
+    def __init__(self, key, fn, on_done, on_error):
+        self.key = key
+        self.fn = fn
+        self.on_done = on_done
+        self.on_error = on_error
+        self.cancelled = threading.Event()
+
+    def is_cancelled(self):
+        return self.cancelled.is_set()
+
+class QueryWorker:
+    """
+    Runs slow queries (chain scans, balance lookups, signing) off the Tk event
+    loop. Results are queued and handed to their callbacks on the Tk thread by
+    poll(), which the GUI calls with after() like process_log_queue. A new job
+    with the same key cancels the one before it, unless either was submitted
+    with cancellable=False (jobs with side effects, like sending a payment);
+    long jobs should check the is_cancelled callable they receive and return early.
+    """
+
+    def __init__(self, workers=2):
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.lock = threading.Lock()
+        self.latest = {}
+        self.pending = 0
+        self.workers = workers
+        for _ in range(workers):
+            threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, key, fn, on_done, on_error=None, cancellable=True):
+        job = QueryJob(key, fn, on_done, on_error)
+        with self.lock:
+            if cancellable:
+                previous = self.latest.get(key)
+                if previous:
+                    previous.cancelled.set()
+                self.latest[key] = job
+            self.pending += 1
+        self.jobs.put(job)
+        return job
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            result, error = None, None
+            if not job.is_cancelled():
+                try:
+                    result = job.fn(job.is_cancelled)
+                except Exception as e:
+                    error = e
+            self.results.put((job, result, error))
+
+    @property
+    def busy(self):
+        return self.pending > 0
+
+    def poll(self):
+        """
+        Delivers finished jobs to their callbacks. Must run on the Tk thread.
+        """
+        while True:
+            try:
+                job, result, error = self.results.get_nowait()
+            except queue.Empty:
+                return
+            with self.lock:
+                self.pending -= 1
+                if self.latest.get(job.key) is job:
+                    del self.latest[job.key]
+            if job.is_cancelled():
+                continue
+            # Callback yang gagal tidak boleh menghentikan pengiriman hasil berikutnya.
+            try:
+                if error is not None:
+                    if job.on_error:
+                        job.on_error(error)
+                    else:
+                        logging.error(f"Query {job.key} gagal: {error}")
+                else:
+                    job.on_done(result)
+            except Exception as e:
+                logging.error(f"Gagal menampilkan hasil query {job.key}: {e}")
+
+    def stop(self):
+        for _ in range(self.workers):
+            self.jobs.put(None)
+
+class PagedTree:
+    """
+    Newest-first view of an unbounded list in a Treeview. At most `window`
+    rows are loaded: pages are fetched on the query worker when the user
+    scrolls near either end, and rows past the window are dropped from the
+    other end, so memory and render time do not grow with the history.
+
+    `fetch(cursor, older, limit)` returns (rows, more) with rows as
+    (iid, height, values) or (iid, height, values, tag) newest first, from the blocks below `cursor` (or
+    from the tip if None) when `older`, else from the blocks above it.
+    A block's rows always arrive in the same page and are dropped together.
+    """
+
+    def __init__(self, tree, scrollbar, worker, name, fetch=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.worker = worker
+        self.name = name
+        self.fetch = fetch
+        self.rows = []
+        self.at_head = True
+        self.at_end = False
+        self.loading = False
+        self.refresh_needed = False
+        self.generation = 0
+        tree.configure(yscrollcommand=self._on_scroll)
+
+    def reset(self, fetch=None):
+        if fetch:
+            self.fetch = fetch
+        self.generation += 1
+        self.tree.delete(*[iid for iid, _ in self.rows])
+        self.rows = []
+        self.at_head, self.at_end, self.loading, self.refresh_needed = True, False, False, False
+        if self.fetch:
+            self._load(None, older=True)
+
+    def discard_from(self, height):
+        """
+        Drops the rows of blocks at `height` and above, e.g. after a reorganization.
+        """
+        cut = 0
+        while cut < len(self.rows) and self.rows[cut][1] >= height:
+            cut += 1
+        if cut:
+            self.tree.delete(*[iid for iid, _ in self.rows[:cut]])
+            self.rows = self.rows[cut:]
+            self.at_head = True
+        # Halaman yang sedang dimuat mungkin berisi blok yang baru saja dilepas.
+        self.generation += 1
+        self.loading = False
+        self.refresh_needed = False
+
+    def chain_changed(self):
+        # Blok baru hanya ditampilkan langsung jika daftar sedang berada di puncak.
+        if self.loading:
+            self.refresh_needed = True
+        elif not self.rows:
+            self.reset()
+        elif self.at_head:
+            self._load(self.rows[0][1], older=False)
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if float(last) >= 1 - EXPLORER_PRELOAD and not self.at_end and self.rows:
+            self._load(self.rows[-1][1], older=True)
+        elif float(first) <= EXPLORER_PRELOAD and not self.at_head and self.rows:
+            self._load(self.rows[0][1], older=False, keep_position=True)
+
+    def _load(self, cursor, older, keep_position=False):
+        if self.loading or not self.fetch:
+            return
+        self.loading = True
+        generation, fetch = self.generation, self.fetch
+        self.worker.submit(self.name, lambda cancelled: fetch(cursor, older, EXPLORER_PAGE_SIZE),
+                           lambda result: self._loaded(generation, older, keep_position, result),
+                           on_error=lambda e: self._failed(generation, e))
+
+    def _failed(self, generation, error):
+        if generation == self.generation:
+            self.loading = False
+        logging.error(f"Gagal memuat halaman {self.name}: {error}")
+
+    def _loaded(self, generation, older, keep_position, result):
+        if generation != self.generation:
+            return
+        self.loading = False
+        rows, more = result
+        if older:
+            for iid, height, values, *tags in rows:
+                self.tree.insert("", "end", iid=iid, values=values, tags=tags)
+                self.rows.append((iid, height))
+            self.at_end = not more
+            self._trim(from_top=True)
+        else:
+            for iid, height, values, *tags in reversed(rows):
+                self.tree.insert("", 0, iid=iid, values=values, tags=tags)
+                self.rows.insert(0, (iid, height))
+            self.at_head = not more
+            if keep_position and rows:
+                # Baris yang sedang dilihat tetap di tempatnya saat halaman baru masuk di atasnya.
+                self.tree.yview_scroll(len(rows), "units")
+            self._trim(from_top=False)
+        if self.refresh_needed:
+            self.refresh_needed = False
+            self.chain_changed()
+
+    def _trim(self, from_top):
+        excess = len(self.rows) - EXPLORER_WINDOW
+        if excess <= 0:
+            return
+        if from_top:
+            cut = excess
+            while cut < len(self.rows) and self.rows[cut][1] == self.rows[cut - 1][1]:
+                cut += 1
+            removed, self.rows = self.rows[:cut], self.rows[cut:]
+            self.at_head = False
+        else:
+            cut = len(self.rows) - excess
+            while cut > 0 and self.rows[cut][1] == self.rows[cut - 1][1]:
+                cut -= 1
+            removed, self.rows = self.rows[cut:], self.rows[:cut]
+            self.at_end = False
+        self.tree.delete(*[iid for iid, _ in removed])
+        if from_top:
+            self.tree.yview_scroll(-len(removed), "units")
+
 def setup_gui_logging(port):
     global LOG_FILE_PATH
     log_dir = os.path.join(os.path.expanduser("~"), ".artha_chain", "logs")
@@ -73,6 +302,11 @@ class ArthaCore(ThemedTk):
         self.node = None
         self.password = None
         self.is_running = True
+        self.events = None
+        # Baris yang sedang tampil, agar event cukup menyisipkan/menghapus baris yang terdampak.
+        self.mempool_ids = []
+        self.peer_rows = []
+        self.query_worker = QueryWorker()
 
         # Status variabel
         self.address_var = tk.StringVar(value="Memuat...")
@@ -136,20 +370,24 @@ class ArthaCore(ThemedTk):
         try:
             self.wallet = ArthaWallet(password=self.password)
             self.blockchain = ArthaBlockchain()
+            # Berlangganan sebelum node berjalan agar tidak ada event peer yang terlewat.
+            self.events = self.blockchain.events.subscribe()
             
             app_port = int(sys.argv[1]) if len(sys.argv) > 1 else 5002
             setup_gui_logging(app_port)
             
-            self.node = ArthaNode('0.0.0.0', app_port, self.blockchain, new_tx_event=None)
+            self.node = ArthaNode('0.0.0.0', app_port, self.blockchain)
             threading.Thread(target=self.node.start, daemon=True).start()
             
             self.address_var.set(self.wallet.get_public_address())
             self.status_text.set("Terhubung ke Jaringan")
             logging.info(f"Node aktif di port {app_port}")
             
-            # Memulai loop update
+            # Muat tampilan sekali, lalu perbarui dari event
             self.update_gui_data()
+            self.process_events()
             self.process_log_queue()
+            self.process_query_results()
         except Exception as e:
             messagebox.showerror("Gagal Inisialisasi", f"Terjadi kesalahan: {e}")
             self.destroy()
@@ -190,6 +428,8 @@ class ArthaCore(ThemedTk):
         self.status_bar.pack(side="bottom", fill="x")
         
         ttk.Label(self.status_bar, textvariable=self.status_text, style="Status.TLabel").pack(side="left", padx=10)
+        self.busy_indicator = ttk.Progressbar(self.status_bar, mode="indeterminate", length=80)
+        self.busy_indicator.pack(side="right", padx=10)
         self.status_peers = ttk.Label(self.status_bar, text="Peers: 0", style="Status.TLabel")
         self.status_peers.pack(side="right", padx=10)
         self.status_height = ttk.Label(self.status_bar, text="Tinggi Blok: 0", style="Status.TLabel")
@@ -256,7 +496,6 @@ class ArthaCore(ThemedTk):
         self.trans_tree.column('Partner', width=350)
         
         sb = ttk.Scrollbar(self.tab_transactions, orient="vertical", command=self.trans_tree.yview)
-        self.trans_tree.configure(yscrollcommand=sb.set)
         
         self.trans_tree.pack(side="left", fill="both", expand=True)
         sb.pack(side="right", fill="y")
@@ -264,15 +503,18 @@ class ArthaCore(ThemedTk):
         self.trans_tree.tag_configure('sent', foreground='#e74c3c')
         self.trans_tree.tag_configure('received', foreground='#27ae60')
         self.trans_tree.tag_configure('reward', foreground='#2980b9')
+        # Riwayat dompet dimuat per halaman dari indeks alamat, seperti tab explorer.
+        self.history_pages = PagedTree(self.trans_tree, sb, self.query_worker, 'history-page', self.fetch_history)
 
     def build_explorer(self):
         header = ttk.Frame(self.tab_explorer)
         header.pack(fill="x", pady=(0, 15))
         
-        ttk.Label(header, text="Cari Alamat/Hash:").pack(side="left", padx=5)
+        ttk.Label(header, text="Cari Alamat/Blok/TX:").pack(side="left", padx=5)
         self.explorer_search_var = tk.StringVar()
         search_entry = ttk.Entry(header, textvariable=self.explorer_search_var, font=("Consolas", 10))
         search_entry.pack(side="left", fill="x", expand=True, padx=5)
+        search_entry.bind("<Return>", lambda e: self.search_explorer())
         ttk.Button(header, text="Cari", command=self.search_explorer).pack(side="left", padx=5)
         
         # Fitur Copy Alamat yang sedang dicari
@@ -283,16 +525,20 @@ class ArthaCore(ThemedTk):
         self.exp_notebook = ttk.Notebook(self.tab_explorer)
         self.exp_notebook.pack(fill="both", expand=True)
         
-        # Blok Terbaru
+        # Daftar Blok (dimuat per halaman saat digulir)
         self.tab_blocks = ttk.Frame(self.exp_notebook, padding=10)
-        self.exp_notebook.add(self.tab_blocks, text=" Blok Terbaru ")
+        self.exp_notebook.add(self.tab_blocks, text=" Blok ")
         
         cols_b = ('Index', 'Hash', 'Miner', 'TX')
         self.blocks_tree = ttk.Treeview(self.tab_blocks, columns=cols_b, show='headings')
         for col in cols_b:
             self.blocks_tree.heading(col, text=col)
             self.blocks_tree.column(col, anchor='center')
-        self.blocks_tree.pack(fill="both", expand=True)
+        self.blocks_tree.pack(side="left", fill="both", expand=True)
+        sb_b = ttk.Scrollbar(self.tab_blocks, command=self.blocks_tree.yview)
+        sb_b.pack(side="right", fill="y")
+        self.blocks_tree.bind("<Double-1>", lambda e: self.open_selected_block())
+        self.block_pages = PagedTree(self.blocks_tree, sb_b, self.query_worker, 'block-page', self.fetch_blocks)
         
         # Hasil Pencarian
         self.tab_search_res = ttk.Frame(self.exp_notebook, padding=10)
@@ -306,7 +552,21 @@ class ArthaCore(ThemedTk):
         for col in cols_s:
             self.search_tree.heading(col, text=col)
             self.search_tree.column(col, anchor='center')
-        self.search_tree.pack(fill="both", expand=True)
+        self.search_tree.pack(side="left", fill="both", expand=True)
+        sb_s = ttk.Scrollbar(self.tab_search_res, command=self.search_tree.yview)
+        sb_s.pack(side="right", fill="y")
+        self.search_tree.bind("<Double-1>", lambda e: self.open_selected_tx())
+        self.search_pages = PagedTree(self.search_tree, sb_s, self.query_worker, 'search-page')
+        
+        # Detail Blok / Transaksi
+        self.tab_detail = ttk.Frame(self.exp_notebook, padding=10)
+        self.exp_notebook.add(self.tab_detail, text=" Detail ")
+        
+        self.detail_text = tk.Text(self.tab_detail, font=("Consolas", 10), state="disabled", wrap="none", border=0)
+        self.detail_text.pack(side="left", fill="both", expand=True)
+        sb_d = ttk.Scrollbar(self.tab_detail, command=self.detail_text.yview)
+        self.detail_text.configure(yscrollcommand=sb_d.set)
+        sb_d.pack(side="right", fill="y")
 
     def build_network(self):
         container = ttk.PanedWindow(self.tab_network, orient="horizontal")
@@ -338,72 +598,172 @@ class ArthaCore(ThemedTk):
     # --- LOGIC & UPDATES ---
 
     def update_gui_data(self):
+        """
+        Rebuilds every view from the current state. Only used at start-up and
+        when events were missed; otherwise process_events() applies changes.
+        """
         if not self.is_running or not all([self.wallet, self.blockchain, self.node]):
-            self.after(2000, self.update_gui_data)
             return
         
         try:
-            # 1. Update Saldo
-            bal = self.blockchain.get_balance(self.wallet.get_public_address())
-            self.balance_var.set(f"{bal:.8f}")
+            self.events.take_missed()
+            self.refresh_balance()
             
-            # 2. Update Status Bar
-            with self.node.lock:
-                peers_count = len(self.node.peers)
-            self.status_peers.config(text=f"Peers: {peers_count}")
-            self.status_height.config(text=f"Tinggi Blok: {len(self.blockchain.chain) - 1}")
+            state = self.blockchain.state
+            self.refresh_recent()
+            
+            self.history_pages.reset()
+            self.block_pages.reset()
+            self.search_pages.reset()
             
-            # 3. Update Peer Listbox
             self.peer_listbox.delete(0, tk.END)
+            self.peer_rows = []
             with self.node.lock:
-                for p in self.node.peers.keys():
-                    self.peer_listbox.insert(tk.END, f"🟢 {p}")
+                peers = list(self.node.peers.keys())
+            for peer in peers:
+                self.add_peer(peer)
             
-            # 4. Update Mempool
             self.mempool_listbox.delete(0, tk.END)
-            for tx in self.blockchain.pending_transactions:
-                self.mempool_listbox.insert(tk.END, f"TX {tx['transaction_id'][:12]}... ({tx['amount']} ARTH)")
-            
-            # 5. Refresh Tabel-tabel
-            self.refresh_transactions()
-            self.refresh_blocks()
-            
+            self.mempool_ids = []
+            for tx in state.pending:
+                self.add_mempool_tx(tx['transaction_id'], tx)
         except Exception as e:
             logging.error(f"Gagal memperbarui data GUI: {e}")
-            
-        self.after(5000, self.update_gui_data)
 
-    def refresh_transactions(self):
-        # Refresh Tabel Riwayat Utama
-        self.trans_tree.delete(*self.trans_tree.get_children())
+    def process_events(self):
+        if not self.is_running:
+            return
+        try:
+            events = self.events.drain()
+            if self.events.take_missed() or any(isinstance(e, TipChanged) and e.reset for e in events):
+                # Antrean penuh atau rantai diganti snapshot: bangun ulang sekali.
+                self.update_gui_data()
+            elif events:
+                self.apply_events(events)
+        except Exception as e:
+            logging.error(f"Gagal memperbarui data GUI: {e}")
+        self.after(250, self.process_events)
+
+    def apply_events(self, events):
+        chain_changed = False
+        fork_height = None
+        for event in events:
+            if isinstance(event, BlockConnected):
+                chain_changed = True
+            elif isinstance(event, BlockDisconnected):
+                fork_height = event.height if fork_height is None else min(fork_height, event.height)
+                chain_changed = True
+            elif isinstance(event, TxAdded):
+                self.add_mempool_tx(event.tx_id, event.tx)
+            elif isinstance(event, TxRemoved):
+                self.remove_mempool_tx(event.tx_id)
+            elif isinstance(event, PeerUp):
+                self.add_peer(event.peer)
+            elif isinstance(event, PeerDown):
+                self.remove_peer(event.peer)
+        if chain_changed:
+            self.refresh_recent()
+            for pages in (self.history_pages, self.block_pages, self.search_pages):
+                if fork_height is not None:
+                    pages.discard_from(fork_height)
+                pages.chain_changed()
+        self.refresh_balance()
+
+    def refresh_balance(self):
+        address = self.wallet.get_public_address()
+        self.query_worker.submit('balance', lambda cancelled: self.blockchain.get_balance(address),
+                                 lambda bal: self.balance_var.set(f"{bal:.8f}"))
+        self.status_peers.config(text=f"Peers: {len(self.peer_rows)}")
+        self.status_height.config(text=f"Tinggi Blok: {self.blockchain.state.height}")
+
+    def refresh_recent(self):
+        # Ikhtisar menampilkan 5 transaksi terbaru dompet.
+        self.query_worker.submit('recent', lambda cancelled: self.fetch_history(None, True, 5)[0], self.show_recent)
+
+    def show_recent(self, rows):
         self.recent_tree.delete(*self.recent_tree.get_children())
-        
+        for _, _, values, tag in rows[:5]:
+            self.recent_tree.insert("", "end", values=(values[1], values[2], "Terkonfirmasi"), tags=(tag,))
+
+    def fetch_history(self, cursor, older, limit):
         my_addr = self.wallet.get_public_address()
-        count = 0
-        for block in reversed(self.blockchain.chain):
-            for tx in reversed(block['transactions']):
-                if tx['sender'] == my_addr or tx['recipient'] == my_addr:
-                    waktu = time.strftime('%d/%m %H:%M', time.localtime(tx['timestamp']))
-                    if tx['sender'] == my_addr:
-                        tag, tipe, amt, partner = 'sent', 'KELUAR', f"-{tx['amount']}", tx['recipient']
-                    elif tx['sender'] == '0':
-                        tag, tipe, amt, partner = 'reward', 'MINING', f"+{tx['amount']}", 'System'
-                    else:
-                        tag, tipe, amt, partner = 'received', 'MASUK', f"+{tx['amount']}", tx['sender']
-                    
-                    # Insert ke Riwayat Utama
-                    self.trans_tree.insert("", "end", values=(waktu, tipe, amt, partner, block['index']), tags=(tag,))
-                    
-                    # Insert ke Ikhtisar (maks 5)
-                    if count < 5:
-                        self.recent_tree.insert("", "end", values=(tipe, amt, "Terkonfirmasi"), tags=(tag,))
-                    count += 1
-
-    def refresh_blocks(self):
-        self.blocks_tree.delete(*self.blocks_tree.get_children())
-        for block in reversed(self.blockchain.chain[-15:]):
-            b_hash = self.blockchain.hash_block(block)[:16] + "..."
-            self.blocks_tree.insert("", "end", values=(block['index'], b_hash, block['miner_address'][:12]+"...", len(block['transactions'])))
+        if older:
+            history, more = self.blockchain.get_address_history(my_addr, before=cursor, limit=limit)
+        else:
+            history, more = self.blockchain.get_address_history(my_addr, after=cursor, limit=limit)
+        rows = []
+        for height, tx in history:
+            outputs = transaction_outputs(tx)
+            received = [Decimal(amount) for recipient, amount in outputs if recipient == my_addr]
+            waktu = time.strftime('%d/%m %H:%M', time.localtime(tx['timestamp']))
+            if tx['sender'] == my_addr:
+                partner = outputs[0][0] if len(outputs) == 1 else f"{len(outputs)} penerima"
+                tag, tipe, amt = 'sent', 'KELUAR', f"-{transaction_total(tx):.8f}"
+            elif tx['sender'] == '0':
+                tag, tipe, amt, partner = 'reward', 'MINING', f"+{sum(received):.8f}", 'System'
+            else:
+                tag, tipe, amt, partner = 'received', 'MASUK', f"+{sum(received):.8f}", tx['sender']
+            rows.append((f"history-{height}-{transaction_id(tx)}", height, (waktu, tipe, amt, partner, height), tag))
+        return rows, more
+
+    def fetch_blocks(self, cursor, older, limit):
+        state = self.blockchain.state
+        chain = state.chain
+        if older:
+            top = len(chain) if cursor is None else cursor
+            heights, more = range(top - 1, max(0, top - limit) - 1, -1), top - limit > 0
+        else:
+            top = min(len(chain), cursor + 1 + limit)
+            heights, more = range(top - 1, cursor, -1), top < len(chain)
+        rows = []
+        for height in heights:
+            block = chain[height]
+            # Hash blok tercatat di blok berikutnya; hash tip ada di snapshot state.
+            block_hash = chain[height + 1]['previous_hash'] if height + 1 < len(chain) else state.tip_hash
+            tx_count = block['tx_count'] if block.get('pruned') else len(block['transactions'])
+            rows.append((f"block-{height}", height,
+                         (height, block_hash[:16] + "...", block['miner_address'][:12] + "...", tx_count)))
+        return rows, more
+
+    def fetch_address_rows(self, address, cursor, older, limit):
+        if older:
+            history, more = self.blockchain.get_address_history(address, before=cursor, limit=limit)
+        else:
+            history, more = self.blockchain.get_address_history(address, after=cursor, limit=limit)
+        rows = []
+        for height, tx in history:
+            outputs = transaction_outputs(tx)
+            if tx['sender'] == address:
+                amt, tipe = transaction_total(tx), "KELUAR"
+                partner = outputs[0][0] if len(outputs) == 1 else f"{len(outputs)} penerima"
+            else:
+                amt, tipe = sum(Decimal(amount) for recipient, amount in outputs if recipient == address), "MASUK"
+                partner = tx['sender'] if tx['sender'] != '0' else "Sistem"
+            rows.append((f"{height}-{transaction_id(tx)}", height, (tipe, f"{amt:.8f}", partner, height)))
+        return rows, more
+
+    def add_mempool_tx(self, tx_id, tx):
+        if tx_id in self.mempool_ids:
+            return
+        self.mempool_ids.append(tx_id)
+        self.mempool_listbox.insert(tk.END, f"TX {tx_id[:12]}... ({transaction_total(tx):.8f} ARTH)")
+
+    def remove_mempool_tx(self, tx_id):
+        if tx_id in self.mempool_ids:
+            index = self.mempool_ids.index(tx_id)
+            del self.mempool_ids[index]
+            self.mempool_listbox.delete(index)
+
+    def add_peer(self, peer):
+        if peer not in self.peer_rows:
+            self.peer_rows.append(peer)
+            self.peer_listbox.insert(tk.END, f"🟢 {peer}")
+
+    def remove_peer(self, peer):
+        if peer in self.peer_rows:
+            index = self.peer_rows.index(peer)
+            del self.peer_rows[index]
+            self.peer_listbox.delete(index)
 
     def process_send(self):
         to = self.send_to_var.get().strip()
@@ -416,56 +776,161 @@ class ArthaCore(ThemedTk):
         if not to or len(to) < 10:
             messagebox.showwarning("Error", "Alamat penerima tidak valid.")
             return
-            
-        if self.blockchain.get_balance(self.wallet.get_public_address()) < amount:
+        
+        address = self.wallet.get_public_address()
+        self.query_worker.submit('send', lambda cancelled: self.blockchain.get_balance(address),
+                                 lambda balance: self.confirm_send(to, amount, balance))
+
+    def confirm_send(self, to, amount, balance):
+        if balance < amount:
             messagebox.showerror("Saldo Kurang", "Saldo Anda tidak mencukupi untuk transaksi ini.")
             return
             
         if messagebox.askyesno("Konfirmasi", f"Kirim {amount} ARTH ke {to}?\n\nTindakan ini tidak bisa dibatalkan."):
-            tx_data = {
-                'sender': self.wallet.get_public_address(), 
-                'recipient': to, 
-                'amount': "{:.8f}".format(amount)
-            }
-            sig = self.wallet.sign_transaction(tx_data)
-            pk = self.wallet.public_key.export_key().decode('utf-8')
-            
-            added = self.blockchain.add_transaction(tx_data['sender'], to, amount, sig, pk)
-            if added:
-                self.node.broadcast_message('NEW_TRANSACTION', {'transaction': added, 'public_key_str': pk})
-                messagebox.showinfo("Berhasil", "Transaksi telah dikirim ke jaringan.")
-                self.send_to_var.set(""); self.send_amount_var.set("")
-                self.update_gui_data()
-            else:
-                messagebox.showerror("Gagal", "Kesalahan saat memproses transaksi.")
+            # Penandatanganan (terutama RSA) dan validasi berjalan di pekerja latar belakang.
+            # Transaksi yang sudah ditandatangani tetap dikirim, jadi hasilnya tidak boleh dibuang.
+            self.query_worker.submit('sign-and-send', lambda cancelled: self.sign_and_send(to, amount), self.finish_send,
+                                     on_error=lambda e: messagebox.showerror("Gagal", f"Kesalahan saat memproses transaksi: {e}"),
+                                     cancellable=False)
+
+    def sign_and_send(self, to, amount):
+        tx_data = {
+            'sender': self.wallet.get_public_address(), 
+            'recipient': to, 
+            'amount': "{:.8f}".format(amount),
+            'version': TX_VERSION
+        }
+        sig = self.wallet.sign_transaction(tx_data)
+        pk = self.wallet.public_key_str
+        
+        added = self.blockchain.add_transaction(tx_data['sender'], to, amount, sig, pk, version=TX_VERSION)
+        if added:
+            self.node.broadcast_message('NEW_TRANSACTION', {'transaction': added, 'public_key_str': added.get('public_key_str')})
+        return added
+
+    def finish_send(self, added):
+        if added:
+            messagebox.showinfo("Berhasil", "Transaksi telah dikirim ke jaringan.")
+            self.send_to_var.set(""); self.send_amount_var.set("")
+        else:
+            messagebox.showerror("Gagal", "Kesalahan saat memproses transaksi.")
 
     def search_explorer(self):
         term = self.explorer_search_var.get().strip()
         if not term: return
         
-        self.search_tree.delete(*self.search_tree.get_children())
-        balance = Decimal('0')
-        found = False
-        
-        for block in self.blockchain.chain:
-            for tx in block['transactions']:
-                if tx['sender'] == term or tx['recipient'] == term:
-                    found = True
-                    amt = Decimal(tx['amount'])
-                    if tx['sender'] == term:
-                        balance -= amt; tipe, partner = "KELUAR", tx['recipient']
-                    else:
-                        balance += amt; tipe, partner = "MASUK", tx['sender'] if tx['sender'] != '0' else "Sistem"
-                    
-                    self.search_tree.insert("", 0, values=(tipe, f"{amt:.8f}", partner, block['index']))
-        
-        if found:
-            self.search_label.config(text=f"Riwayat untuk: {term[:20]}... | Perkiraan Saldo: {balance:.8f} ARTH", font=("Segoe UI", 10, "bold"))
+        # Pencarian baru membatalkan pencarian yang masih berjalan.
+        self.search_label.config(text=f"Mencari {term[:20]}...", font=("Segoe UI", 10, "italic"))
+        self.query_worker.submit('search', lambda cancelled: self.lookup(term),
+                                 lambda result: self.show_lookup(term, *result))
+
+    def lookup(self, term):
+        """
+        Resolves a search term to a block height, a transaction ID or an address
+        using the chain indexes.
+        """
+        bc = self.blockchain
+        if term.isdigit() and int(term) < len(bc.state.chain):
+            return 'block', int(term)
+        block = bc.get_block_by_hash(term)
+        if block is not None:
+            return 'block', block['index']
+        if bc.get_transaction(term):
+            return 'tx', term
+        if term in bc.state.address_index or bc.get_balance(term):
+            return 'address', bc.get_balance(term)
+        return None, None
+
+    def show_lookup(self, term, kind, value):
+        if kind == 'block':
+            self.show_block(value)
+        elif kind == 'tx':
+            self.show_transaction(value)
+        elif kind == 'address':
+            self.search_label.config(text=f"Riwayat untuk: {term[:20]}... | Saldo: {value:.8f} ARTH", font=("Segoe UI", 10, "bold"))
             self.btn_copy_searched.config(state="normal")
+            self.search_pages.reset(lambda cursor, older, limit: self.fetch_address_rows(term, cursor, older, limit))
             self.exp_notebook.select(self.tab_search_res)
+            return
         else:
-            self.btn_copy_searched.config(state="disabled")
             messagebox.showinfo("Explorer", "Data tidak ditemukan di blockchain.")
+        self.search_label.config(text="Masukkan alamat untuk melihat riwayat.", font=("Segoe UI", 10, "italic"))
+        self.btn_copy_searched.config(state="disabled")
+
+    def open_selected_block(self):
+        selection = self.blocks_tree.selection()
+        if selection:
+            self.show_block(int(selection[0].split('-', 1)[1]))
+
+    def open_selected_tx(self):
+        selection = self.search_tree.selection()
+        if selection:
+            self.show_transaction(selection[0].split('-', 1)[1])
+
+    def show_block(self, height):
+        self.query_worker.submit('detail', lambda cancelled: self.describe_block(height), self.show_detail)
+
+    def show_transaction(self, tx_id):
+        self.query_worker.submit('detail', lambda cancelled: self.describe_transaction(tx_id), self.show_detail)
+
+    def describe_block(self, height):
+        chain = self.blockchain.state.chain
+        if not 0 <= height < len(chain):
+            return None
+        block = chain[height]
+        lines = [
+            f"Blok #{height}",
+            f"Hash        : {self.blockchain.get_block_hash(height)}",
+            f"Sebelumnya  : {block['previous_hash']}",
+            f"Waktu       : {time.strftime('%d/%m/%Y %H:%M:%S', time.localtime(block['timestamp']))}",
+            f"Miner       : {block['miner_address']}",
+            f"Difficulty  : {block['difficulty']}",
+            f"Nonce       : {block['nonce']}",
+            f"Versi       : {block.get('version', 1)}",
+        ]
+        if block.get('merkle_root'):
+            lines.append(f"Merkle root : {block['merkle_root']}")
+        if block.get('pruned'):
+            lines.append(f"Transaksi   : {block['tx_count']} (body sudah dipangkas)")
+            return lines
+        lines.append(f"Transaksi   : {len(block['transactions'])}")
+        lines.append("")
+        for tx in block['transactions']:
+            sender = "Sistem" if tx['sender'] == '0' else tx['sender']
+            lines.append(f"{transaction_id(tx)}  {sender[:16]} -> {transaction_total(tx):.8f} ARTH")
+        return lines
+
+    def describe_transaction(self, tx_id):
+        found = self.blockchain.get_transaction(tx_id)
+        if not found:
+            return None
+        tx, height = found
+        if height is None:
+            status = "Tertunda (mempool)"
+        else:
+            status = f"Terkonfirmasi di blok #{height} ({self.blockchain.get_current_block_height() - height + 1} konfirmasi)"
+        lines = [
+            f"Transaksi {tx_id}",
+            f"Status      : {status}",
+            f"Versi       : {tx.get('version', 1)}",
+            f"Waktu       : {time.strftime('%d/%m/%Y %H:%M:%S', time.localtime(tx['timestamp']))}",
+            f"Pengirim    : {'Sistem' if tx['sender'] == '0' else tx['sender']}",
+            f"Total       : {transaction_total(tx):.8f} ARTH",
+            "",
+        ]
+        for recipient, amount in transaction_outputs(tx):
+            lines.append(f"-> {recipient}  {amount} ARTH")
+        return lines
+
+    def show_detail(self, lines):
+        if lines is None:
+            messagebox.showinfo("Explorer", "Data tidak ditemukan di blockchain.")
+            return
+        self.detail_text.config(state="normal")
+        self.detail_text.delete("1.0", tk.END)
+        self.detail_text.insert(tk.END, "\n".join(lines))
+        self.detail_text.config(state="disabled")
+        self.exp_notebook.select(self.tab_detail)
 
     def copy_searched_address(self):
         addr = self.explorer_search_var.get().strip()
@@ -499,9 +964,22 @@ class ArthaCore(ThemedTk):
             pass
         self.after(200, self.process_log_queue)
 
+    def process_query_results(self):
+        if not self.is_running:
+            return
+        self.query_worker.poll()
+        # Indikator sibuk berputar selama masih ada query yang berjalan.
+        if self.query_worker.busy:
+            self.busy_indicator.start(15)
+        else:
+            self.busy_indicator.stop()
+        self.after(100, self.process_query_results)
+
     def on_closing(self):
         if messagebox.askokcancel("Keluar", "Ingin menutup ArthaCore?\nIni akan menghentikan node blockchain."):
             self.is_running = False
+            if self.events: self.events.close()
+            self.query_worker.stop()
             if self.node: self.node.stop()
             self.destroy()
 
@@ -0,0 +1,66 @@
+# benchmarks/bench_encoding.py
+#
+# Membandingkan hashing lewat JSON (blok versi <= 6, transaksi versi 1) dengan
+# encoding biner (blok versi 7, transaksi versi 2): hash header, prefix PoW,
+# ID transaksi, Merkle root satu blok dan byte yang ditandatangani.
+#
+#   python3 benchmarks/bench_encoding.py [transaksi_per_blok]
+
+import os
+import sys
+import random
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artha_utils import header_hash, proof_prefix, transaction_id, signing_bytes, signed_transaction_data, merkle_root
+from artha_encoding import TX_VERSION, BINARY_BLOCK_VERSION
+from artha_types import Block
+
+def make_block(version, tx_version, tx_count, seed=1):
+    rng = random.Random(seed)
+    transactions = []
+    for _ in range(tx_count):
+        tx = {'sender': f"{rng.getrandbits(256):064x}", 'recipient': f"{rng.getrandbits(256):064x}",
+              'amount': f"{rng.randrange(1, 10**4)}.{rng.randrange(10**8):08d}", 'timestamp': rng.random() * 2e9,
+              'signature': f"{rng.getrandbits(512):0128x}", 'public_key_str': 'ed25519:' + f"{rng.getrandbits(256):064x}"}
+        if tx_version != 1:
+            tx['version'] = tx_version
+        transactions.append(tx)
+    return Block({
+        'version': version, 'index': 12345, 'timestamp': rng.random() * 2e9, 'transactions': transactions,
+        'nonce': rng.getrandbits(40), 'previous_hash': f"{rng.getrandbits(256):064x}",
+        'miner_address': f"{rng.getrandbits(256):064x}", 'difficulty': 200000,
+        'merkle_root': f"{rng.getrandbits(256):064x}"
+    })
+
+def rate(fn, items, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(items) / best
+
+def main():
+    tx_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    formats = {'json': make_block(BINARY_BLOCK_VERSION - 1, 1, tx_count),
+               'biner': make_block(BINARY_BLOCK_VERSION, TX_VERSION, tx_count)}
+    print(f"Blok dengan {tx_count} transaksi; angka = operasi per detik (lebih besar lebih baik)")
+    print(f"{'':26s}{'json':>12s}{'biner':>12s}{'rasio':>8s}")
+    cases = [
+        ('hash header', lambda block: [block] * 2000, header_hash),
+        ('prefix PoW (template)', lambda block: [block] * 2000, proof_prefix),
+        ('ID transaksi', lambda block: block['transactions'], transaction_id),
+        ('Merkle root blok', lambda block: [block['transactions']] * 5,
+         lambda txs: merkle_root([transaction_id(tx) for tx in txs])),
+        ('byte tanda tangan', lambda block: [signed_transaction_data(tx) for tx in block['transactions']], signing_bytes),
+    ]
+    for name, items_of, fn in cases:
+        rates = {label: rate(fn, items_of(block)) for label, block in formats.items()}
+        print(f"{name:26s}{rates['json']:12,.0f}{rates['biner']:12,.0f}{rates['biner'] / rates['json']:7.2f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+# benchmarks/bench_hashrate.py
+#
+# Membandingkan hashrate satu core antara loop nonce lama (is_valid_proof per
+# iterasi) dan search_nonce() dengan target dan prefix yang dihitung di awal.
+#
+#   python3 benchmarks/bench_hashrate.py [detik_per_pengukuran]
+
+import os
+import sys
+import tempfile
+import time
+
+# Data benchmark tidak boleh menyentuh ~/.artha_chain milik pengguna.
+os.environ['HOME'] = tempfile.mkdtemp(prefix='artha_bench_')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artha_blockchain import ArthaBlockchain
+from artha_mining import prefix_state, proof_target, search_nonce
+
+# Kesulitan sangat tinggi agar pengukuran tidak berhenti karena menemukan solusi.
+BENCH_DIFFICULTY = 2**200
+
+def bench_legacy(blockchain, previous_hash, duration):
+    """The pre-engine mine_a_block inner loop."""
+    last_block = blockchain.last_block
+    nonce = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        for _ in range(1000):
+            blockchain.is_valid_proof(previous_hash, nonce, blockchain.get_current_difficulty())
+            nonce += 1
+            if blockchain.last_block and blockchain.last_block['index'] > last_block['index']:
+                return nonce
+    return nonce
+
+def bench_search_nonce(previous_hash, duration, chunk=20000):
+    prefix = prefix_state(previous_hash)
+    target = proof_target(BENCH_DIFFICULTY)
+    nonce = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        search_nonce(prefix, target, nonce, nonce + chunk)
+        nonce += chunk
+    return nonce
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    blockchain = ArthaBlockchain()
+    previous_hash = blockchain.hash_block(blockchain.last_block)
+
+    start = time.perf_counter()
+    legacy_hashes = bench_legacy(blockchain, previous_hash, duration)
+    legacy_rate = legacy_hashes / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    fast_hashes = bench_search_nonce(previous_hash, duration)
+    fast_rate = fast_hashes / (time.perf_counter() - start)
+
+    print(f"Sebelum (is_valid_proof): {legacy_rate:,.0f} H/s")
+    print(f"Sesudah (search_nonce):   {fast_rate:,.0f} H/s")
+    print(f"Percepatan:               {fast_rate / legacy_rate:.2f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+# benchmarks/bench_memory.py
+#
+# Mengukur puncak RSS saat memuat rantai sintetis berisi 100.000 transaksi,
+# sekali sebagai dict biasa dan sekali sebagai Block/Transaction ringkas.
+# Tiap mode dijalankan di proses terpisah agar puncak memorinya tidak tercampur.
+#
+#   python3 benchmarks/bench_memory.py [jumlah_transaksi]
+
+import os
+import sys
+import json
+import random
+import resource
+import subprocess
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Crypto.PublicKey import ECC, RSA
+
+TXS_PER_BLOCK = 500
+KEY_COUNT = 50
+
+def generate_chain_file(path, tx_count, seed=1):
+    """
+    Writes a chain with random addresses, amounts and signature bytes. Every
+    transaction carries its sender's key, as in blocks before version 5; a
+    few senders use RSA-2048 keys, the rest Ed25519.
+    """
+    rng = random.Random(seed)
+    keys = ['ed25519:' + ECC.generate(curve='Ed25519').public_key().export_key(format='raw').hex()
+            for _ in range(KEY_COUNT - 2)]
+    keys += [RSA.generate(2048).publickey().export_key().decode('utf-8') for _ in range(2)]
+    chain = [{'index': 0, 'timestamp': 0.0, 'transactions': [], 'nonce': 0, 'previous_hash': '0',
+              'miner_address': 'genesis_address', 'difficulty': 1}]
+    for index in range(1, tx_count // TXS_PER_BLOCK + 1):
+        transactions = []
+        for _ in range(TXS_PER_BLOCK):
+            key = rng.choice(keys)
+            signature_size = 64 if key.startswith('ed25519:') else 256
+            transactions.append({
+                'sender': f"{rng.getrandbits(256):064x}", 'recipient': f"{rng.getrandbits(256):064x}",
+                'amount': f"{rng.randrange(1, 10**6)}.{rng.randrange(10**8):08d}", 'timestamp': rng.random() * 2e9,
+                'signature': rng.getrandbits(signature_size * 8).to_bytes(signature_size, 'big').hex(),
+                'public_key_str': key, 'transaction_id': f"{rng.getrandbits(256):064x}"
+            })
+        chain.append({
+            'version': 6, 'index': index, 'timestamp': rng.random() * 2e9, 'transactions': transactions,
+            'nonce': rng.getrandbits(32), 'previous_hash': f"{rng.getrandbits(256):064x}",
+            'miner_address': f"{rng.getrandbits(256):064x}", 'difficulty': 200000,
+            'merkle_root': f"{rng.getrandbits(256):064x}"
+        })
+    with open(path, 'w') as f:
+        json.dump(chain, f)
+
+def measure(path, mode):
+    """Runs in a child process: loads the chain and prints the peak RSS in KiB."""
+    from artha_types import chain_object_hook
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with open(path, 'r') as f:
+        chain = json.load(f, object_hook=chain_object_hook if mode == 'records' else None)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'mode': mode, 'blocks': len(chain), 'baseline_kib': baseline, 'peak_kib': peak}))
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == '--measure':
+        return measure(sys.argv[2], sys.argv[3])
+    tx_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory(prefix='artha_bench_') as temp_dir:
+        path = os.path.join(temp_dir, 'blockchain.json')
+        generate_chain_file(path, tx_count)
+        print(f"Rantai sintetis: {tx_count} transaksi, file {os.path.getsize(path) / 2**20:.1f} MiB")
+        for mode in ('dict', 'records'):
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), '--measure', path, mode],
+                                    capture_output=True, text=True, check=True).stdout
+            result = json.loads(output)
+            print(f"{mode:8s} puncak RSS {result['peak_kib'] / 1024:7.1f} MiB "
+                  f"(di atas baseline {(result['peak_kib'] - result['baseline_kib']) / 1024:.1f} MiB)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/bench_state.py
+#
+# Mengukur replay saldo (_rebuild_state) dan validasi rantai (is_chain_valid)
+# pada rantai sintetis dengan banyak transaksi.
+#
+#   python3 benchmarks/bench_state.py [jumlah_blok] [transaksi_per_blok]
+
+import os
+import sys
+import random
+import tempfile
+import time
+
+# Data benchmark tidak boleh menyentuh ~/.artha_chain milik pengguna.
+os.environ['HOME'] = tempfile.mkdtemp(prefix='artha_bench_')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artha_blockchain import ArthaBlockchain
+from artha_wallet import ArthaWallet
+from artha_types import Block
+
+WALLET_COUNT = 10
+
+def build_chain(blockchain, block_count, txs_per_block, seed=1):
+    """
+    Appends blocks straight to blockchain.chain. Difficulty 1 accepts any
+    nonce, so no proof-of-work has to be searched.
+    """
+    rng = random.Random(seed)
+    wallets = [ArthaWallet(f'bench_{i}.dat', 'bench') for i in range(WALLET_COUNT)]
+    chain = blockchain.chain
+    for height in range(1, block_count + 1):
+        transactions = []
+        if height > WALLET_COUNT:
+            for _ in range(txs_per_block):
+                wallet = rng.choice(wallets)
+                tx_data = {'sender': wallet.address, 'recipient': f"{rng.getrandbits(256):064x}", 'amount': "0.00100000"}
+                transactions.append(dict(tx_data, timestamp=time.time(), signature=wallet.sign_transaction(tx_data),
+                                         public_key_str=wallet.public_key_str))
+        coinbase = {'sender': '0', 'recipient': wallets[height % WALLET_COUNT].address, 'amount': "50.00000000",
+                    'timestamp': time.time(), 'signature': 'coinbase', 'public_key_str': 'coinbase'}
+        transactions.insert(0, coinbase)
+        block = {
+            'version': blockchain.BLOCK_VERSION, 'index': height, 'timestamp': time.time(),
+            'transactions': transactions, 'nonce': 0, 'previous_hash': blockchain.hash_block(chain[-1]),
+            'miner_address': coinbase['recipient'], 'difficulty': 1,
+            'merkle_root': blockchain.compute_merkle_root(transactions)
+        }
+        chain.append(Block(block))
+    return chain
+
+def timed(fn, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    block_count = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    txs_per_block = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    blockchain = ArthaBlockchain()
+    chain = build_chain(blockchain, block_count, txs_per_block)
+    tx_count = sum(len(block['transactions']) for block in chain)
+
+    replay = timed(blockchain._rebuild_state)
+    validation = timed(lambda: blockchain.is_chain_valid(chain), repeat=1)
+    # Tanpa verifikasi tanda tangan tersisa biaya mesin state: saldo, kunci, struktur blok.
+    verify = blockchain.key_registry.verify
+    blockchain.key_registry.verify = lambda *args: True
+    state_validation = timed(lambda: blockchain.is_chain_valid(chain))
+    blockchain.key_registry.verify = verify
+
+    print(f"Rantai: {len(chain)} blok, {tx_count} transaksi")
+    print(f"Replay saldo (_rebuild_state): {replay * 1000:.1f} ms ({tx_count / replay:,.0f} tx/s)")
+    print(f"Validasi (is_chain_valid):     {validation * 1000:.1f} ms ({tx_count / validation:,.0f} tx/s)")
+    print(f"Validasi tanpa tanda tangan:   {state_validation * 1000:.1f} ms ({tx_count / state_validation:,.0f} tx/s)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,287 @@
+# benchmarks/bench_suite.py
+#
+# Rangkaian benchmark untuk membandingkan performa antar versi. Rantai dan
+# mempool sintetis dibuat deterministik oleh generators.py (seed yang sama =
+# blok yang sama), lalu setiap operasi diukur dan hasilnya ditulis sebagai JSON.
+#
+#   python3 benchmarks/bench_suite.py [--height N] [--txs-per-block N] [--distribution zipf]
+#                                     [--output hasil.json] [--compare hasil_lama.json]
+
+import os
+import sys
+import json
+import time
+import queue
+import shutil
+import socket
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+
+# Data benchmark tidak boleh menyentuh ~/.artha_chain milik pengguna.
+BENCH_ROOT = tempfile.mkdtemp(prefix='artha_bench_')
+os.environ['HOME'] = BENCH_ROOT
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from artha_blockchain import ArthaBlockchain
+from artha_node import ArthaNode, MAX_BLOCKS_PER_MESSAGE
+from artha_mining import prefix_state, proof_target, search_nonce
+from artha_utils import proof_prefix
+from generators import generate_chain, DISTRIBUTIONS
+
+RESULTS_FORMAT = 1
+# Kesulitan sangat tinggi agar pengukuran hashrate tidak berhenti karena menemukan solusi.
+BENCH_DIFFICULTY = 2**200
+NONCE_CHUNK = 20000
+
+def fresh_blockchain():
+    """
+    Returns a new ArthaBlockchain in its own data directory, with only its
+    own genesis block.
+    """
+    os.environ['HOME'] = tempfile.mkdtemp(dir=BENCH_ROOT)
+    return ArthaBlockchain()
+
+def blockchain_at(chain):
+    blockchain = fresh_blockchain()
+    if not blockchain.replace_chain(chain):
+        raise RuntimeError("Generated chain was rejected.")
+    return blockchain
+
+def timed(fn, repeat, setup=None):
+    """
+    Runs fn(setup()) `repeat` times; only fn is timed. Returns the run times.
+    """
+    runs = []
+    for _ in range(repeat):
+        args = (setup(),) if setup else ()
+        start = time.perf_counter()
+        fn(*args)
+        runs.append(time.perf_counter() - start)
+    return runs
+
+def result(runs, items, unit):
+    best = min(runs)
+    return {'seconds': best, 'runs': runs, 'items': items, 'unit': unit, 'per_second': items / best}
+
+def bench_chain(args, chain, tx_count):
+    results = {}
+    blockchain = blockchain_at(chain)
+
+    runs = timed(lambda: blockchain.is_chain_valid(chain), args.repeat)
+    results['is_chain_valid'] = result(runs, tx_count, 'tx')
+
+    runs = timed(blockchain.get_balance_snapshot, args.repeat)
+    results['get_balance_snapshot'] = result(runs, len(blockchain.state.balances), 'address')
+
+    rounds = max(1, 5000 // len(chain))
+    def hash_chain():
+        for _ in range(rounds):
+            for block in chain:
+                blockchain.hash_block(block)
+    results['hash_block'] = result(timed(hash_chain, args.repeat), rounds * len(chain), 'block')
+
+    # Sinkronisasi penuh: node baru dengan genesis sendiri menerima seluruh rantai (reorg dari genesis).
+    runs = timed(lambda node: node.replace_chain(chain), args.repeat, setup=fresh_blockchain)
+    results['replace_chain_sync'] = result(runs, tx_count, 'tx')
+
+    # Satu blok baru di atas tip: jalur yang dilalui setiap blok dari jaringan.
+    runs = timed(lambda node: node.replace_chain(chain), args.repeat, setup=lambda: blockchain_at(chain[:-1]))
+    results['replace_chain_extend'] = result(runs, 1, 'block')
+
+    runs = timed(blockchain.save_chain, args.repeat)
+    results['save_chain'] = result(runs, tx_count, 'tx')
+
+    data_dir = os.environ['HOME']
+    def load():
+        os.environ['HOME'] = data_dir
+        ArthaBlockchain()
+    results['load_chain'] = result(timed(load, args.repeat), tx_count, 'tx')
+    return results
+
+def bench_mempool(args, generator, chain):
+    results = {}
+    mempool = generator.mempool(args.mempool)
+
+    def fill(node):
+        return [node.add_transaction(**tx) for tx in mempool]
+    runs = timed(fill, args.repeat, setup=lambda: blockchain_at(chain))
+    results['add_transaction'] = result(runs, len(mempool), 'tx')
+
+    # Pengganti "new_block": menyusun kandidat dari mempool lalu menyambungkannya seperti handle_new_block.
+    def filled_blockchain():
+        node = blockchain_at(chain)
+        if not all(fill(node)):
+            raise RuntimeError("Generated mempool was rejected.")
+        return node
+    node = filled_blockchain()
+    miner = generator.wallets[0].address
+    runs = timed(lambda: node.prepare_block(miner), args.repeat)
+    results['prepare_block'] = result(runs, len(mempool), 'tx')
+
+    def connect(node):
+        candidate = node.prepare_block(miner)
+        # Kesulitan 1 menerima nonce berapa pun, jadi tidak ada PoW yang dicari.
+        candidate['difficulty'] = 1
+        if not node.replace_chain(node.state.chain + [candidate]):
+            raise RuntimeError("Prepared block was rejected.")
+    runs = timed(connect, args.repeat, setup=filled_blockchain)
+    results['prepare_and_connect_block'] = result(runs, len(mempool), 'tx')
+    return results
+
+def bench_hashrate(args, chain):
+    prefix = prefix_state(proof_prefix(chain[-1]))
+    target = proof_target(BENCH_DIFFICULTY)
+    nonce = 0
+    start = time.perf_counter()
+    deadline = start + args.hashrate_seconds
+    while time.perf_counter() < deadline:
+        search_nonce(prefix, target, nonce, nonce + NONCE_CHUNK)
+        nonce += NONCE_CHUNK
+    elapsed = time.perf_counter() - start
+    return {'search_nonce': result([elapsed], nonce, 'hash')}
+
+def framing_pair(blockchain):
+    """
+    Returns (sender, receiver): two ArthaNode objects joined by a socket
+    pair, without the listener, peer discovery or message processing
+    threads. The receiver's _handle_client parses frames into message_queue.
+    """
+    sender_socket, receiver_socket = socket.socketpair()
+    nodes = []
+    for _ in range(2):
+        node = ArthaNode.__new__(ArthaNode)
+        node.blockchain = blockchain
+        node.events = blockchain.events
+        node.lock = threading.RLock()
+        node.peers = {}
+        node.message_queue = queue.Queue()
+        node.is_running = True
+        nodes.append(node)
+    sender, receiver = nodes
+    sender.peers['bench'] = {'socket': sender_socket, 'send_lock': threading.Lock(), 'last_seen': time.time()}
+    threading.Thread(target=receiver._handle_client, args=(receiver_socket, 'bench'), daemon=True).start()
+    return sender, receiver
+
+def receive(receiver, count, message_type):
+    received = 0
+    while received < count:
+        message, _ = receiver.message_queue.get(timeout=60)
+        received += message['type'] == message_type
+
+def bench_framing(args, generator, chain):
+    results = {}
+    blockchain = blockchain_at(chain)
+    sender, receiver = framing_pair(blockchain)
+    transactions = [tx for block in chain for tx in block['transactions'][1:]] or generator.mempool(100)
+    messages = [{'transaction': transactions[i % len(transactions)], 'public_key_str': None}
+                for i in range(max(args.framing_messages, 1))]
+
+    def send_transactions():
+        threading.Thread(target=lambda: [sender.send_message('bench', 'NEW_TRANSACTION', data) for data in messages],
+                         daemon=True).start()
+        receive(receiver, len(messages), 'NEW_TRANSACTION')
+    results['frame_transactions'] = result(timed(send_transactions, args.repeat), len(messages), 'message')
+
+    batches = [range(start, min(start + MAX_BLOCKS_PER_MESSAGE, len(chain)))
+               for start in range(0, len(chain), MAX_BLOCKS_PER_MESSAGE)]
+    def send_batches():
+        threading.Thread(target=lambda: [sender.send_blocks('bench', 'BLOCKS', 'blocks', heights) for heights in batches],
+                         daemon=True).start()
+        receive(receiver, len(batches), 'BLOCKS')
+    runs = timed(send_batches, args.repeat)
+    results['frame_block_batches'] = result(runs, len(chain), 'block')
+    results['frame_block_batches']['bytes'] = wire_bytes(blockchain, range(len(chain)))
+    sender.peers['bench']['socket'].close()
+    return results
+
+def wire_bytes(blockchain, heights):
+    data_file, segments = blockchain.block_store.segments(heights)
+    if data_file:
+        data_file.close()
+    return sum(segment[1] if isinstance(segment, tuple) else len(segment) for segment in segments)
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(baseline, report):
+    """
+    Prints per_second of each benchmark in `baseline` and `report` and
+    their ratio to stderr; a ratio below 1 is a regression.
+    """
+    print(f"{'':28s}{'lama':>14s}{'baru':>14s}{'rasio':>8s}", file=sys.stderr)
+    for name, new in report['results'].items():
+        old = baseline['results'].get(name)
+        if not old:
+            continue
+        print(f"{name:28s}{old['per_second']:>14,.0f}{new['per_second']:>14,.0f}{new['per_second'] / old['per_second']:>7.2f}x",
+              file=sys.stderr)
+    if baseline['params'] != report['params']:
+        print("Peringatan: parameter benchmark berbeda, rasio tidak sebanding.", file=sys.stderr)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="ArthaChain benchmark suite")
+    parser.add_argument('--height', type=int, default=60, help="Jumlah blok setelah genesis (default: 60)")
+    parser.add_argument('--txs-per-block', type=int, default=100, help="Transaksi per blok (default: 100)")
+    parser.add_argument('--wallets', type=int, default=10, help="Jumlah dompet pengirim (default: 10)")
+    parser.add_argument('--distribution', choices=DISTRIBUTIONS, default='uniform',
+                        help="Sebaran pengirim transaksi (default: uniform)")
+    parser.add_argument('--mempool', type=int, default=500, help="Transaksi di mempool untuk blok baru (default: 500)")
+    parser.add_argument('--framing-messages', type=int, default=5000,
+                        help="Jumlah pesan transaksi untuk uji framing (default: 5000)")
+    parser.add_argument('--hashrate-seconds', type=float, default=3.0, help="Lama pengukuran hashrate (default: 3)")
+    parser.add_argument('--repeat', type=int, default=3, help="Pengulangan per benchmark, diambil yang tercepat (default: 3)")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', metavar='FILE', help="Tulis hasil JSON ke file ini (default: stdout)")
+    parser.add_argument('--compare', metavar='FILE', help="Bandingkan dengan hasil JSON sebelumnya")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    try:
+        generation_start = time.perf_counter()
+        generator, chain = generate_chain(fresh_blockchain(), args.height, args.txs_per_block,
+                                          args.wallets, args.distribution, args.seed)
+        generation = time.perf_counter() - generation_start
+        tx_count = sum(len(block['transactions']) for block in chain)
+        print(f"Rantai: {len(chain)} blok, {tx_count} transaksi (dibuat dalam {generation:.1f} s)", file=sys.stderr)
+
+        results = {}
+        for name, run in (('rantai', lambda: bench_chain(args, chain, tx_count)),
+                          ('mempool', lambda: bench_mempool(args, generator, chain)),
+                          ('hashrate', lambda: bench_hashrate(args, chain)),
+                          ('framing', lambda: bench_framing(args, generator, chain))):
+            print(f"Mengukur {name}...", file=sys.stderr)
+            results.update(run())
+    finally:
+        shutil.rmtree(BENCH_ROOT, ignore_errors=True)
+
+    params = {key: value for key, value in vars(args).items() if key not in ('output', 'compare')}
+    report = {
+        'format': RESULTS_FORMAT,
+        'params': params,
+        'chain': {'blocks': len(chain), 'transactions': tx_count, 'tip_hash': generator.blockchain.hash_block(chain[-1])},
+        'environment': {'git_commit': git_commit(), 'python': platform.python_version(),
+                        'platform': platform.platform(), 'cpu_count': os.cpu_count()},
+        'results': results,
+    }
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+if __name__ == '__main__':
+    main()
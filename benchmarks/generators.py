@@ -0,0 +1,171 @@
+# benchmarks/generators.py
+#
+# Pembuat rantai dan mempool sintetis untuk benchmark. Kunci Ed25519 diturunkan
+# dari seed dan tanda tangan Ed25519 deterministik, jadi seed yang sama selalu
+# menghasilkan blok, transaksi, dan hash yang sama persis.
+
+import os
+import sys
+import random
+import hashlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Crypto.PublicKey import ECC
+
+from artha_wallet import ArthaWallet, KEY_TYPE_ED25519
+from artha_encoding import TX_VERSION
+from artha_utils import transaction_output_units
+from artha_types import Block
+
+# Stempel waktu tetap agar hash blok tidak bergantung pada jam saat benchmark dijalankan.
+GENESIS_TIMESTAMP = 1700000000.0
+BLOCK_INTERVAL = 60
+TX_AMOUNT = "0.00100000"
+DISTRIBUTIONS = ('uniform', 'zipf', 'single')
+
+def bench_wallets(count, seed=1):
+    """
+    Returns `count` Ed25519 wallets whose keys are derived from `seed`. They
+    exist only in memory: no wallet file and no password KDF.
+    """
+    wallets = []
+    for i in range(count):
+        wallet = ArthaWallet.__new__(ArthaWallet)
+        wallet.wallet_file = None
+        wallet.key_type = KEY_TYPE_ED25519
+        key_seed = hashlib.sha256(f"artha-bench:{seed}:{i}".encode('utf-8')).digest()
+        wallet.private_key = ECC.construct(curve='Ed25519', seed=key_seed)
+        wallet._set_public_key()
+        wallets.append(wallet)
+    return wallets
+
+def sender_weights(count, distribution):
+    """
+    Relative sending frequency per wallet: 'uniform' spreads transactions
+    evenly, 'zipf' makes wallet i send ~1/(i+1) as often as wallet 0, and
+    'single' sends everything from wallet 0.
+    """
+    if distribution == 'uniform':
+        return [1.0] * count
+    if distribution == 'zipf':
+        return [1.0 / (i + 1) for i in range(count)]
+    if distribution == 'single':
+        return [1.0] + [0.0] * (count - 1)
+    raise ValueError(f"Unknown sender distribution: {distribution}")
+
+def genesis_block():
+    return Block({
+        'index': 0, 'timestamp': GENESIS_TIMESTAMP, 'transactions': [], 'nonce': 0,
+        'previous_hash': '0', 'miner_address': 'genesis_address', 'difficulty': 200000
+    })
+
+def make_transfer(wallet, recipient, timestamp, reveal_key):
+    """
+    Returns a signed version 2 transfer in the form it takes in a block. The
+    public key is only included when the sender has not revealed it yet.
+    """
+    tx_data = {'sender': wallet.address, 'recipient': recipient, 'amount': TX_AMOUNT, 'version': TX_VERSION}
+    transaction = dict(tx_data, timestamp=timestamp, signature=wallet.sign_transaction(tx_data))
+    if reveal_key:
+        transaction['public_key_str'] = wallet.public_key_str
+    return transaction
+
+class ChainGenerator:
+    """
+    Builds a valid version 7 chain. The first `len(wallets)` blocks pay their
+    reward to each wallet in turn so every sender is funded; after that each
+    block carries `txs_per_block` transfers from senders drawn with
+    sender_weights() to fresh random addresses.
+
+    Blocks use difficulty 1, which accepts any nonce, so no proof-of-work is
+    searched; is_chain_valid() does not check the difficulty schedule. The
+    blockchain is only used for its hashing rules, its chain is not touched.
+    """
+
+    def __init__(self, blockchain, wallets, txs_per_block, distribution='uniform', seed=1):
+        self.blockchain = blockchain
+        self.wallets = wallets
+        self.txs_per_block = txs_per_block
+        self.weights = sender_weights(len(wallets), distribution)
+        self.rng = random.Random(seed)
+        self.revealed = set()
+        self.chain = [genesis_block()]
+        # Saldo dan kunci sebelum blok berikutnya, untuk state_hash blok snapshot.
+        self.balances = {}
+        self.keys = {}
+
+    def _transfers(self, count, timestamp, revealed=None):
+        """
+        Returns `count` transfers. Keys are revealed once per sender in
+        `revealed`, which is updated; without it, each transfer carries the key
+        until the generated chain has registered it, as mempool transactions
+        are checked one by one against the chain.
+        """
+        senders = self.rng.choices(self.wallets, weights=self.weights, k=count)
+        transactions = []
+        for wallet in senders:
+            recipient = f"{self.rng.getrandbits(256):064x}"
+            if revealed is None:
+                reveal_key = wallet.address not in self.keys
+            else:
+                reveal_key = wallet.address not in revealed
+                revealed.add(wallet.address)
+            transactions.append(make_transfer(wallet, recipient, timestamp, reveal_key))
+        return transactions
+
+    def next_block(self, transactions=None):
+        """
+        Appends and returns the next block. Without `transactions`, transfers
+        are generated once every wallet has been funded.
+        """
+        height = len(self.chain)
+        timestamp = GENESIS_TIMESTAMP + height * BLOCK_INTERVAL
+        miner = self.wallets[height % len(self.wallets)].address
+        if transactions is None:
+            funded = height > len(self.wallets)
+            transactions = self._transfers(self.txs_per_block, timestamp - 1, self.revealed) if funded else []
+        blockchain = self.blockchain
+        coinbase = {'sender': '0', 'recipient': miner, 'amount': "{:.8f}".format(blockchain.BLOCK_REWARD),
+                    'timestamp': timestamp, 'signature': 'coinbase', 'public_key_str': 'coinbase', 'version': TX_VERSION}
+        transactions = [coinbase] + transactions
+        block = {
+            'version': blockchain.BLOCK_VERSION, 'index': height, 'timestamp': timestamp, 'transactions': transactions,
+            'nonce': 0, 'previous_hash': blockchain.hash_block(self.chain[-1]), 'miner_address': miner,
+            'difficulty': 1, 'merkle_root': blockchain.compute_merkle_root(transactions)
+        }
+        if height % blockchain.SNAPSHOT_INTERVAL == 0:
+            block['state_hash'] = blockchain.compute_state_hash(self.balances, self.keys)
+        self._apply(transactions)
+        self.chain.append(Block(block))
+        return self.chain[-1]
+
+    def _apply(self, transactions):
+        for tx in transactions:
+            outputs = transaction_output_units(tx)
+            if tx['sender'] != '0':
+                self.balances[tx['sender']] -= sum(units for _, units in outputs)
+                if tx.get('public_key_str'):
+                    self.keys.setdefault(tx['sender'], tx['public_key_str'])
+            for recipient, units in outputs:
+                self.balances[recipient] = self.balances.get(recipient, 0) + units
+
+    def mempool(self, count):
+        """
+        Returns `count` signed transfers on top of the generated chain, as
+        keyword arguments for ArthaBlockchain.add_transaction().
+        """
+        timestamp = self.chain[-1]['timestamp'] + 1
+        return [{'sender': tx['sender'], 'recipient': tx['recipient'], 'amount': tx['amount'],
+                 'signature': tx['signature'], 'public_key_str': tx.get('public_key_str'),
+                 'timestamp': tx['timestamp'], 'version': tx['version']}
+                for tx in self._transfers(count, timestamp)]
+
+def generate_chain(blockchain, height, txs_per_block, wallet_count=10, distribution='uniform', seed=1):
+    """
+    Returns (generator, chain) with a chain of `height` blocks after genesis.
+    """
+    generator = ChainGenerator(blockchain, bench_wallets(wallet_count, seed), txs_per_block, distribution, seed)
+    for _ in range(height):
+        generator.next_block()
+    return generator, generator.chain
@@ -0,0 +1,142 @@
+# tests/test_consensus.py
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from artha_blockchain import ArthaBlockchain
+from artha_encoding import TX_VERSION, EncodingError, encode_transaction
+from artha_types import Block
+from artha_utils import block_header, merkle_root, merkle_proof, verify_merkle_proof, hash_data, transaction_id, to_base_units
+from generators import GENESIS_TIMESTAMP, ChainGenerator, bench_wallets, make_transfer
+
+RECIPIENT = 'r' * 64
+
+class ConsensusTest(unittest.TestCase):
+    """
+    Blocks are built with benchmarks/generators.py: difficulty 1, so no
+    proof-of-work is searched, and three wallets funded by the first blocks.
+    """
+
+    def setUp(self):
+        self.home = tempfile.mkdtemp()
+        self.old_home = os.environ.get('HOME')
+        os.environ['HOME'] = self.home
+        self.blockchain = ArthaBlockchain()
+        self.wallets = bench_wallets(3)
+        self.generator = ChainGenerator(self.blockchain, self.wallets, 0)
+        for _ in range(len(self.wallets)):
+            self.generator.next_block()
+        self.assertTrue(self.blockchain.replace_chain(self.generator.chain))
+
+    def tearDown(self):
+        if self.old_home is None:
+            os.environ.pop('HOME', None)
+        else:
+            os.environ['HOME'] = self.old_home
+        shutil.rmtree(self.home, ignore_errors=True)
+
+    def transfer(self, wallet, reveal_key=True):
+        timestamp = GENESIS_TIMESTAMP + len(self.generator.chain) * 60 - 1
+        return make_transfer(wallet, RECIPIENT, timestamp, reveal_key)
+
+    def test_valid_block_connects(self):
+        block = self.generator.next_block([self.transfer(self.wallets[0]), self.transfer(self.wallets[1])])
+        self.assertTrue(self.blockchain.connect_block(block))
+        self.assertEqual(self.blockchain.state.balances[RECIPIENT], 2 * to_base_units("0.00100000"))
+
+    def test_duplicated_last_transaction_is_rejected(self):
+        second = self.transfer(self.wallets[1])
+        block = self.generator.next_block([self.transfer(self.wallets[0]), second])
+        # [coinbase, t1, t2, t2] punya Merkle root yang sama dengan [coinbase, t1, t2].
+        tampered = Block(dict(block.to_dict(), transactions=block.to_dict()['transactions'] + [second]))
+        self.assertEqual(self.blockchain.hash_block(tampered), self.blockchain.hash_block(block))
+        self.assertFalse(self.blockchain.check_new_block(tampered))
+        self.assertFalse(self.blockchain.connect_block(tampered))
+        self.assertFalse(self.blockchain.replace_chain(self.generator.chain[:-1] + [tampered]))
+        self.assertEqual(self.blockchain.state.height, len(self.wallets))
+        self.assertTrue(self.blockchain.connect_block(block))
+
+    def test_replayed_transaction_is_rejected(self):
+        first = self.transfer(self.wallets[0])
+        self.assertTrue(self.blockchain.connect_block(self.generator.next_block([first])))
+        self.assertFalse(self.blockchain.check_new_block(self.generator.next_block([first])))
+
+    def test_key_must_be_revealed_once(self):
+        hidden = self.generator.next_block([self.transfer(self.wallets[0], reveal_key=False)])
+        self.assertFalse(self.blockchain.check_new_block(hidden))
+        self.generator.chain.pop()
+
+        self.assertTrue(self.blockchain.connect_block(self.generator.next_block([self.transfer(self.wallets[0])])))
+        later = self.generator.next_block([self.transfer(self.wallets[0], reveal_key=False)])
+        self.assertTrue(self.blockchain.connect_block(later))
+
+    def test_key_of_another_address_is_rejected(self):
+        tx = self.transfer(self.wallets[0], reveal_key=False)
+        tx['public_key_str'] = self.wallets[1].public_key_str
+        self.assertFalse(self.blockchain.check_new_block(self.generator.next_block([tx])))
+
+    def test_batch_outputs(self):
+        wallet = self.wallets[0]
+        outputs, signature = wallet.sign_batch([('a' * 64, "1.5"), ('b' * 64, "2")])
+        batch = {'sender': wallet.address, 'outputs': outputs, 'version': TX_VERSION, 'signature': signature,
+                 'timestamp': GENESIS_TIMESTAMP, 'public_key_str': wallet.public_key_str}
+        self.assertTrue(self.blockchain.connect_block(self.generator.next_block([batch])))
+        balances = self.blockchain.state.balances
+        self.assertEqual((balances['a' * 64], balances['b' * 64]), (to_base_units("1.5"), to_base_units("2")))
+
+        empty = dict(batch, outputs=[], timestamp=GENESIS_TIMESTAMP + 1)
+        self.assertFalse(self.blockchain.check_new_block(self.generator.next_block([empty])))
+
+    def legacy_block(self, previous, version):
+        coinbase = {'sender': '0', 'recipient': self.wallets[0].address, 'amount': "50.00000000",
+                    'timestamp': previous['timestamp'] + 60, 'signature': 'coinbase', 'public_key_str': 'coinbase'}
+        return Block({'version': version, 'index': previous['index'] + 1, 'timestamp': previous['timestamp'] + 60,
+                      'transactions': [coinbase], 'nonce': 0, 'previous_hash': self.blockchain.hash_block(previous),
+                      'miner_address': self.wallets[0].address, 'difficulty': 1,
+                      'merkle_root': self.blockchain.compute_merkle_root([coinbase])})
+
+    def test_block_version_cannot_go_down(self):
+        self.assertFalse(self.blockchain.check_new_block(self.legacy_block(self.generator.chain[-1], 6)))
+        self.assertTrue(self.blockchain.check_new_block(self.generator.next_block([])))
+
+    def test_minimum_block_version_from_activation_height(self):
+        chain = [self.generator.chain[0], self.legacy_block(self.generator.chain[0], 6)]
+        self.assertTrue(self.blockchain.is_chain_valid(chain))
+        self.blockchain.MIN_BLOCK_VERSION_HEIGHT = 1
+        self.assertFalse(self.blockchain.is_chain_valid(chain))
+        headers = [dict(block_header(block), hash=self.blockchain.hash_block(block)) for block in chain]
+        self.assertFalse(self.blockchain.is_header_chain_valid(headers))
+
+class MerkleTest(unittest.TestCase):
+
+    def test_proofs_for_every_leaf(self):
+        for count in range(1, 8):
+            leaves = [hash_data(str(i).encode('utf-8')) for i in range(count)]
+            root = merkle_root(leaves)
+            for index, leaf in enumerate(leaves):
+                self.assertTrue(verify_merkle_proof(leaf, merkle_proof(leaves, index), root))
+            self.assertFalse(verify_merkle_proof(hash_data(b'x'), merkle_proof(leaves, 0), root))
+
+class EncodingTest(unittest.TestCase):
+
+    def test_transaction_id_is_stable(self):
+        wallet = bench_wallets(1)[0]
+        tx = make_transfer(wallet, RECIPIENT, GENESIS_TIMESTAMP, True)
+        self.assertEqual(transaction_id(tx), transaction_id(dict(tx, public_key_str=None)))
+        self.assertNotEqual(transaction_id(tx), transaction_id(dict(tx, timestamp=GENESIS_TIMESTAMP + 1)))
+
+    def test_non_canonical_amount_has_no_encoding(self):
+        wallet = bench_wallets(1)[0]
+        tx = make_transfer(wallet, RECIPIENT, GENESIS_TIMESTAMP, True)
+        for amount in ("1", "01.00000000", "1.0000000", 1):
+            with self.assertRaises(EncodingError):
+                encode_transaction(dict(tx, amount=amount))
+
+if __name__ == '__main__':
+    unittest.main()
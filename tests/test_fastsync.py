@@ -0,0 +1,73 @@
+# tests/test_fastsync.py
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from artha_blockchain import ArthaBlockchain
+from artha_events import TipChanged
+from artha_utils import to_base_units
+from generators import generate_chain
+
+class FastSyncTest(unittest.TestCase):
+
+    def setUp(self):
+        self.home = tempfile.mkdtemp()
+        self.old_home = os.environ.get('HOME')
+
+    def tearDown(self):
+        if self.old_home is None:
+            os.environ.pop('HOME', None)
+        else:
+            os.environ['HOME'] = self.old_home
+        shutil.rmtree(self.home, ignore_errors=True)
+
+    def use_home(self, name):
+        os.environ['HOME'] = os.path.join(self.home, name)
+
+    def test_install_snapshot_publishes_state(self):
+        self.use_home('source')
+        source = ArthaBlockchain()
+        _, chain = generate_chain(source, ArthaBlockchain.SNAPSHOT_INTERVAL + 5, 1, wallet_count=3)
+        self.assertTrue(source.replace_chain(chain))
+        snapshot = source.snapshot
+        self.assertEqual(snapshot['height'], ArthaBlockchain.SNAPSHOT_INTERVAL - 1)
+
+        self.use_home('fresh')
+        fresh = ArthaBlockchain()
+        tip_states = []
+        publish = fresh.events.publish
+
+        def record(event):
+            if isinstance(event, TipChanged):
+                tip_states.append((event, fresh.state))
+            publish(event)
+        fresh.events.publish = record
+
+        headers = source.get_headers(0, len(chain))
+        self.assertTrue(fresh.is_header_chain_valid(headers))
+        fresh.install_snapshot(headers, snapshot)
+
+        # Pembaca yang menerima TipChanged harus sudah melihat rantai hasil snapshot.
+        event, state = tip_states[-1]
+        self.assertTrue(event.reset)
+        self.assertEqual(state.height, snapshot['height'])
+        self.assertEqual(state.tip_hash, snapshot['block_hash'])
+        self.assertEqual(state.pruned_height, snapshot['height'] + 1)
+        self.assertEqual(fresh.get_current_block_height(), snapshot['height'])
+        entries = [entry for chunk in snapshot['chunks'] for entry in chunk]
+        self.assertEqual(dict(state.balances), {entry[0]: to_base_units(entry[1]) for entry in entries
+                                                if to_base_units(entry[1])})
+
+        self.assertTrue(fresh.replace_chain(fresh.state.chain + list(chain[snapshot['height'] + 1:])))
+        self.assertEqual(fresh.state.height, source.state.height)
+        self.assertEqual(fresh.state.tip_hash, source.state.tip_hash)
+        self.assertEqual(dict(fresh.state.balances), dict(source.state.balances))
+
+if __name__ == '__main__':
+    unittest.main()
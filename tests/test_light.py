@@ -0,0 +1,125 @@
+# tests/test_light.py
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artha_blockchain import ArthaBlockchain
+from artha_light import HeaderChain, HeaderSync
+from artha_mining import prefix_state, proof_target, search_nonce
+from artha_node import ArthaNode
+from artha_utils import header_hash, proof_prefix, transaction_id
+
+DIFFICULTY = 4096
+
+class ScheduledBlockchain(ArthaBlockchain):
+    # Jadwal kesulitan tetap dan rendah agar PoW di tes cepat ditemukan.
+    def get_current_difficulty(self, chain=None):
+        return DIFFICULTY
+
+def mine(blockchain, miner_address):
+    candidate = blockchain.prepare_block(miner_address)
+    candidate['nonce'] = search_nonce(prefix_state(proof_prefix(candidate)), proof_target(candidate['difficulty']), 0, 2**32)
+    return candidate
+
+def forge_branch(headers, start, count):
+    """
+    Returns `count` headers on top of headers[start - 1] with difficulty 1,
+    whose proof-of-work costs nothing.
+    """
+    branch = []
+    previous = headers[start - 1]
+    for height in range(start, start + count):
+        header = dict(headers[start], index=height, previous_hash=previous['hash'], difficulty=1, nonce=0)
+        header['hash'] = header_hash(header)
+        branch.append(header)
+        previous = header
+    return branch
+
+class FakeNode:
+    def __init__(self, source):
+        self.source = source
+        self.finished = False
+
+    def send_message(self, peer, message_type, data):
+        self.sync.on_headers({'start': data['start'], 'headers': self.source.get_headers(data['start'], data['end'])})
+
+    def finish_header_sync(self, sync):
+        self.finished = True
+
+class LightClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.home = tempfile.mkdtemp()
+        self.old_home = os.environ.get('HOME')
+        self.use_home('source')
+        self.source = ScheduledBlockchain()
+        for _ in range(15):
+            self.assertTrue(self.source.replace_chain(self.source.chain + [mine(self.source, 'm' * 64)]))
+        self.headers = self.source.get_headers(0, len(self.source.chain))
+        self.use_home('light')
+        self.light = HeaderChain(ScheduledBlockchain())
+
+    def tearDown(self):
+        if self.old_home is None:
+            os.environ.pop('HOME', None)
+        else:
+            os.environ['HOME'] = self.old_home
+        shutil.rmtree(self.home, ignore_errors=True)
+
+    def use_home(self, name):
+        os.environ['HOME'] = os.path.join(self.home, name)
+
+    def test_connects_valid_headers(self):
+        self.assertTrue(self.light.connect(0, self.headers[:8]))
+        self.assertTrue(self.light.connect(8, self.headers[8:]))
+        self.assertEqual(self.light.height, self.source.state.height)
+        self.assertEqual(self.light.get_block_hash(self.light.height), self.source.state.tip_hash)
+        self.assertEqual(HeaderChain(ScheduledBlockchain()).height, self.light.height)
+
+    def test_rejects_headers_below_scheduled_difficulty(self):
+        self.assertTrue(self.light.connect(0, self.headers[:10]))
+        forged = forge_branch(self.headers, 5, 20)
+        self.assertFalse(self.light.connect(5, forged))
+        self.assertEqual(self.light.get_block_hash(9), self.headers[9]['hash'])
+
+    def test_rejects_broken_link_and_shorter_branch(self):
+        self.assertTrue(self.light.connect(0, self.headers))
+        self.assertFalse(self.light.connect(3, self.headers[4:]))
+        self.assertFalse(self.light.connect(3, self.headers[3:10]))
+
+    def test_header_sync(self):
+        node = FakeNode(self.source)
+        node.sync = HeaderSync(node, 'peer', self.light)
+        node.sync.start()
+        self.assertTrue(node.finished)
+        self.assertEqual(self.light.height, self.source.state.height)
+
+    def test_payment_proof_against_header_chain(self):
+        self.assertTrue(self.light.connect(0, self.headers))
+        node = ArthaNode.__new__(ArthaNode)
+        node.lock = threading.RLock()
+        node.payment_proofs = {}
+        node.blockchain = self.light.blockchain
+        node.header_chain = self.light
+
+        tx_id = transaction_id(self.source.chain[5]['transactions'][0])
+        proof = self.source.get_merkle_proof(tx_id)
+        node._accept_payment_proof(dict(proof, transaction_id=tx_id, tip_height=10**6), 'peer')
+        self.assertEqual(node.payment_proofs[tx_id]['confirmations'], self.source.state.height - 5 + 1)
+
+        # Header palsu dengan kesulitan 1 tidak ada di rantai header lokal.
+        forged = forge_branch(self.headers, 5, 1)[0]
+        forged['merkle_root'] = proof['header']['merkle_root']
+        forged.pop('hash')
+        node.payment_proofs.clear()
+        node._accept_payment_proof(dict(proof, header=forged, transaction_id=tx_id), 'peer')
+        self.assertEqual(node.payment_proofs, {})
+
+if __name__ == '__main__':
+    unittest.main()
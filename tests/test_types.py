@@ -0,0 +1,54 @@
+# tests/test_types.py
+
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artha_types import Transaction, Block, chain_object_hook
+from artha_utils import transaction_output_units
+
+def make_tx(amount):
+    return {'sender': 'a' * 64, 'recipient': 'b' * 64, 'amount': amount, 'timestamp': 1700000000.5,
+            'signature': 'cd' * 64, 'public_key_str': 'ed25519:' + 'ef' * 32}
+
+class TransactionRoundTripTest(unittest.TestCase):
+
+    def assert_round_trip(self, amount):
+        tx = make_tx(amount)
+        record = Transaction(tx)
+        self.assertEqual(record.to_dict(), tx)
+        self.assertIs(type(record['amount']), type(amount))
+        self.assertEqual(json.loads(json.dumps(record.to_dict()), object_hook=chain_object_hook).to_dict(), tx)
+        self.assertEqual(list(record.output_units()), list(transaction_output_units(tx)))
+
+    def test_canonical_string_amount(self):
+        self.assert_round_trip("12.50000000")
+
+    def test_non_canonical_string_amount(self):
+        self.assert_round_trip("5")
+        self.assert_round_trip("0.1")
+
+    def test_int_amount(self):
+        self.assert_round_trip(5)
+        self.assertEqual(Transaction(make_tx(5)).output_units()[0][1], 5 * 10**8)
+
+    def test_float_amount(self):
+        self.assert_round_trip(0.5)
+
+    def test_amount_type_can_change(self):
+        record = Transaction(make_tx("1.00000000"))
+        record['amount'] = 3
+        self.assertEqual(record['amount'], 3)
+        record['amount'] = "2.00000000"
+        self.assertEqual(record.to_dict(), make_tx("2.00000000"))
+
+    def test_block_with_int_amount(self):
+        block = {'version': 7, 'index': 1, 'timestamp': 1.0, 'nonce': 0, 'previous_hash': '00' * 32,
+                 'miner_address': 'c' * 64, 'difficulty': 1, 'transactions': [make_tx(7), make_tx("7.00000000")]}
+        self.assertEqual(Block(block).to_dict(), block)
+
+if __name__ == '__main__':
+    unittest.main()